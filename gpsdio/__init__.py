@@ -7,16 +7,39 @@ AIS I/O with Python, dictionaries, and the GPSd AIVDM schema.
 
 
 from gpsdio.io import open
+from gpsdio.io import GPSDIOMultiReader
 from gpsdio.io import GPSDIOReader
 from gpsdio.io import GPSDIOWriter
+from gpsdio.io import PartitionedWriter
+from gpsdio.dataset import GPSDIODataset
+from gpsdio.dataset import open_dataset
 
 import logging
+import sys
 
 logging.basicConfig()
 logger = logging.getLogger('gpsdio')
 
 
-__all__ = ('open', 'GPSDIOReader', 'GPSDIOWriter')
+__all__ = ('open', 'open_dataset', 'GPSDIODataset', 'GPSDIOMultiReader', 'GPSDIOReader',
+           'GPSDIOWriter', 'PartitionedWriter')
+
+
+# The asyncio API relies on async/await syntax.  asyncio is slow to import so
+# it is only loaded when used.
+if sys.version_info >= (3, 5):
+
+    def aopen(name, mode='r', **kwargs):
+
+        """
+        Open a file for reading or writing from `asyncio` code.  See
+        `gpsdio.aio.aopen()`.
+        """
+
+        from gpsdio.aio import aopen
+        return aopen(name, mode=mode, **kwargs)
+
+    __all__ += ('aopen',)
 
 
 __version__ = '0.0.8'
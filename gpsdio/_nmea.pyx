@@ -0,0 +1,344 @@
+"""
+Cythonified AIVDM payload decoding.
+
+Payloads are de-armored into an array of 6-bit values with a lookup table and
+fields are extracted by bit offset.  Values are scaled like the GPSd AIVDM
+JSON output but are not checked against the schema.
+"""
+
+
+from libc.string cimport memset
+
+
+cdef int MAX_CHARS = 1024
+
+cdef unsigned char _ARMOR[256]
+cdef unsigned char _INVALID = 0xFF
+
+memset(_ARMOR, _INVALID, 256)
+cdef int _c
+for _c in range(48, 88):
+    _ARMOR[_c] = _c - 48
+for _c in range(96, 120):
+    _ARMOR[_c] = _c - 56
+
+cdef str _SIXBIT_ASCII = (
+    "@ABCDEFGHIJKLMNOPQRSTUVWXYZ[\\]^_ !\"#$%&'()*+,-./0123456789:;<=>?")
+
+
+cdef class _Bits:
+
+    cdef unsigned char six[1024]
+    cdef int nbits
+
+    cdef int load(self, payload) except -1:
+        cdef bytes b = payload.encode('ascii') if isinstance(payload, str) else payload
+        cdef const unsigned char* p = b
+        cdef int n = len(b)
+        cdef int i
+        cdef unsigned char v
+        if n > MAX_CHARS:
+            raise ValueError("Payload is too long: {} characters".format(n))
+        for i in range(n):
+            v = _ARMOR[p[i]]
+            if v == _INVALID:
+                raise ValueError("Invalid payload character: {!r}".format(chr(p[i])))
+            self.six[i] = v
+        self.nbits = 6 * n
+        return 0
+
+    cdef unsigned long long uint(self, int start, int width):
+        cdef unsigned long long out = 0
+        cdef int i
+        for i in range(start, start + width):
+            out <<= 1
+            # Bits beyond the end of a short payload read as zero
+            if i < self.nbits:
+                out |= (self.six[i // 6] >> (5 - i % 6)) & 1
+        return out
+
+    cdef long long sint(self, int start, int width):
+        cdef unsigned long long raw = self.uint(start, width)
+        if raw & (1ULL << (width - 1)):
+            return <long long>raw - (1LL << width)
+        return <long long>raw
+
+    cdef str text(self, int start, int width):
+        cdef list chars = []
+        cdef int i
+        cdef int end = start + width
+        if end > self.nbits:
+            end = self.nbits
+        # Ignore a trailing partial character
+        end -= (end - start) % 6
+        for i in range(start, end, 6):
+            chars.append(_SIXBIT_ASCII[self.uint(i, 6)])
+        out = ''.join(chars)
+        # '@' is padding and trailing spaces are common
+        out = out.split('@', 1)[0].rstrip()
+        return out or None
+
+
+def checksum_ok(sentence):
+
+    """
+    Check the XOR checksum of an NMEA sentence, which covers everything
+    between the leading `!` or `$` and the `*`.  Receiver-appended fields
+    following the checksum are ignored.
+    """
+
+    cdef bytes b = sentence.encode('ascii', 'replace') if isinstance(sentence, str) else sentence
+    cdef const unsigned char* p = b
+    cdef int n = len(b)
+    cdef int i = 1
+    cdef unsigned char check = 0
+    if n < 4:
+        return False
+    while i < n and p[i] != 42:  # '*'
+        check ^= p[i]
+        i += 1
+    if i + 3 > n:
+        return False
+    try:
+        return int(b[i + 1:i + 3], 16) == check
+    except ValueError:
+        return False
+
+
+cdef double _latlon(long long raw):
+    return raw / 600000.0
+
+
+cdef double _speed(unsigned long long raw):
+    # 1022 and 1023 are special values
+    if raw >= 1022:
+        return <double>raw
+    return raw / 10.0
+
+
+cdef double _course(unsigned long long raw):
+    if raw >= 3600:
+        return 3600.0
+    return raw / 10.0
+
+
+cdef double _turn(long long raw):
+    cdef double rot = raw / 4.733
+    rot = rot * rot
+    return -rot if raw < 0 else rot
+
+
+cdef int _heading(unsigned long long raw):
+    return <int>raw if raw <= 359 else 511
+
+
+cdef int _second(unsigned long long raw):
+    return <int>raw if raw <= 60 else 60
+
+
+cdef int _month(unsigned long long raw):
+    return <int>raw if raw <= 12 else 0
+
+
+cdef int _hour(unsigned long long raw):
+    return <int>raw if raw <= 23 else 0
+
+
+cdef int _minute(unsigned long long raw):
+    return <int>raw if raw <= 60 else 60
+
+
+cdef int _maneuver(unsigned long long raw):
+    return <int>raw if raw <= 2 else 0
+
+
+cdef int _shiptype(unsigned long long raw):
+    return <int>raw if raw <= 99 else 0
+
+
+cdef _decode_position_a(_Bits b, dict msg):
+    msg['status'] = b.uint(38, 4)
+    msg['turn'] = _turn(b.sint(42, 8))
+    msg['speed'] = _speed(b.uint(50, 10))
+    msg['accuracy'] = b.uint(60, 1)
+    msg['lon'] = _latlon(b.sint(61, 28))
+    msg['lat'] = _latlon(b.sint(89, 27))
+    msg['course'] = _course(b.uint(116, 12))
+    msg['heading'] = _heading(b.uint(128, 9))
+    msg['second'] = _second(b.uint(137, 6))
+    msg['maneuver'] = _maneuver(b.uint(143, 2))
+    msg['spare'] = b.uint(145, 3)
+    msg['raim'] = b.uint(148, 1)
+    msg['radio'] = b.uint(149, 19)
+
+
+cdef _decode_base_station(_Bits b, dict msg):
+    msg['year'] = b.uint(38, 14)
+    msg['month'] = _month(b.uint(52, 4))
+    msg['day'] = b.uint(56, 5)
+    msg['hour'] = _hour(b.uint(61, 5))
+    msg['minute'] = _minute(b.uint(66, 6))
+    msg['second'] = _second(b.uint(72, 6))
+    msg['accuracy'] = b.uint(78, 1)
+    msg['lon'] = _latlon(b.sint(79, 28))
+    msg['lat'] = _latlon(b.sint(107, 27))
+    msg['epfd'] = b.uint(134, 4)
+    msg['spare'] = b.uint(138, 10)
+    msg['raim'] = b.uint(148, 1)
+    msg['radio'] = b.uint(149, 19)
+
+
+cdef _decode_static_voyage(_Bits b, dict msg):
+    msg['ais_version'] = b.uint(38, 2)
+    msg['imo'] = b.uint(40, 30)
+    msg['callsign'] = b.text(70, 42)
+    msg['shipname'] = b.text(112, 120)
+    msg['shiptype'] = _shiptype(b.uint(232, 8))
+    msg['to_bow'] = b.uint(240, 9)
+    msg['to_stern'] = b.uint(249, 9)
+    msg['to_port'] = b.uint(258, 6)
+    msg['to_starboard'] = b.uint(264, 6)
+    msg['epfd'] = b.uint(270, 4)
+    msg['month'] = _month(b.uint(274, 4))
+    msg['day'] = b.uint(278, 5)
+    msg['hour'] = _hour(b.uint(283, 5))
+    msg['minute'] = _minute(b.uint(288, 6))
+    msg['draught'] = b.uint(294, 8) / 10.0
+    msg['destination'] = b.text(302, 120)
+    msg['dte'] = b.uint(422, 1)
+    msg['spare'] = b.uint(423, 1)
+
+
+cdef _decode_position_b(_Bits b, dict msg):
+    msg['speed'] = _speed(b.uint(46, 10))
+    msg['accuracy'] = b.uint(56, 1)
+    msg['lon'] = _latlon(b.sint(57, 28))
+    msg['lat'] = _latlon(b.sint(85, 27))
+    msg['course'] = _course(b.uint(112, 12))
+    msg['heading'] = _heading(b.uint(124, 9))
+    msg['second'] = _second(b.uint(133, 6))
+    msg['regional'] = b.uint(139, 2)
+    msg['cs'] = b.uint(141, 1)
+    msg['display'] = b.uint(142, 1)
+    msg['dsc'] = b.uint(143, 1)
+    msg['band'] = b.uint(144, 1)
+    msg['msg22'] = b.uint(145, 1)
+    msg['assigned'] = b.uint(146, 1)
+    msg['raim'] = b.uint(147, 1)
+    msg['radio'] = b.uint(148, 20)
+
+
+cdef _decode_position_b_extended(_Bits b, dict msg):
+    msg['speed'] = _speed(b.uint(46, 10))
+    msg['accuracy'] = b.uint(56, 1)
+    msg['lon'] = _latlon(b.sint(57, 28))
+    msg['lat'] = _latlon(b.sint(85, 27))
+    msg['course'] = _course(b.uint(112, 12))
+    msg['heading'] = _heading(b.uint(124, 9))
+    msg['second'] = _second(b.uint(133, 6))
+    msg['regional'] = b.uint(139, 4)
+    msg['shipname'] = b.text(143, 120)
+    msg['shiptype'] = _shiptype(b.uint(263, 8))
+    msg['to_bow'] = b.uint(271, 9)
+    msg['to_stern'] = b.uint(280, 9)
+    msg['to_port'] = b.uint(289, 6)
+    msg['to_starboard'] = b.uint(295, 6)
+    msg['epfd'] = b.uint(301, 4)
+    msg['raim'] = b.uint(305, 1)
+    msg['dte'] = b.uint(306, 1)
+    msg['assigned'] = b.uint(307, 1)
+
+
+cdef _decode_aid_to_navigation(_Bits b, dict msg):
+    cdef str name
+    cdef str extension
+    msg['aid_type'] = b.uint(38, 5)
+    name = b.text(43, 120)
+    if b.nbits > 272:
+        extension = b.text(272, b.nbits - 272)
+        if extension:
+            name = (name or '') + extension
+    msg['name'] = name
+    msg['accuracy'] = b.uint(163, 1)
+    msg['lon'] = _latlon(b.sint(164, 28))
+    msg['lat'] = _latlon(b.sint(192, 27))
+    msg['to_bow'] = b.uint(219, 9)
+    msg['to_stern'] = b.uint(228, 9)
+    msg['to_port'] = b.uint(237, 6)
+    msg['to_starboard'] = b.uint(243, 6)
+    msg['epfd'] = b.uint(249, 4)
+    msg['second'] = _second(b.uint(253, 6))
+    msg['regional'] = b.uint(260, 8)
+    msg['raim'] = b.uint(268, 1)
+    msg['assigned'] = b.uint(270, 1)
+
+
+cdef _decode_static_data(_Bits b, dict msg):
+    cdef int partno = b.uint(38, 2)
+    msg['partno'] = partno
+    if partno == 0:
+        msg['shipname'] = b.text(40, 120)
+    else:
+        msg['shiptype'] = _shiptype(b.uint(40, 8))
+        msg['vendorid'] = b.text(48, 18)
+        msg['model'] = b.uint(66, 4)
+        msg['serial'] = b.uint(70, 20)
+        msg['callsign'] = b.text(90, 42)
+        # Auxiliary craft report their mothership instead of dimensions
+        if msg['mmsi'] // 10000000 == 98:
+            msg['mothership_mmsi'] = b.uint(132, 30)
+        else:
+            msg['to_bow'] = b.uint(132, 9)
+            msg['to_stern'] = b.uint(141, 9)
+            msg['to_port'] = b.uint(150, 6)
+            msg['to_starboard'] = b.uint(156, 6)
+
+
+def decode(payload):
+
+    """
+    Decode a complete, possibly reassembled, AIVDM payload.  Message types
+    1, 2, 3, 4, 5, 11, 18, 19, 21, and 24 are fully decoded.  Only `type`,
+    `repeat`, and `mmsi` are decoded for all other types.
+
+    Parameters
+    ----------
+    payload : str or bytes
+        Armored 6-bit payload.
+
+    Raises
+    ------
+    ValueError
+        Payload contains characters outside of the 6-bit armor alphabet.
+
+    Returns
+    -------
+    dict
+        Decoded fields.
+    """
+
+    cdef _Bits b = _Bits()
+    b.load(payload)
+    cdef int mtype = b.uint(0, 6)
+    cdef dict msg = {
+        'type': mtype,
+        'repeat': b.uint(6, 2),
+        'mmsi': b.uint(8, 30)
+    }
+
+    if 1 <= mtype <= 3:
+        _decode_position_a(b, msg)
+    elif mtype == 4 or mtype == 11:
+        _decode_base_station(b, msg)
+    elif mtype == 5:
+        _decode_static_voyage(b, msg)
+    elif mtype == 18:
+        _decode_position_b(b, msg)
+    elif mtype == 19:
+        _decode_position_b_extended(b, msg)
+    elif mtype == 21:
+        _decode_aid_to_navigation(b, msg)
+    elif mtype == 24:
+        _decode_static_data(b, msg)
+
+    return msg
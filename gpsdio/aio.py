@@ -0,0 +1,559 @@
+"""
+Asynchronous message I/O for ``asyncio`` applications.
+
+Drivers, compression, and validation all block, so the work is handed to an
+executor in batches of messages.  The event loop only waits once per batch
+rather than once per message, and bounded queues between the loop and the
+executor provide backpressure.
+
+
+async with gpsdio.aopen(infile) as src, gpsdio.aopen(outfile, 'w') as dst:
+    async for msg in src:
+        await dst.write(msg)
+
+`ingest()` consumes a live TCP feed natively with ``asyncio`` streams and
+`replay()` serves a file over TCP for testing and benchmarking.  Requires
+Python 3.5 or later, so `run()` and `serve()` stand in for `asyncio.run()`
+and `serve_forever()`, which were added in Python 3.7.
+"""
+
+
+import asyncio
+import collections
+import datetime
+import functools
+import itertools
+import logging
+import os
+
+import gpsdio.io
+import gpsdio.net
+
+
+logger = logging.getLogger('gpsdio')
+
+
+_DONE = object()
+
+
+def aopen(name, mode='r', batch_size=1000, queue_size=4, executor=None, **kwargs):
+
+    """
+    Return an `AsyncGPSDIOReader()` or `AsyncGPSDIOWriter()` wrapping the
+    stream produced by `gpsdio.open()`.  The file is not actually opened until
+    the object is entered with `async with` or first used.
+
+    Parameters
+    ----------
+    name : str or file-like object
+        Passed to `gpsdio.open()`.
+    mode : str, optional
+        Read, write, or append.
+    batch_size : int, optional
+        Number of messages read or written per executor call.
+    queue_size : int, optional
+        Maximum number of batches held between the event loop and the
+        executor.  Readers stop reading ahead and writers block on `write()`
+        when the queue is full.
+    executor : concurrent.futures.Executor, optional
+        Run blocking work in this executor instead of the loop's default.
+    kwargs : **kwargs, optional
+        Additional arguments for `gpsdio.open()`.
+
+    Returns
+    -------
+    AsyncGPSDIOReader
+        If reading.
+    AsyncGPSDIOWriter
+        If writing or appending.
+    """
+
+    if batch_size < 1:
+        raise ValueError("Batch size must be at least 1, not: {}".format(batch_size))
+    if queue_size < 1:
+        raise ValueError("Queue size must be at least 1, not: {}".format(queue_size))
+
+    if mode == 'r':
+        cls = AsyncGPSDIOReader
+    elif mode in ('w', 'a'):
+        cls = AsyncGPSDIOWriter
+    else:
+        raise ValueError("Mode '{}' is invalid.".format(mode))
+
+    return cls(
+        name, mode=mode, batch_size=batch_size, queue_size=queue_size,
+        executor=executor, **kwargs)
+
+
+def _read_batch(stream, size):
+    return list(itertools.islice(stream, size))
+
+
+def _write_batch(stream, batch):
+    write = stream.write
+    for msg in batch:
+        write(msg)
+
+
+class _AsyncBaseStream(object):
+
+    def __init__(self, name, mode='r', batch_size=1000, queue_size=4, executor=None,
+                 **kwargs):
+        self._name = name
+        self._mode = mode
+        self._batch_size = batch_size
+        self._queue_size = queue_size
+        self._executor = executor
+        self._open_kwargs = kwargs
+        self._stream = None
+        self._queue = None
+        self._task = None
+        self._closed = False
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args))
+
+    async def _ensure_open(self):
+        if self._closed:
+            raise ValueError("I/O operation on closed stream.")
+        if self._stream is None:
+            self._stream = await self._run(
+                functools.partial(gpsdio.io.open, self._name, mode=self._mode,
+                                  **self._open_kwargs))
+            self._queue = asyncio.Queue(maxsize=self._queue_size)
+
+    async def __aenter__(self):
+        await self._ensure_open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @property
+    def stream(self):
+
+        """
+        The underlying `GPSDIOReader()` or `GPSDIOWriter()`.  `None` until the
+        stream has been opened.
+        """
+
+        return self._stream
+
+    @property
+    def schema(self):
+        return self._stream.schema if self._stream is not None else None
+
+    @property
+    def mode(self):
+        return self._mode
+
+    @property
+    def closed(self):
+        return self._closed
+
+    @property
+    def name(self):
+        if self._stream is not None:
+            return self._stream.name
+        return getattr(self._name, 'name', self._name)
+
+    async def close(self):
+        raise NotImplementedError
+
+
+class AsyncGPSDIOReader(_AsyncBaseStream):
+
+    """
+    Read GPSd messages with `async for`.  A background task reads batches of
+    messages in an executor and places them in a bounded queue.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(AsyncGPSDIOReader, self).__init__(*args, **kwargs)
+        self._batch = collections.deque()
+        self._pending = None
+        self._exhausted = False
+
+    async def _produce(self):
+        try:
+            while True:
+                # Shield the executor call so that a cancelled reader can
+                # wait for the in-flight batch before closing the stream.
+                self._pending = asyncio.ensure_future(
+                    self._run(_read_batch, self._stream, self._batch_size))
+                batch = await asyncio.shield(self._pending)
+                if not batch:
+                    break
+                await self._queue.put(batch)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await self._queue.put(e)
+        else:
+            await self._queue.put(_DONE)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+
+        """
+        Get the next GPSd message, waiting for another batch if necessary.
+        """
+
+        if not self._batch:
+            if self._exhausted:
+                raise StopAsyncIteration
+            await self._ensure_open()
+            if self._task is None:
+                self._task = asyncio.ensure_future(self._produce())
+            batch = await self._queue.get()
+            if batch is _DONE:
+                self._exhausted = True
+                raise StopAsyncIteration
+            elif isinstance(batch, Exception):
+                self._exhausted = True
+                raise batch
+            self._batch.extend(batch)
+        return self._batch.popleft()
+
+    async def close(self):
+
+        """
+        Stop reading ahead and close the underlying stream.
+        """
+
+        if self._closed:
+            return
+        self._closed = True
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._pending is not None and not self._pending.done():
+            await asyncio.wait([self._pending])
+        self._batch.clear()
+        if self._stream is not None:
+            await self._run(self._stream.close)
+
+
+class AsyncGPSDIOWriter(_AsyncBaseStream):
+
+    """
+    Write GPSd messages with `await dst.write(msg)`.  Messages are buffered
+    into batches that a background task validates and writes in an executor.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(AsyncGPSDIOWriter, self).__init__(*args, **kwargs)
+        self._buffer = []
+        self._error = None
+
+    async def _consume(self):
+        while True:
+            batch = await self._queue.get()
+            try:
+                if batch is _DONE:
+                    break
+                elif self._error is None:
+                    await self._run(_write_batch, self._stream, batch)
+            except Exception as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    async def _submit(self, batch):
+        await self._ensure_open()
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._consume())
+        await self._queue.put(batch)
+
+    async def write(self, msg):
+
+        """
+        Buffer a message for writing.  Waits only when a full batch must be
+        handed to a full queue.  Errors raised while writing a previous batch
+        are raised here.
+
+        Parameters
+        ----------
+        msg : dict
+            GPSd message.
+        """
+
+        self._raise_error()
+        if self._closed:
+            raise ValueError("I/O operation on closed stream.")
+        self._buffer.append(msg)
+        if len(self._buffer) >= self._batch_size:
+            batch, self._buffer = self._buffer, []
+            await self._submit(batch)
+
+    async def flush(self):
+
+        """
+        Wait for all buffered messages to be written and flush the underlying
+        stream.
+        """
+
+        if self._buffer:
+            batch, self._buffer = self._buffer, []
+            await self._submit(batch)
+        if self._queue is not None:
+            await self._queue.join()
+        self._raise_error()
+        if self._stream is not None and not self._closed:
+            await self._run(self._stream.flush)
+
+    async def close(self):
+
+        """
+        Flush all pending messages and close the underlying stream.
+        """
+
+        if self._closed:
+            return
+        try:
+            await self.flush()
+        finally:
+            self._closed = True
+            if self._task is not None:
+                await self._queue.put(_DONE)
+                await self._task
+            if self._stream is not None:
+                await self._run(self._stream.close)
+
+
+async def ingest(url, dst, driver='NMEA', do=None, batch_size=1000, flush_interval=5.0,
+                 max_messages=None, executor=None, **kwargs):
+
+    """
+    Read a TCP feed until it closes and write to an asynchronous writer.
+    Lines are gathered in batches of up to `batch_size` and decoded in an
+    executor.  A partial batch is decoded and `dst` is flushed whenever
+    `flush_interval` seconds pass, even when the feed is quiet.
+
+    Example:
+
+        >>> async with gpsdio.aopen('out.msg.gz', 'w') as dst:
+        ...     await gpsdio.aio.ingest('tcp://localhost:5000', dst)
+
+    Parameters
+    ----------
+    url : str
+        Like `tcp://host:port`.
+    dst : gpsdio.aio.AsyncGPSDIOWriter
+        Messages are written here.
+    driver : str, optional
+        Decode lines with this driver.
+    do : dict, optional
+        Driver options.
+    batch_size : int, optional
+        Maximum number of lines decoded per executor call.
+    flush_interval : float, optional
+        Seconds between flushes.
+    max_messages : int, optional
+        Stop after writing this many messages.
+    executor : concurrent.futures.Executor, optional
+        Decode in this executor instead of the loop's default.
+    kwargs : **kwargs, optional
+        Additional arguments for `gpsdio.open()` when creating the decoder.
+
+    Returns
+    -------
+    int
+        Number of messages written.
+    """
+
+    loop = asyncio.get_event_loop()
+    host, port = gpsdio.net.parse_url(url)
+    buf = gpsdio.net.LineBuffer(url)
+    src = gpsdio.io.open(buf, driver=driver, compression=False, do=do, **kwargs)
+
+    def decode(lines):
+        buf.feed(lines)
+        return list(src)
+
+    reader, writer = await asyncio.open_connection(host, port)
+    logger.debug("Connected to %s", url)
+
+    count = 0
+    lines = []
+    last_flush = loop.time()
+    eof = False
+    try:
+        while not eof:
+            timeout = max(0, last_flush + flush_interval - loop.time())
+            try:
+                line = await asyncio.wait_for(reader.readline(), timeout)
+            except asyncio.TimeoutError:
+                line = None
+            if line == b'':
+                eof = True
+            elif line is not None:
+                lines.append(line)
+
+            flush_due = loop.time() - last_flush >= flush_interval
+            if lines and (len(lines) >= batch_size or flush_due or eof):
+                batch, lines = lines, []
+                for msg in await loop.run_in_executor(executor, decode, batch):
+                    await dst.write(msg)
+                    count += 1
+                    if max_messages is not None and count >= max_messages:
+                        eof = True
+                        break
+            if flush_due or eof:
+                await dst.flush()
+                last_flush = loop.time()
+    finally:
+        writer.close()
+        src.close()
+
+    logger.debug("Wrote %s messages from %s", count, url)
+    return count
+
+
+def run(coro):
+
+    """
+    Run a coroutine in a new event loop and close the loop, like
+    `asyncio.run()`.  The coroutine is cancelled if it is interrupted, like
+    with `KeyboardInterrupt`.
+
+    Parameters
+    ----------
+    coro : coroutine
+        Coroutine to run.
+
+    Returns
+    -------
+    object
+        The coroutine's result.
+    """
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    task = asyncio.ensure_future(coro, loop=loop)
+    try:
+        return loop.run_until_complete(task)
+    finally:
+        try:
+            if not task.done():
+                task.cancel()
+                try:
+                    loop.run_until_complete(task)
+                except asyncio.CancelledError:
+                    pass
+            if hasattr(loop, 'shutdown_asyncgens'):
+                loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
+
+async def serve(server):
+
+    """
+    Wait until cancelled and then close a server, like
+    `asyncio.AbstractServer.serve_forever()`.
+
+    Parameters
+    ----------
+    server : asyncio.AbstractServer
+        Server to close, like from `replay()`.
+    """
+
+    try:
+        while True:
+            await asyncio.sleep(3600)
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+def _open_lines(path):
+
+    """
+    Open a file for reading raw lines, decompressing if the extension
+    matches a compression driver.
+    """
+
+    from gpsdio.drivers import _COMPRESSION_BY_EXT
+
+    ext = os.path.splitext(path)[1].strip('.')
+    if ext in _COMPRESSION_BY_EXT:
+        drv = _COMPRESSION_BY_EXT[ext]()
+        return drv.open(path, mode='r')
+    return open(path, 'rb')
+
+
+async def replay(path, host='127.0.0.1', port=0, rate=None, repeat=1):
+
+    """
+    Start a TCP server that streams the lines of a file to every client that
+    connects and then closes the connection.  Intended for testing and
+    benchmarking `ingest()` and other feed consumers without external
+    services.
+
+    Example:
+
+        >>> server = await gpsdio.aio.replay('tests/data/types.nmea', rate=100)
+        >>> host, port = server.sockets[0].getsockname()[:2]
+
+    Parameters
+    ----------
+    path : str
+        File to stream.  GZIP and BZ2 files are decompressed.
+    host : str, optional
+        Interface to listen on.
+    port : int, optional
+        Port to listen on.  0 picks a free port.
+    rate : float, optional
+        Lines per second.  Stream as fast as possible if `None`.
+    repeat : int, optional
+        Number of times to stream the file per connection.
+
+    Returns
+    -------
+    asyncio.AbstractServer
+    """
+
+    loop = asyncio.get_event_loop()
+
+    async def handle(reader, writer):
+        peer = writer.get_extra_info('peername')
+        logger.debug("Replaying %s to %s", path, peer)
+        sent = 0
+        start = loop.time()
+        try:
+            for _ in range(repeat):
+                with _open_lines(path) as f:
+                    for line in f:
+                        if not line.endswith(b'\n'):
+                            line += b'\n'
+                        writer.write(line)
+                        sent += 1
+                        if rate:
+                            delay = start + sent / float(rate) - loop.time()
+                            if delay > 0:
+                                await writer.drain()
+                                await asyncio.sleep(delay)
+                        elif sent % 1000 == 0:
+                            await writer.drain()
+            await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            logger.debug("Connection to %s closed early", peer)
+        finally:
+            writer.close()
+        logger.debug("Sent %s lines to %s in %s", sent, peer,
+                     datetime.timedelta(seconds=loop.time() - start))
+
+    return await asyncio.start_server(handle, host=host, port=port)
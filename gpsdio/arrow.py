@@ -0,0 +1,438 @@
+"""
+Convert between messages and Apache Arrow record batches.
+
+Every message type shares a single Arrow schema containing the union of all
+fields in the gpsdio schema, with `type` first.  Fields that aren't part of
+a message's type are null, and are dropped when converting back to messages.
+Column types are derived from the field validators with
+`gpsdio.schema.field_type()`.
+"""
+
+
+from collections import OrderedDict
+from itertools import repeat
+import logging
+import tempfile
+
+import six
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pragma: no cover
+    pa = pc = None
+
+from gpsdio.schema import field_type
+from gpsdio.validate import str2datetime
+import gpsdio.where
+
+
+logger = logging.getLogger('gpsdio')
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Arrow and Parquet support requires pyarrow")
+
+
+def _arrow_type(kind):
+    return {
+        'int': pa.int64(),
+        'float': pa.float64(),
+        'str': pa.string(),
+        'datetime': pa.timestamp('us'),
+    }.get(kind)
+
+
+def arrow_schema(schema):
+
+    """
+    Build an Arrow schema containing every field in a gpsdio schema.
+
+    Parameters
+    ----------
+    schema : dict
+        From `gpsdio.schema.build_schema()`.
+
+    Returns
+    -------
+    pyarrow.Schema
+        Fields appear in the order they are first encountered when iterating
+        over message types in ascending order.  Fields whose type can't be
+        determined are skipped.
+    """
+
+    _require_pyarrow()
+
+    fields = [pa.field('type', pa.int32())]
+    seen = {'type'}
+    for mtype in sorted(schema):
+        for name, definition in six.iteritems(schema[mtype]):
+            if name in seen:
+                continue
+            seen.add(name)
+            arrow_type = _arrow_type(field_type(definition['validate'])[0])
+            if arrow_type is None:
+                logger.debug("Skipping field '%s' - can't determine its Arrow type", name)
+                continue
+            fields.append(pa.field(name, arrow_type))
+    return pa.schema(fields)
+
+
+def type_fields(schema, columns):
+
+    """
+    Get the fields for each message type that are present in a set of columns.
+
+    Parameters
+    ----------
+    schema : dict
+        From `gpsdio.schema.build_schema()`.
+    columns : iterable
+        Column names.
+
+    Returns
+    -------
+    dict
+        `{type: ('field', ...)}`
+    """
+
+    columns = set(columns)
+    return {mtype: tuple(name for name in fields if name in columns)
+            for mtype, fields in six.iteritems(schema)}
+
+
+def messages_to_batch(msgs, arrow_schema):
+
+    """
+    Convert messages to a record batch.  Fields that are not in the Arrow
+    schema are dropped.
+
+    Parameters
+    ----------
+    msgs : list
+        GPSd messages.
+    arrow_schema : pyarrow.Schema
+        From `arrow_schema()`.
+
+    Returns
+    -------
+    pyarrow.RecordBatch
+    """
+
+    arrays = []
+    for field in arrow_schema:
+        name = field.name
+        values = [m.get(name) for m in msgs]
+        if pa.types.is_timestamp(field.type):
+            values = [str2datetime(v) if isinstance(v, six.string_types) else v
+                      for v in values]
+        try:
+            arrays.append(pa.array(values, type=field.type))
+        except pa.ArrowTypeError:
+            if not pa.types.is_integer(field.type):
+                raise
+            # Flags are sometimes booleans
+            arrays.append(pa.array(
+                [None if v is None else int(v) for v in values], type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=arrow_schema)
+
+
+def batch_to_messages(batch, fields_by_type):
+
+    """
+    Convert a record batch to messages.
+
+    Parameters
+    ----------
+    batch : pyarrow.RecordBatch or pyarrow.Table
+        Must contain a `type` column.
+    fields_by_type : dict
+        From `type_fields()`.  Messages with types that aren't present
+        receive every non-null column.
+
+    Returns
+    -------
+    list
+        GPSd messages.
+    """
+
+    names = batch.schema.names
+    types = batch.column(names.index('type'))
+    out = [None] * batch.num_rows
+
+    # Convert one type at a time so each message can be built from a row of
+    # only that type's columns
+    for mtype in pc.unique(types).to_pylist():
+        mask = pc.is_null(types) if mtype is None else pc.equal(types, mtype)
+        rows = batch.filter(mask)
+        fields = fields_by_type.get(mtype)
+        if fields is None:
+            msgs = [{n: v for n, v in six.iteritems(row) if v is not None}
+                    for row in rows.to_pylist()]
+        else:
+            columns = [rows.column(names.index(n)).to_pylist() for n in fields]
+            msgs = six.moves.map(dict, six.moves.map(zip, repeat(fields), zip(*columns)))
+        for i, msg in zip(pc.indices_nonzero(mask).to_pylist(), msgs):
+            out[i] = msg
+    return out
+
+
+def batches_to_messages(batches, fields_by_type):
+
+    """
+    A generator converting record batches to messages.
+
+    Parameters
+    ----------
+    batches : iterable
+        Producing `pyarrow.RecordBatch()` objects.
+    fields_by_type : dict
+        See `batch_to_messages()`.
+
+    Yields
+    ------
+    dict
+        GPSd messages.
+    """
+
+    for batch in batches:
+        for msg in batch_to_messages(batch, fields_by_type):
+            yield msg
+
+
+def _clause_mask(batch, field, op, value):
+
+    """
+    Evaluate a single clause against a batch with the same semantics as
+    `gpsdio.where.matches()`.  Returns a boolean array that may contain nulls,
+    which don't match.
+    """
+
+    ops = {
+        '==': pc.equal,
+        '!=': pc.not_equal,
+        '<': pc.less,
+        '<=': pc.less_equal,
+        '>': pc.greater,
+        '>=': pc.greater_equal,
+    }
+
+    names = batch.schema.names
+    if field not in names:
+        matches_none = (op == '==' and value is None) or (op == 'in' and None in value)
+        return pa.repeat(matches_none, batch.num_rows)
+    column = batch.column(names.index(field))
+
+    if op in ('in', 'not in'):
+        values = [v for v in value if v is not None]
+        result = pc.is_in(column, value_set=pa.array(values, type=column.type))
+        if op == 'in' and len(values) != len(value):
+            return pc.or_(result, pc.is_null(column))
+        elif op == 'not in':
+            return pc.and_(pc.invert(result), pc.is_valid(column))
+        return result
+    elif value is None:
+        if op == '==':
+            return pc.is_null(column)
+        elif op == '!=':
+            return pc.is_valid(column)
+        return pa.repeat(False, batch.num_rows)
+    return ops[op](column, pa.scalar(value))
+
+
+def filter_batch(batch, where, exact=False):
+
+    """
+    Remove rows that don't satisfy a predicate with vectorized comparisons.
+
+    Parameters
+    ----------
+    batch : pyarrow.RecordBatch
+        Data to filter.
+    where : list
+        Clauses from `gpsdio.where.normalize()`.
+    exact : bool, optional
+        Raise an exception if a clause can't be evaluated with Arrow, like
+        when comparing a column to an incompatible value.  Otherwise these
+        clauses are ignored, so the output may contain rows that don't match
+        but never lacks a row that does.
+
+    Raises
+    ------
+    ValueError
+        If `exact=True` and a clause can't be evaluated.
+
+    Returns
+    -------
+    pyarrow.RecordBatch
+    """
+
+    mask = None
+    for clause in where:
+        try:
+            result = _clause_mask(batch, *clause)
+        except (pa.ArrowException, TypeError, ValueError, OverflowError) as e:
+            if exact:
+                raise ValueError("Can't evaluate {} with Arrow: {}".format(clause, e))
+            logger.debug("Can't evaluate clause with Arrow: %s", clause)
+            continue
+        mask = result if mask is None else pc.and_kleene(mask, result)
+
+    if mask is None:
+        return batch
+    return batch.filter(mask, null_selection_behavior='drop')
+
+
+def row_group_matches(row_group, where_bounds):
+
+    """
+    Determine if a Parquet row group could contain rows satisfying a
+    predicate based on its column statistics.
+
+    Parameters
+    ----------
+    row_group : pyarrow.parquet.RowGroupMetaData
+        Row group metadata.
+    where_bounds : dict
+        From `gpsdio.where.bounds()`.
+
+    Returns
+    -------
+    bool
+    """
+
+    for i in range(row_group.num_columns):
+        column = row_group.column(i)
+        name = column.path_in_schema
+        stats = column.statistics
+        if name not in where_bounds or stats is None or not stats.has_min_max:
+            continue
+        if not gpsdio.where.overlaps(where_bounds, name, stats.min, stats.max):
+            return False
+    return True
+
+
+def read_ipc(source):
+
+    """
+    Open an Arrow IPC file or stream.
+
+    Parameters
+    ----------
+    source : pyarrow.NativeFile
+        Seekable source, like a memory map.
+
+    Returns
+    -------
+    tuple
+        `(schema, batches)` where `batches` is an iterator producing
+        `pyarrow.RecordBatch()` objects.
+    """
+
+    try:
+        reader = pa.ipc.open_file(source)
+        return reader.schema, (reader.get_batch(i) for i in range(reader.num_record_batches))
+    except pa.ArrowInvalid:
+        source.seek(0)
+        reader = pa.ipc.open_stream(source)
+        return reader.schema, iter(reader)
+
+
+def conform_batch(batch, arrow_schema):
+
+    """
+    Add null columns to a batch so it matches a schema with more fields.
+
+    Parameters
+    ----------
+    batch : pyarrow.RecordBatch
+        Data.
+    arrow_schema : pyarrow.Schema
+        Must contain every field in the batch.
+
+    Returns
+    -------
+    pyarrow.RecordBatch
+    """
+
+    names = batch.schema.names
+    arrays = [batch.column(names.index(field.name)) if field.name in names
+              else pa.nulls(batch.num_rows, type=field.type)
+              for field in arrow_schema]
+    return pa.RecordBatch.from_arrays(arrays, schema=arrow_schema)
+
+
+class TypedBatchWriter(object):
+
+    """
+    Write messages to an Arrow IPC file with one message type per record
+    batch.  Batches are held in a temporary IPC stream for each type until
+    `close()` writes the final file, whose columns are the union of the
+    fields of every type that was written.
+    """
+
+    def __init__(self, schema, batch_size=65536, compression=None):
+
+        """
+        Parameters
+        ----------
+        schema : dict
+            From `gpsdio.schema.build_schema()`.
+        batch_size : int, optional
+            Maximum number of messages per batch.
+        compression : str, optional
+            Compress the final file's batches with 'lz4' or 'zstd'.
+        """
+
+        _require_pyarrow()
+
+        self._schema = schema
+        self._batch_size = batch_size
+        self._options = pa.ipc.IpcWriteOptions(compression=compression)
+        self._buffers = OrderedDict()
+        self._streams = OrderedDict()
+
+    def write(self, msg):
+        mtype = msg['type']
+        buf = self._buffers.get(mtype)
+        if buf is None:
+            if mtype not in self._schema:
+                raise ValueError("Can't write type {} - not in the schema".format(mtype))
+            buf = self._buffers[mtype] = []
+        buf.append(msg)
+        if len(buf) >= self._batch_size:
+            self._flush(mtype)
+
+    def _flush(self, mtype):
+        msgs, self._buffers[mtype] = self._buffers[mtype], []
+        if not msgs:
+            return
+        if mtype not in self._streams:
+            type_schema = arrow_schema({mtype: self._schema[mtype]})
+            tmp = tempfile.TemporaryFile()
+            self._streams[mtype] = (tmp, pa.ipc.new_stream(tmp, type_schema), type_schema)
+        _, writer, type_schema = self._streams[mtype]
+        writer.write_batch(messages_to_batch(msgs, type_schema))
+
+    def close(self, f):
+
+        """
+        Write the final file.
+
+        Parameters
+        ----------
+        f : file
+            Open in binary write mode.
+        """
+
+        for mtype in list(self._buffers):
+            self._flush(mtype)
+        union = arrow_schema({mtype: self._schema[mtype] for mtype in self._streams})
+        with pa.ipc.new_file(f, union, options=self._options) as writer:
+            for tmp, stream, _ in six.itervalues(self._streams):
+                stream.close()
+                tmp.seek(0)
+                for batch in pa.ipc.open_stream(tmp):
+                    writer.write_batch(conform_batch(batch, union))
+                tmp.close()
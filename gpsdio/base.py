@@ -61,6 +61,16 @@ class GPSDIOBaseStream(object):
     def schema(self):
         return self._schema
 
+    @property
+    def driver(self):
+
+        """
+        The driver instance messages are read from or written to, which
+        provides access to driver specific features.
+        """
+
+        return self._stream
+
     def validate_msg(self, msg):
 
         """
@@ -107,7 +117,7 @@ class GPSDIOBaseStream(object):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self._stream.close()
+        self.close()
 
     @property
     def closed(self):
@@ -157,6 +167,17 @@ class BaseDriver(six.with_metaclass(_DriverRegistry, object)):
     by_extension = {}
     driver_name = 'BaseDriver'  # Use driver_name to prevent a file.name collision
 
+    # Drivers that can skip data using `gpsdio.where` clauses set this to
+    # receive them through a `where` driver option.  The reader still checks
+    # every message so drivers are free to produce extra messages.
+    supports_where = False
+
+    # Drivers that can access messages by position set this and implement
+    # `__len__()`, `__getitem__()`, and `seek()` with message positions.
+    # Other drivers can implement `tell()` and `seek()` with byte offsets,
+    # which readers combine with an offset table from `gpsdio.index`.
+    random_access = False
+
     def __init__(self, schema=None):
         self._f = None
         self._schema = schema
@@ -169,6 +190,9 @@ class BaseDriver(six.with_metaclass(_DriverRegistry, object)):
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
 
+    def __iter__(self):
+        return self
+
     def __next__(self):
         return self.load(next(self.f))
 
@@ -177,6 +201,9 @@ class BaseDriver(six.with_metaclass(_DriverRegistry, object)):
     def write(self, msg):
         return self.f.write(self.dump(msg))
 
+    def flush(self):
+        return self.f.flush()
+
     @property
     def name(self):
         return self._f.name
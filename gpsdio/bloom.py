@@ -0,0 +1,336 @@
+"""
+Bloom filter sidecars recording which MMSIs appear in a file.
+
+A filter is written next to a file, like `positions.json.bloom`, by
+`write()`, `build()`, `gpsdio info --bloom`, `gpsdio index --bloom`, or
+`gpsdio.open(path, 'w', bloom=True)`.  Multi-file reads with an `mmsi`
+filter, like `gpsdio etl DIRECTORY --mmsi ...`, only open files whose filter
+might contain one of the vessels.  Filters never miss an MMSI that is in the
+file but report absent MMSIs as present at roughly the configured false
+positive rate.  Like indexes, filters are ignored once the file changes.
+"""
+
+
+import hashlib
+import logging
+import math
+import os
+import struct
+
+import msgpack
+import six
+
+import gpsdio
+
+
+logger = logging.getLogger('gpsdio')
+
+
+EXTENSION = '.bloom'
+VERSION = 1
+
+# Default false positive rate
+RATE = 0.01
+
+
+def bloom_path(path):
+
+    """
+    Get the path to a file's Bloom filter.
+    """
+
+    return path + EXTENSION
+
+
+class BloomFilter(object):
+
+    """
+    A set of values that can have false positives but no false negatives.
+    Values are hashed with MD5 so filters are the same across processes and
+    platforms.
+    """
+
+    def __init__(self, num_bits, num_hashes, bits=None, file_size=None, mtime=None):
+
+        """
+        Parameters
+        ----------
+        num_bits : int
+            Size of the filter in bits.  Rounded up to a multiple of 8.
+        num_hashes : int
+            Number of bits set for each value.
+        bits : bytes, optional
+            Filter contents.
+        file_size : int, optional
+            Size of the file described by the filter.
+        mtime : float, optional
+            Modification time of the file described by the filter.
+        """
+
+        self.num_bits = int(math.ceil(num_bits / 8.0)) * 8
+        self.num_hashes = num_hashes
+        self.bits = bytearray(bits if bits is not None else self.num_bits // 8)
+        self.file_size = file_size
+        self.mtime = mtime
+
+    @classmethod
+    def create(cls, values, rate=RATE, size=None, capacity=None):
+
+        """
+        Build a filter sized for a set of values.
+
+        Parameters
+        ----------
+        values : iterable
+            Values to add.
+        rate : float, optional
+            Target false positive rate.  Ignored if `size` is given.
+        size : int, optional
+            Size of the filter in bytes.
+        capacity : int, optional
+            Number of values to size the filter for when more will be added
+            later.
+
+        Raises
+        ------
+        ValueError
+            If `rate` isn't between 0 and 1 or `size` isn't positive.
+
+        Returns
+        -------
+        BloomFilter
+        """
+
+        values = set(values)
+        n = max(len(values), capacity or 0, 1)
+        if size is not None:
+            if size <= 0:
+                raise ValueError("Bloom filter size must be positive: {}".format(size))
+            num_bits = size * 8
+        elif not 0 < rate < 1:
+            raise ValueError("False positive rate must be between 0 and 1: {}".format(rate))
+        else:
+            num_bits = int(math.ceil(-n * math.log(rate) / math.log(2) ** 2))
+        num_hashes = max(1, int(round(float(num_bits) / n * math.log(2))))
+
+        bloom = cls(num_bits, num_hashes)
+        for v in values:
+            bloom.add(v)
+        return bloom
+
+    def _positions(self, value):
+        digest = hashlib.md5(str(value).encode('utf-8')).digest()
+        h1, h2 = struct.unpack('<QQ', digest)
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, value):
+
+        """
+        Add a value.
+
+        Returns
+        -------
+        bool
+            `True` if the value might already have been present.
+        """
+
+        bits = self.bits
+        present = True
+        for p in self._positions(value):
+            byte = p >> 3
+            mask = 1 << (p & 7)
+            if not bits[byte] & mask:
+                present = False
+                bits[byte] |= mask
+        return present
+
+    def __contains__(self, value):
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(value))
+
+    @property
+    def false_positive_rate(self):
+
+        """
+        Estimate the false positive rate from the fraction of bits set.
+        """
+
+        ones = sum(bin(b).count('1') for b in self.bits)
+        return (float(ones) / self.num_bits) ** self.num_hashes
+
+    def is_current(self, path):
+
+        """
+        Determine if the filter still describes a file.
+        """
+
+        stat = os.stat(path)
+        return stat.st_size == self.file_size and stat.st_mtime == self.mtime
+
+    def save(self, path):
+
+        """
+        Write the filter.
+
+        Parameters
+        ----------
+        path : str
+            Filter path.
+        """
+
+        data = {
+            'version': VERSION,
+            'num_bits': self.num_bits,
+            'num_hashes': self.num_hashes,
+            'bits': bytes(self.bits),
+            'size': self.file_size,
+            'mtime': self.mtime,
+        }
+        with open(path, 'wb') as f:
+            f.write(msgpack.packb(data, use_bin_type=True))
+
+    @classmethod
+    def load(cls, path):
+
+        """
+        Read a filter.
+
+        Parameters
+        ----------
+        path : str
+            Filter path.
+
+        Raises
+        ------
+        ValueError
+            If the filter was written by a newer version.
+
+        Returns
+        -------
+        BloomFilter
+        """
+
+        with open(path, 'rb') as f:
+            data = msgpack.unpackb(f.read(), raw=False)
+        if data['version'] > VERSION:
+            raise ValueError("Unsupported Bloom filter version: {}".format(data['version']))
+        return cls(data['num_bits'], data['num_hashes'], bits=data['bits'],
+                   file_size=data['size'], mtime=data['mtime'])
+
+
+def write(path, mmsi, rate=RATE, size=None):
+
+    """
+    Write a Bloom filter for a file whose MMSIs are already known.
+
+    Parameters
+    ----------
+    path : str
+        Data file, which must already be written and closed.
+    mmsi : iterable
+        Every MMSI in the file.
+    rate : float, optional
+        Target false positive rate.
+    size : int, optional
+        Size of the filter in bytes, which overrides `rate`.
+
+    Returns
+    -------
+    BloomFilter
+    """
+
+    bloom = BloomFilter.create(mmsi, rate=rate, size=size)
+    stat = os.stat(path)
+    bloom.file_size = stat.st_size
+    bloom.mtime = stat.st_mtime
+    bloom.save(bloom_path(path))
+    logger.debug("Wrote a %s byte Bloom filter for %s", len(bloom.bits), path)
+    return bloom
+
+
+def build(path, rate=RATE, size=None, driver=None, compression=None, do=None, co=None):
+
+    """
+    Scan a file and write its Bloom filter.
+
+    Parameters
+    ----------
+    path : str
+        File to scan.
+    rate : float, optional
+        Target false positive rate.
+    size : int, optional
+        Size of the filter in bytes, which overrides `rate`.
+    driver : str, optional
+        Driver name.  Normally detected from the path.
+    compression : str, optional
+        Compression name.  Normally detected from the path.
+    do : dict, optional
+        Driver options.
+    co : dict, optional
+        Compression options.
+
+    Returns
+    -------
+    BloomFilter
+    """
+
+    mmsi = set()
+    with gpsdio.open(path, driver=driver, compression=compression, do=do, co=co,
+                     _check=False) as src:
+        for msg in src:
+            m = msg.get('mmsi')
+            if m is not None:
+                mmsi.add(m)
+    return write(path, mmsi, rate=rate, size=size)
+
+
+def load(path):
+
+    """
+    Load a file's Bloom filter if it exists and is current.
+
+    Parameters
+    ----------
+    path : str
+        Data file.
+
+    Returns
+    -------
+    BloomFilter or None
+    """
+
+    bpath = bloom_path(path)
+    if not os.path.exists(bpath):
+        return None
+    bloom = BloomFilter.load(bpath)
+    if not bloom.is_current(path):
+        logger.warning("Ignoring %s - the file has changed since it was written", bpath)
+        return None
+    return bloom
+
+
+def might_contain(path, mmsi):
+
+    """
+    Determine if a file can contain any of several MMSIs according to its
+    Bloom filter.
+
+    Parameters
+    ----------
+    path : str
+        Data file.
+    mmsi : int or iterable
+        MMSIs to find.
+
+    Returns
+    -------
+    bool
+        `False` only if the file has a current filter and none of the MMSIs
+        are in it.
+    """
+
+    bloom = load(path)
+    if bloom is None:
+        return True
+    mmsi = [mmsi] if isinstance(mmsi, six.integer_types) else mmsi
+    return any(m in bloom for m in mmsi)
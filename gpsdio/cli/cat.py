@@ -19,7 +19,7 @@ logger = logging.getLogger('gpsdio')
 
 
 @click.command(name='cat')
-@click.argument('infile', required=True)
+@click.argument('infiles', nargs=-1, required=True)
 @click.option(
     '--geojson', is_flag=True,
     help="Experimental.  Print messages as GeoJSON.  Non-positional messages are dropped.")
@@ -29,17 +29,20 @@ logger = logging.getLogger('gpsdio')
 @options.input_compression_opts
 @options.output_driver_opts
 @click.pass_context
-def cat(ctx, infile, input_driver, geojson,
+def cat(ctx, infiles, input_driver, geojson,
         input_compression, input_driver_opts, input_compression_opts, output_driver_opts):
 
     """
     Print messages to stdout as newline JSON.
+
+    Multiple inputs, directories, and quoted globs are read concurrently and
+    concatenated.
     """
 
     logger.setLevel(ctx.obj['verbosity'])
     logger.debug('Starting cat')
 
-    with gpsdio.open(infile,
+    with gpsdio.open(infiles[0] if len(infiles) == 1 else list(infiles),
                      driver=input_driver,
                      compression=input_compression,
                      do=input_driver_opts,
@@ -3,6 +3,7 @@ gpsdio etl
 """
 
 
+import datetime
 import logging
 
 import click
@@ -16,15 +17,54 @@ logger = logging.getLogger('gpsdio')
 
 
 @click.command()
-@click.argument('infile', required=True)
+@click.argument('infiles', nargs=-1, required=True)
 @click.argument('outfile', required=True)
 @click.option(
     '--filter', 'filter_expr', metavar='EXPR', multiple=True,
     help="Apply a filtering expression to the messages.")
 @click.option(
     '--sort', 'sort_field', metavar='FIELD',
-    help="Sort output messages by field.  Holds the entire file in memory and drops messages "
-         "lacking the specified field.")
+    help="Sort output messages by field, or by several comma separated fields like "
+         "`mmsi,timestamp`.  `hilbert` or `morton` sort along a space-filling curve, and "
+         "`hilbert:time` by day and then along the curve.  Holds the entire file in memory.  "
+         "Messages lacking a field sort before messages that have it.")
+@click.option(
+    '--max-delay', metavar='SECONDS', type=click.FLOAT,
+    help="With `--sort timestamp`, sort a nearly sorted stream holding only messages within "
+         "this many seconds of the newest in memory.  Later messages are dropped.")
+@click.option(
+    '--dedupe', is_flag=True,
+    help="Drop duplicate messages, like one transmission received by several stations.")
+@click.option(
+    '--dedupe-window', metavar='SECONDS', type=click.FLOAT,
+    default=gpsdio.ops.DEDUPE_WINDOW.total_seconds(), show_default=True,
+    help="Maximum time between duplicates.")
+@click.option(
+    '--dedupe-key', metavar='FIELD', multiple=True,
+    help="Field identifying duplicates.  May be given multiple times.  Default is every "
+         "field except timestamp.")
+@click.option(
+    '--dedupe-bloom', is_flag=True,
+    help="Remember messages with Bloom filters, which use less memory but drop a small "
+         "fraction of unique messages.")
+@options.where_opt
+@click.option(
+    '--start', metavar='TIMESTAMP',
+    help="Only read messages at or after this time.  Uses the input's index, if present.")
+@click.option(
+    '--end', metavar='TIMESTAMP',
+    help="Only read messages before this time.  Uses the input's index, if present.")
+@click.option(
+    '--mmsi', type=click.INT, multiple=True,
+    help="Only read messages from this vessel.  May be given multiple times.  Uses the "
+         "input's index, if present.")
+@click.option(
+    '--assume-sorted', is_flag=True,
+    help="Each input is sorted by timestamp, so --start and --end can binary search an "
+         "uncompressed file without an index, and multiple inputs are merged by timestamp.")
+@click.option(
+    '--bbox', metavar='XMIN YMIN XMAX YMAX', type=click.FLOAT, nargs=4, default=None,
+    help="Only read messages inside this bounding box.  Uses the input's index, if present.")
 @options.input_driver
 @options.input_driver_opts
 @options.input_compression
@@ -34,15 +74,21 @@ logger = logging.getLogger('gpsdio')
 @options.output_compression
 @options.output_compression_opts
 @click.pass_context
-def etl(ctx, infile, outfile, filter_expr, sort_field,
+def etl(ctx, infiles, outfile, filter_expr, sort_field, max_delay,
+        dedupe, dedupe_window, dedupe_key, dedupe_bloom,
+        where, start, end, mmsi, assume_sorted, bbox,
         input_driver, input_driver_opts, input_compression, input_compression_opts,
         output_driver, output_driver_opts, output_compression, output_compression_opts):
 
     """
     Format conversion, filtering, and sorting.
 
-    Messages are filtered before sorting to limit the amount of data kept in
-    memory.
+    Messages are filtered and deduplicated before sorting to limit the amount
+    of data kept in memory.
+
+    Any number of inputs can be given, including directories and quoted globs
+    like "data/*.json".  Inputs are read concurrently and concatenated, or
+    merged by timestamp with `--assume-sorted`.
 
     Filtering expressions take the form of Python boolean expressions and provide
     access to fields and the entire message via a custom scope.  Each field name
@@ -70,6 +116,56 @@ def etl(ctx, infile, outfile, filter_expr, sort_field,
             --filter "timestamp.month == 5 and timestamp.year == 2010"" \\
             --filter "mmsi == 123456789"
 
+    Only process position reports from a date range using predicates, which
+    drivers like `Parquet` use to skip data that can't match:
+
+    \b
+        $ gpsdio ${INFILE} ${OUTFILE} \\
+            --where type in "[1, 2, 3]" \\
+            --where timestamp ">=" 2015-01-01 \\
+            --where timestamp "<" 2015-02-01
+
+    Extract a single vessel's messages, which only reads the matching parts of
+    a file indexed with `gpsdio index`:
+
+    \b
+        $ gpsdio ${INFILE} ${OUTFILE} --mmsi 123456789 --start 2015-01-01
+
+    Extract a region from every file in a directory.  Files the directory's
+    manifest from `gpsdio index` rules out are skipped without being opened,
+    as are files whose Bloom filter doesn't contain any of the `--mmsi` values:
+
+    \b
+        $ gpsdio ${DIRECTORY} ${OUTFILE} --bbox -123 37 -122 38 --start 2015-01-01
+
+    Merge daily files that are each sorted by time:
+
+    \b
+        $ gpsdio "daily/*.msg" ${OUTFILE} --assume-sorted
+
+    Drop copies of a transmission received by several stations within 30
+    seconds of each other:
+
+    \b
+        $ gpsdio ${INFILE} ${OUTFILE} --dedupe --dedupe-window 30
+
+    Sort a feed whose messages arrive up to 5 minutes out of order without
+    holding it all in memory:
+
+    \b
+        $ gpsdio ${INFILE} ${OUTFILE} --sort timestamp --max-delay 300
+
+    Sort by vessel and then time:
+
+    \b
+        $ gpsdio ${INFILE} ${OUTFILE} --sort mmsi,timestamp
+
+    Keep messages from the same area together so the row group statistics of
+    a Parquet file can rule out most of it for a bounding box:
+
+    \b
+        $ gpsdio ${INFILE} ${OUTFILE}.parquet --sort hilbert
+
     Filter and sort:
 
     \b
@@ -81,12 +177,27 @@ def etl(ctx, infile, outfile, filter_expr, sort_field,
     logger.setLevel(ctx.obj['verbosity'])
     logger.debug('Starting etl')
 
+    # Click gives an empty tuple when the option isn't used
+    bbox = bbox or None
+
+    if max_delay is not None:
+        if sort_field != 'timestamp':
+            raise click.BadParameter(
+                "requires `--sort timestamp`", param_hint='--max-delay')
+        max_delay = datetime.timedelta(seconds=max_delay)
+
     with gpsdio.open(
-            infile,
+            infiles[0] if len(infiles) == 1 else list(infiles),
             driver=input_driver,
             compression=input_compression,
             do=input_driver_opts,
             co=input_compression_opts,
+            where=where,
+            start=start,
+            end=end,
+            mmsi=mmsi or None,
+            bbox=bbox,
+            assume_sorted=assume_sorted,
             **ctx.obj['idefine']) as src:
 
         with gpsdio.open(
@@ -98,5 +209,12 @@ def etl(ctx, infile, outfile, filter_expr, sort_field,
                 **ctx.obj['odefine']) as dst:
 
             iterator = gpsdio.ops.filter(filter_expr, src) if filter_expr else src
-            for msg in gpsdio.ops.sort(iterator, sort_field) if sort_field else iterator:
+            if dedupe:
+                iterator = gpsdio.ops.dedupe(
+                    iterator, key=dedupe_key or None, window=dedupe_window, bloom=dedupe_bloom)
+            if sort_field:
+                fields = sort_field.split(',')
+                iterator = gpsdio.ops.sort(
+                    iterator, fields if max_delay is None else sort_field, max_delay=max_delay)
+            for msg in iterator:
                 dst.write(msg)
@@ -0,0 +1,89 @@
+"""
+gpsdio index
+"""
+
+
+import logging
+import os
+
+import click
+
+import gpsdio.bloom
+import gpsdio.index
+from gpsdio.cli import options
+
+
+logger = logging.getLogger('gpsdio')
+
+
+@click.command(name='index')
+@click.argument('infile', required=True)
+@click.option(
+    '--sample', metavar='INTEGER', type=click.INT, default=gpsdio.index.SAMPLE,
+    show_default=True,
+    help="Record the timestamp of every Nth message if the file is sorted by time.")
+@click.option(
+    '--gap', metavar='INTEGER', type=click.INT, default=gpsdio.index.GAP, show_default=True,
+    help="Merge ranges for an MMSI or grid cell separated by this many messages or fewer.")
+@click.option(
+    '--cell-size', metavar='DEGREES', type=click.FLOAT, default=gpsdio.index.CELL_SIZE,
+    show_default=True,
+    help="Size of the spatial grid's cells.")
+@options.bloom_opt
+@options.bloom_rate_opt
+@options.bloom_size_opt
+@options.input_driver
+@options.input_driver_opts
+@click.pass_context
+def index(ctx, infile, sample, gap, cell_size, bloom, bloom_rate, bloom_size,
+          input_driver, input_driver_opts):
+
+    """
+    Write an offset index next to an uncompressed file.
+
+    Reads with `gpsdio.open(path, start=..., end=..., mmsi=..., bbox=...)`
+    and `gpsdio etl --start/--end/--mmsi/--bbox` then only read the parts of
+    the file that can match.  The index is ignored once the file changes.
+
+    \b
+        $ gpsdio index positions.json
+        $ gpsdio etl positions.json vessel.json --mmsi 123456789
+
+    Given a directory every uncompressed file is indexed and a
+    `gpsdio-manifest.json` summarizing the bounds and time range of every
+    file is written, which lets `gpsdio etl` skip files in the directory
+    that can't match without opening them.
+
+    \b
+        $ gpsdio index daily/
+        $ gpsdio etl daily/ box.json --bbox -123 37 -122 38
+
+    With `--bloom` a Bloom filter of each file's MMSIs is also written, which
+    lets `gpsdio etl DIRECTORY --mmsi ...` skip files without the vessels.
+    """
+
+    logger.setLevel(ctx.obj['verbosity'])
+    logger.debug('Starting index')
+
+    bloom = {'rate': bloom_rate, 'size': bloom_size} if bloom else None
+
+    if os.path.isdir(infile):
+        manifest = gpsdio.index.write_manifest(
+            infile, driver=input_driver, do=input_driver_opts, sample=sample, gap=gap,
+            cell_size=cell_size, bloom=bloom)
+        click.echo("Summarized {} files in {}".format(
+            len(manifest['files']), os.path.join(infile, gpsdio.index.MANIFEST)), err=True)
+        return
+
+    try:
+        idx = gpsdio.index.build(
+            infile, driver=input_driver, sample=sample, gap=gap, do=input_driver_opts,
+            cell_size=cell_size)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    if bloom:
+        gpsdio.bloom.write(infile, idx.mmsi, **bloom)
+
+    click.echo("Indexed {} messages from {} vessels{} in {}".format(
+        len(idx), len(idx.mmsi), ' sorted by time' if idx.timestamps else '',
+        gpsdio.index.index_path(infile)), err=True)
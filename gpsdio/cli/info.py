@@ -6,10 +6,12 @@ gpsdio info
 from collections import OrderedDict
 import logging
 import json
+import os
 
 import click
 
 import gpsdio
+import gpsdio.bloom
 import gpsdio.schema
 import gpsdio.validate
 from gpsdio.cli import options
@@ -19,7 +21,7 @@ logger = logging.getLogger('gpsdio')
 
 
 @click.command(name='info')
-@click.argument('infile')
+@click.argument('infiles', nargs=-1, required=True)
 @click.option(
     '--bounds', 'meta_member', flag_value='bounds',
     help="Print only the boundary coordinates as xmin, ymin, xmax, ymax.")
@@ -69,6 +71,9 @@ logger = logging.getLogger('gpsdio')
     '--sort-field', metavar='NAME', default='timestamp', show_default=True,
     help="Check if data is sorted by this field.  Output is placed in the 'sorted' key.")
 @options.indent_opt
+@options.bloom_opt
+@options.bloom_rate_opt
+@options.bloom_size_opt
 @options.input_driver
 @options.input_driver_opts
 @options.input_compression
@@ -76,8 +81,9 @@ logger = logging.getLogger('gpsdio')
 @click.pass_context
 def info(
         ctx,
-        infile, indent, meta_member, sort_field,
+        infiles, indent, meta_member, sort_field,
         with_mmsi_hist, with_type_hist, with_field_hist, with_all,
+        bloom, bloom_rate, bloom_size,
         input_driver, input_driver_opts, input_compression, input_compression_opts):
 
     """
@@ -89,6 +95,11 @@ def info(
     means that the keys of items like `type_histogram` and `mmsi_histogram`
     have been converted to a string when in reality they should be integers.
     Tools reading the JSON output will need account for this when parsing.
+
+    Multiple inputs, directories, and quoted globs are summarized together.
+
+    The `--bloom` flag also writes a Bloom filter sidecar recording the MMSIs
+    in the file.  See `gpsdio.bloom`.
     """
 
     logger.setLevel(ctx.obj['verbosity'])
@@ -109,6 +120,10 @@ def info(
     is_sorted = True
     prev_ts = None
 
+    infile = infiles[0] if len(infiles) == 1 else list(infiles)
+    if bloom and not (len(infiles) == 1 and os.path.isfile(infile)):
+        raise click.BadParameter("--bloom requires a single file", param_hint='INFILES')
+
     with gpsdio.open(
             infile,
             driver=input_driver,
@@ -165,6 +180,13 @@ def info(
             mmsi_hist.setdefault(mmsi, 0)
             mmsi_hist[mmsi] += 1
 
+    if bloom:
+        try:
+            gpsdio.bloom.write(
+                infile, (m for m in mmsi_hist if m is not None), rate=bloom_rate, size=bloom_size)
+        except (OSError, ValueError) as e:
+            raise click.ClickException("Can't write a Bloom filter: {}".format(e))
+
     stats = {
         'bounds': (xmin, ymin, xmax, ymax),
         'count': idx + 1,
@@ -0,0 +1,76 @@
+"""
+gpsdio ingest
+"""
+
+
+import logging
+
+import click
+
+import gpsdio
+import gpsdio.aio
+from gpsdio.cli import options
+
+
+logger = logging.getLogger('gpsdio')
+
+
+@click.command()
+@click.argument('url', required=True)
+@click.argument('outfile', required=True)
+@click.option(
+    '--batch-size', metavar='INTEGER', type=click.INT, default=1000, show_default=True,
+    help="Maximum number of sentences to decode at once.")
+@click.option(
+    '--flush-interval', metavar='SECONDS', type=click.FLOAT, default=5.0, show_default=True,
+    help="Flush output this often, even if the feed is quiet.")
+@click.option(
+    '--max-messages', metavar='INTEGER', type=click.INT,
+    help="Stop after writing this many messages.")
+@options.input_driver
+@options.input_driver_opts
+@options.output_driver
+@options.output_driver_opts
+@options.output_compression
+@options.output_compression_opts
+@click.pass_context
+def ingest(ctx, url, outfile, batch_size, flush_interval, max_messages,
+           input_driver, input_driver_opts,
+           output_driver, output_driver_opts, output_compression, output_compression_opts):
+
+    """
+    Write a live TCP feed to a file.
+
+    Reads until the feed closes or `--max-messages` is reached.  Sentences
+    are decoded with the NMEA driver unless another input driver is given.
+    Requires Python 3.5 or later.
+
+    \b
+        $ gpsdio ingest tcp://localhost:5000 ${OUTFILE}
+    """
+
+    logger.setLevel(ctx.obj['verbosity'])
+    logger.debug('Starting ingest')
+
+    async def run():
+        async with gpsdio.aopen(
+                outfile, 'w',
+                driver=output_driver,
+                compression=output_compression,
+                do=output_driver_opts,
+                co=output_compression_opts,
+                **ctx.obj['odefine']) as dst:
+            return await gpsdio.aio.ingest(
+                url, dst,
+                driver=input_driver or 'NMEA',
+                do=input_driver_opts,
+                batch_size=batch_size,
+                flush_interval=flush_interval,
+                max_messages=max_messages,
+                **ctx.obj['idefine'])
+
+    try:
+        count = gpsdio.aio.run(run())
+    except (OSError, ValueError) as e:
+        raise click.ClickException(str(e))
+    logger.debug("Wrote %s messages", count)
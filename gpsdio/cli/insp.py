@@ -53,7 +53,7 @@ def insp(ctx, infile, interpreter,
     header = os.linesep.join((
         "gpsdio {gversion} Interactive Inspector Session (Python {pyversion})".format(
             gversion=gpsdio.__version__, pyversion='.'.join(map(str, sys.version_info[:3]))
-        ), 'Try "help(src)" or "next(src)".'))
+        ), 'Try "help(src)", "next(src)", or "src[10]" for uncompressed files.'))
 
     with gpsdio.open(
             infile,
@@ -0,0 +1,79 @@
+"""
+gpsdio merge
+"""
+
+
+import logging
+
+import click
+
+import gpsdio
+import gpsdio.ops
+from gpsdio.cli import options
+
+
+logger = logging.getLogger('gpsdio')
+
+
+@click.command(name='merge')
+@click.argument('infiles', nargs=-1, required=True)
+@click.argument('outfile', required=True)
+@click.option(
+    '--field', metavar='NAME', default='timestamp', show_default=True,
+    help="Field every input is sorted by.")
+@click.option(
+    '--check', is_flag=True,
+    help="Stop with an error as soon as an input is found to be out of order.")
+@options.input_driver
+@options.input_driver_opts
+@options.input_compression
+@options.input_compression_opts
+@options.output_driver
+@options.output_driver_opts
+@options.output_compression
+@options.output_compression_opts
+@click.pass_context
+def merge(ctx, infiles, outfile, field, check,
+          input_driver, input_driver_opts, input_compression, input_compression_opts,
+          output_driver, output_driver_opts, output_compression, output_compression_opts):
+
+    """
+    Merge files that are each sorted into one sorted file.
+
+    Only one message from each input is held in memory, unlike
+    `gpsdio etl --sort`.  Inputs are opened at the same time, so the number
+    of inputs is limited by the number of files that can be open at once.
+
+    \b
+        $ gpsdio merge station-*.msg.gz merged.msg.gz --check
+    """
+
+    logger.setLevel(ctx.obj['verbosity'])
+    logger.debug('Starting merge')
+
+    srcs = []
+    try:
+        for infile in infiles:
+            srcs.append(gpsdio.open(
+                infile,
+                driver=input_driver,
+                compression=input_compression,
+                do=input_driver_opts,
+                co=input_compression_opts,
+                **ctx.obj['idefine']))
+
+        with gpsdio.open(
+                outfile, 'w',
+                driver=output_driver,
+                compression=output_compression,
+                do=output_driver_opts,
+                co=output_compression_opts,
+                **ctx.obj['odefine']) as dst:
+            try:
+                for msg in gpsdio.ops.merge(srcs, field=field, check=check):
+                    dst.write(msg)
+            except ValueError as e:
+                raise click.ClickException(str(e))
+    finally:
+        for src in srcs:
+            src.close()
@@ -5,8 +5,10 @@ appropriate to keep the gpsdio CLI ecosystem consistent and clean.
 
 
 import click
+import str2type
 import str2type.ext
 
+import gpsdio.bloom
 import gpsdio.drivers
 
 
@@ -73,3 +75,45 @@ indent_opt = click.option(
     help="Indent and pretty print output.  Use 'None' to disable indentation and print output "
          "as a single line of serializable JSON."
 )
+
+
+def _cb_where(ctx, param, value):
+
+    """
+    Click callback for `--where` to convert each clause's value and validate
+    the operator.
+    """
+
+    import gpsdio.where
+
+    out = []
+    for field, op, val in value:
+        if op not in gpsdio.where.OPERATORS:
+            raise click.BadParameter("Unknown operator '{}' - must be one of: {}".format(
+                op, ', '.join(sorted(gpsdio.where.OPERATORS))))
+        out.append((field, op, str2type.str2type(val)))
+    return out
+
+
+where_opt = click.option(
+    '--where', metavar='FIELD OP VALUE', nargs=3, multiple=True, callback=_cb_where,
+    help="Only read messages where a field satisfies a comparison like `--where mmsi == 123`.  "
+         "Values are decoded as JSON, so `in` and `not in` take a list like `[1,2,3]`.  "
+         "Drivers like Parquet use these to skip data that can't match."
+)
+
+
+bloom_opt = click.option(
+    '--bloom', is_flag=True,
+    help="Write a Bloom filter of the MMSIs in each file, which lets multi-file reads filtering "
+         "by MMSI skip files without opening them."
+)
+bloom_rate_opt = click.option(
+    '--bloom-rate', metavar='FLOAT', type=click.FLOAT, default=gpsdio.bloom.RATE,
+    show_default=True,
+    help="Target false positive rate for Bloom filters."
+)
+bloom_size_opt = click.option(
+    '--bloom-size', metavar='BYTES', type=click.INT,
+    help="Bloom filter size, which overrides --bloom-rate."
+)
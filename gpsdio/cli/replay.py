@@ -0,0 +1,59 @@
+"""
+gpsdio replay
+"""
+
+
+import logging
+
+import click
+
+import gpsdio
+import gpsdio.aio
+
+
+logger = logging.getLogger('gpsdio')
+
+
+@click.command()
+@click.argument('infile', required=True)
+@click.option(
+    '--host', default='127.0.0.1', show_default=True,
+    help="Interface to listen on.")
+@click.option(
+    '--port', type=click.INT, default=5000, show_default=True,
+    help="Port to listen on.  Use 0 to pick a free port.")
+@click.option(
+    '--rate', metavar='LINES', type=click.FLOAT,
+    help="Lines per second.  Default is as fast as possible.")
+@click.option(
+    '--repeat', metavar='INTEGER', type=click.INT, default=1, show_default=True,
+    help="Number of times to send the file to each client.")
+@click.pass_context
+def replay(ctx, infile, host, port, rate, repeat):
+
+    """
+    Serve a file over TCP for testing and benchmarking.
+
+    Every client receives the raw lines of the file, optionally throttled,
+    and is then disconnected.  Runs until interrupted.  Requires Python 3.5
+    or later.
+
+    \b
+        $ gpsdio replay tests/data/types.nmea --rate 100 &
+        $ gpsdio ingest tcp://127.0.0.1:5000 out.json
+    """
+
+    logger.setLevel(ctx.obj['verbosity'])
+    logger.debug('Starting replay')
+
+    async def serve():
+        server = await gpsdio.aio.replay(infile, host=host, port=port, rate=rate, repeat=repeat)
+        for sock in server.sockets:
+            click.echo("Serving {} on tcp://{}:{}".format(
+                infile, *sock.getsockname()[:2]), err=True)
+        await gpsdio.aio.serve(server)
+
+    try:
+        gpsdio.aio.run(serve())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,102 @@
+"""
+gpsdio split
+"""
+
+
+import logging
+
+import click
+
+import gpsdio
+import gpsdio.io
+from gpsdio.cli import options
+
+
+logger = logging.getLogger('gpsdio')
+
+
+@click.command(name='split')
+@click.argument('infiles', nargs=-1, required=True)
+@click.argument('template', required=True)
+@click.option(
+    '--by', metavar='FIELD_OR_EXPR', required=True,
+    help="Field or expression giving each message's partition key.")
+@click.option(
+    '--max-open', type=click.IntRange(1, None), default=gpsdio.io.MAX_OPEN, show_default=True,
+    help="Maximum number of output files open at once.")
+@click.option(
+    '--buffer-size', type=click.IntRange(1, None), default=gpsdio.io.PARTITION_BUFFER,
+    show_default=True,
+    help="Number of messages held per partition before writing them.")
+@click.option(
+    '--segments', is_flag=True,
+    help="Continue partitions whose file was closed in new files instead of appending.")
+@options.bloom_opt
+@options.bloom_rate_opt
+@options.bloom_size_opt
+@options.input_driver
+@options.input_driver_opts
+@options.input_compression
+@options.input_compression_opts
+@options.output_driver
+@options.output_driver_opts
+@options.output_compression
+@options.output_compression_opts
+@click.pass_context
+def split(ctx, infiles, template, by, max_open, buffer_size, segments,
+          bloom, bloom_rate, bloom_size,
+          input_driver, input_driver_opts, input_compression, input_compression_opts,
+          output_driver, output_driver_opts, output_compression, output_compression_opts):
+
+    """
+    Write messages to a file per partition key.
+
+    TEMPLATE is the path for each partition, with the key as `{key}`.  When
+    partitioning by a field it is also available by name, like `{mmsi}`.
+    Expressions have the same scope as `gpsdio etl --filter`, and messages
+    whose key is missing are skipped.
+
+    One file per vessel:
+
+    \b
+        $ gpsdio split ${INFILE} "by_mmsi/{mmsi}.msg.gz" --by mmsi
+
+    One file per day:
+
+    \b
+        $ gpsdio split ${INFILE} "daily/{key}.json" --by "str(timestamp)[:10]"
+
+    Only `--max-open` files are open at once.  A partition written after its
+    file was closed is appended to, or continued in a new file like
+    `by_mmsi/123456789-1.msg.gz` with `--segments` or drivers that can't
+    append.
+    """
+
+    logger.setLevel(ctx.obj['verbosity'])
+
+    bloom_opts = {'rate': bloom_rate, 'size': bloom_size} if bloom else False
+
+    with gpsdio.open(
+            infiles[0] if len(infiles) == 1 else list(infiles),
+            driver=input_driver,
+            compression=input_compression,
+            do=input_driver_opts,
+            co=input_compression_opts,
+            **ctx.obj['idefine']) as src:
+
+        with gpsdio.PartitionedWriter(
+                template, by,
+                max_open=max_open,
+                buffer_size=buffer_size,
+                segments=segments,
+                driver=output_driver,
+                compression=output_compression,
+                do=output_driver_opts,
+                co=output_compression_opts,
+                bloom=bloom_opts,
+                **ctx.obj['odefine']) as dst:
+
+            for msg in src:
+                dst.write(msg)
+
+    logger.debug("Wrote %s files", len(dst.paths))
@@ -0,0 +1,267 @@
+"""
+Read a directory tree of partitioned files as a single dataset.
+
+Directories named like `key=value` partition the files beneath them, like
+the output of `gpsdio split` into Hive-style paths::
+
+    positions/
+        date=2015-01-01/
+            type=1/
+                part-0.msg.gz
+            type=5/
+                part-0.msg.gz
+        date=2015-01-02/
+            ...
+
+`open_dataset()` walks the tree and evaluates `gpsdio.where` clauses on
+partition keys against each directory's value, so directories that can't
+match are never listed and their files are never opened.  Clauses on a
+file's partition keys are not applied to its messages, which don't need to
+contain the keys.  Every other option works like reading several files with
+`gpsdio.open()`, and `mmsi` also prunes `mmsi=...` directories.  Values
+that look like integers are converted to `int` and all others are
+strings.
+"""
+
+
+import logging
+import os
+import re
+
+import six
+from six.moves.urllib.parse import unquote
+
+import gpsdio.io
+
+
+logger = logging.getLogger('gpsdio')
+
+
+_INT = re.compile(r'^-?\d+$')
+
+
+def partition_value(text):
+
+    """
+    Convert the value of a `key=value` directory name.
+
+    Parameters
+    ----------
+    text : str
+        Value, which may be URL encoded.
+
+    Returns
+    -------
+    int or str
+    """
+
+    text = unquote(text)
+    return int(text) if _INT.match(text) else text
+
+
+def parse_partition(name):
+
+    """
+    Parse a `key=value` directory name.
+
+    Parameters
+    ----------
+    name : str
+        Directory name.
+
+    Returns
+    -------
+    tuple or None
+        `(key, value)`, or `None` if the directory isn't a partition.
+    """
+
+    key, sep, value = name.partition('=')
+    if not sep or not key:
+        return None
+    return unquote(key), partition_value(value)
+
+
+def discover(root, where=None):
+
+    """
+    Find the data files in a partitioned directory tree, skipping directories
+    whose partition value doesn't satisfy a clause on its key.  Names
+    starting with `.` or `_` are ignored.
+
+    Parameters
+    ----------
+    root : str
+        Directory to search.
+    where : list, optional
+        Clauses from `gpsdio.where.normalize()`.  Clauses on fields that
+        aren't partition keys are ignored.
+
+    Returns
+    -------
+    list
+        `(path, partition)` tuples sorted by path, where `partition` is a
+        dictionary of the partition values for the file's directories.
+    """
+
+    import gpsdio.index
+    import gpsdio.where
+
+    out = []
+    skipped = 0
+    stack = [(root, {})]
+    while stack:
+        directory, partition = stack.pop()
+        for path in gpsdio.index.data_files(directory):
+            out.append((path, partition))
+        children = []
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            if name.startswith(('.', '_')) or not os.path.isdir(path):
+                continue
+            parsed = parse_partition(name)
+            child = partition
+            if parsed is not None:
+                key, value = parsed
+                clauses = [c for c in where or () if c[0] == key]
+                if clauses and not gpsdio.where.matches({key: value}, clauses):
+                    skipped += 1
+                    continue
+                child = dict(partition, **{key: value})
+            children.append((path, child))
+        stack.extend(reversed(children))
+
+    logger.debug("Found %s files in %s and skipped %s partitions", len(out), root, skipped)
+    return sorted(out, key=lambda x: x[0])
+
+
+class GPSDIODataset(gpsdio.io.GPSDIOMultiReader):
+
+    """
+    Read the files of a partitioned directory tree as a single stream of
+    messages.  See `open_dataset()`.
+    """
+
+    def __init__(self, root, files, where=None, **kwargs):
+
+        """
+        Parameters
+        ----------
+        root : str
+            Dataset directory.
+        files : list
+            `(path, partition)` tuples from `discover()`.
+        where : list, optional
+            Clauses from `gpsdio.where.normalize()`.  Clauses on a file's
+            partition keys aren't applied to its messages.
+        kwargs : **kwargs, optional
+            See `GPSDIOMultiReader()`.
+        """
+
+        self.root = root
+        self.partitions = [partition for _, partition in files]
+        self._partitions = dict(files)
+        super(GPSDIODataset, self).__init__(
+            [path for path, _ in files], where=where, **kwargs)
+
+    def _opener(self, path):
+        partition = self._partitions[path]
+        where = [c for c in self.where or () if c[0] not in partition] or None
+        kwargs = dict(self._kwargs, where=where)
+        return lambda: gpsdio.io.open(path, **kwargs)
+
+    @property
+    def partition_keys(self):
+
+        """
+        Every partition key, sorted.
+        """
+
+        return sorted(set(k for partition in self.partitions for k in partition))
+
+    @property
+    def name(self):
+        return self.root
+
+
+def open_dataset(
+        root,
+        where=None,
+        start=None,
+        end=None,
+        mmsi=None,
+        bbox=None,
+        assume_sorted=False,
+        workers=gpsdio.io.WORKERS,
+        readahead=gpsdio.io.READAHEAD,
+        schema=None,
+        schema_extensions=True,
+        **kwargs):
+
+    """
+    Open a partitioned directory tree for reading.  Each file's driver and
+    compression are detected from its path, unless given, and the files are
+    read concurrently like a `GPSDIOMultiReader()`.
+
+    Parameters
+    ----------
+    root : str
+        Dataset directory.
+    where : list, optional
+        `(field, op, value)` clauses.  Clauses on partition keys prune
+        directories and every other clause is applied to messages.
+    start : str or datetime.datetime, optional
+        Only read messages with a `timestamp` at or after this time.
+    end : str or datetime.datetime, optional
+        Only read messages with a `timestamp` before this time.
+    mmsi : int or list, optional
+        Only read messages from these vessels.
+    bbox : tuple, optional
+        Only read messages inside this `(xmin, ymin, xmax, ymax)` box.
+    assume_sorted : bool, optional
+        Every file is sorted by `timestamp`, so merge them into a single
+        stream sorted by `timestamp`.
+    workers : int, optional
+        Number of threads reading files.  With 1 the files are read one at a
+        time.
+    readahead : int, optional
+        Number of batches of messages to read ahead of the consumer per file.
+    schema : dict, optional
+        Used for every file.  Built once if not given.
+    schema_extensions : bool, optional
+        Use external field extensions?  Ignored if a `schema` is given.
+    kwargs : **kwargs, optional
+        Passed to `gpsdio.open()` for every file, like `driver` or `do`.
+
+    Raises
+    ------
+    IOError
+        If `root` isn't a directory.
+
+    Returns
+    -------
+    GPSDIODataset
+    """
+
+    import gpsdio.index
+    import gpsdio.schema
+    import gpsdio.where
+
+    if not os.path.isdir(root):
+        raise IOError("Not a directory: {}".format(root))
+
+    schema = schema or gpsdio.schema.build_schema(extensions=schema_extensions)
+    where = gpsdio.where.normalize(where, schema)
+    if mmsi is not None:
+        mmsi = [mmsi] if isinstance(mmsi, six.integer_types) else list(mmsi)
+        files = discover(root, where + [('mmsi', 'in', tuple(mmsi))])
+    else:
+        files = discover(root, where)
+
+    selected = set(gpsdio.index.select(
+        [path for path, _ in files], start=start, end=end, bbox=bbox, mmsi=mmsi))
+    files = [(path, partition) for path, partition in files if path in selected]
+
+    return GPSDIODataset(
+        root, files, where=where or None, merge=assume_sorted, workers=workers,
+        readahead=readahead, schema=schema, start=start, end=end, mmsi=mmsi, bbox=bbox,
+        assume_sorted=assume_sorted, **kwargs)
@@ -0,0 +1,246 @@
+"""
+Delimited text with a section per message type.
+
+Every section starts with a header row naming the type's fields in schema
+order, with `type` first, followed by one row per message of that type::
+
+    type,accuracy,course,heading,lat,lon,...
+    1,0,217.0,511,38.2,-122.4,...
+    1,1,12.5,13,37.9,-122.7,...
+    5,ais_version,callsign,...
+    5,0,WDC7433,...
+
+Missing values are empty cells, so empty strings are read as `None`.
+Datetimes are written in `DATETIME_FORMAT`.  A file may contain any number
+of sections, including several for the same type.
+"""
+
+
+import csv
+from itertools import repeat
+import logging
+import shutil
+import tempfile
+
+import six
+
+from gpsdio._validate import Float, Int
+from gpsdio.schema import field_type
+from gpsdio.validate import datetime2str
+
+
+logger = logging.getLogger('gpsdio')
+
+
+# Messages are buffered per type and serialized this many at a time
+BATCH_SIZE = 10000
+
+# Functions rebuilding values from text for each field kind.  Datetimes are
+# left as strings, like the `NewlineJSON` driver.
+_COERCE = {
+    'int': Int().coerce,
+    'float': Float().coerce,
+}
+
+
+def _temporary_file():
+    if six.PY2:  # pragma: no cover
+        return tempfile.TemporaryFile('w+b')
+    return tempfile.TemporaryFile('w+', encoding='utf-8', newline='')
+
+
+def _serializer(kind):
+
+    """
+    Get a function converting a column of values for the CSV writer.
+    """
+
+    if kind == 'datetime':
+        return lambda values: [v if v is None else datetime2str(v) for v in values]
+    elif kind == 'int':
+        # Flags are sometimes booleans
+        return lambda values: [v if v is None else int(v) for v in values]
+    return None
+
+
+class _Section(object):
+
+    """
+    Buffer the rows for one message type in a temporary file.
+    """
+
+    def __init__(self, mtype, fields, dialect, fmtparams):
+        self.mtype = mtype
+        self.header = ['type'] + [n for n in fields if n != 'type']
+        self._columns = []
+        for name in self.header[1:]:
+            kind, _ = field_type(fields[name]['validate'])
+            self._columns.append((name, _serializer(kind)))
+        self._msgs = []
+        self._tmp = _temporary_file()
+        self._writer = csv.writer(self._tmp, dialect=dialect, **fmtparams)
+
+    def append(self, msg):
+        self._msgs.append(msg)
+        if len(self._msgs) >= BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+
+        """
+        Serialize buffered messages a column at a time.
+        """
+
+        msgs, self._msgs = self._msgs, []
+        if not msgs:
+            return
+        columns = [[self.mtype] * len(msgs)]
+        for name, serialize in self._columns:
+            values = [m.get(name) for m in msgs]
+            columns.append(serialize(values) if serialize else values)
+        self._writer.writerows(zip(*columns))
+
+    def copy_to(self, writer, f):
+        self.flush()
+        writer.writerow(self.header)
+        self._tmp.seek(0)
+        shutil.copyfileobj(self._tmp, f)
+        self._tmp.close()
+
+
+class DelimitedWriter(object):
+
+    """
+    Write messages as delimited text.  Messages are buffered per type in
+    temporary files until `close()` writes every section, so the output is
+    grouped by type in the order each type was first written.
+    """
+
+    def __init__(self, f, schema, dialect='excel', **fmtparams):
+
+        """
+        Parameters
+        ----------
+        f : file
+            Open in text write mode with `newline=''`.
+        schema : dict
+            From `gpsdio.schema.build_schema()`.
+        dialect : str, optional
+            CSV dialect.
+        fmtparams : **kwargs, optional
+            Formatting parameters for `csv.writer()`, like `delimiter`.
+        """
+
+        self._f = f
+        self._schema = schema
+        self._dialect = dialect
+        self._fmtparams = fmtparams
+        self._sections = {}
+        self._order = []
+
+    def write(self, msg):
+        mtype = msg['type']
+        section = self._sections.get(mtype)
+        if section is None:
+            if mtype not in self._schema:
+                raise ValueError("Can't write type {} - not in the schema".format(mtype))
+            section = self._sections[mtype] = _Section(
+                mtype, self._schema[mtype], self._dialect, self._fmtparams)
+            self._order.append(section)
+        section.append(msg)
+
+    def close(self):
+
+        """
+        Write every section.
+        """
+
+        writer = csv.writer(self._f, dialect=self._dialect, **self._fmtparams)
+        for section in self._order:
+            section.copy_to(writer, self._f)
+
+
+class DelimitedReader(object):
+
+    """
+    Produce messages from delimited text.  Rows are read in batches and
+    values are rebuilt a column at a time with the `coerce()` method of the
+    field's validator kind.  Fields that aren't in the schema are left as
+    strings.
+    """
+
+    def __init__(self, f, schema, dialect='excel', **fmtparams):
+
+        """
+        Parameters
+        ----------
+        f : file
+            Open in text read mode with `newline=''`.
+        schema : dict
+            From `gpsdio.schema.build_schema()`.
+        dialect : str, optional
+            CSV dialect.
+        fmtparams : **kwargs, optional
+            Formatting parameters for `csv.reader()`, like `delimiter`.
+        """
+
+        self._rows = csv.reader(f, dialect=dialect, **fmtparams)
+        self._schema = schema
+        self._messages = self._read()
+
+    def _convert(self, header, mtype, rows):
+
+        """
+        Convert rows sharing a header and type to messages a column at a
+        time.
+        """
+
+        fields = self._schema.get(mtype, {})
+        names = header[1:]
+        columns = list(zip(*rows))[1:]
+        for i, (name, values) in enumerate(zip(names, columns)):
+            coerce = None
+            if name in fields:
+                coerce = _COERCE.get(field_type(fields[name]['validate'])[0])
+            if '' in values:
+                if coerce is None:
+                    columns[i] = [None if v == '' else v for v in values]
+                else:
+                    columns[i] = [None if v == '' else coerce(v) for v in values]
+            elif coerce is not None:
+                columns[i] = list(map(coerce, values))
+
+        names = names[:len(columns)] + ['type']
+        columns.append(repeat(mtype))
+        return six.moves.map(dict, six.moves.map(zip, repeat(names), zip(*columns)))
+
+    def _read(self):
+        header = None
+        rows = []
+        key = None
+        for row in self._rows:
+            if not row:
+                continue
+            elif row[0] == 'type' or row[0] != key or len(rows) >= BATCH_SIZE:
+                for msg in self._convert(header, int(key), rows) if rows else ():
+                    yield msg
+                rows = []
+                if row[0] == 'type':
+                    header = row
+                    key = None
+                    continue
+                elif header is None:
+                    raise ValueError("Found a row before a header: {}".format(row))
+                key = row[0]
+            rows.append(row)
+
+        for msg in self._convert(header, int(key), rows) if rows else ():
+            yield msg
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._messages)
+
+    next = __next__
@@ -6,8 +6,13 @@ Drivers for reading and writing a variety of formats and compression.
 
 
 import bz2
+import codecs
+import functools
 import logging
 import gzip
+import io
+import mmap as _mmap
+import os
 import sys
 
 import msgpack
@@ -15,29 +20,247 @@ import six
 
 from gpsdio.base import BaseDriver as _BaseDriver
 from gpsdio.base import BaseCompressionDriver as _BaseCompressionDriver
+from gpsdio.errors import UnsupportedOperation as _UnsupportedOperation
 
 
 logger = logging.getLogger('gpsdio')
 
 
+# Key identifying the header of a MsgPack file containing positional messages
+_POSITIONAL_HEADER = '__gpsdio_positional__'
+
+
+# Default unpacker read size for memory-mapped MsgPack files
+MMAP_READ_SIZE = 4 * 1024 * 1024
+
+
+# Preferred JSON libraries in order
+JSON_LIBS = ('orjson', 'simdjson', 'ujson', 'json')
+
+
+def _json_funcs(json_lib=None, loads_args=None, dumps_args=None):
+
+    """
+    Get a `loads()` function that accepts `bytes` or `str` and a `dumps()`
+    function that produces `bytes` for a JSON library.
+
+    Parameters
+    ----------
+    json_lib : str or module, optional
+        A library name from `JSON_LIBS` or an already imported module with
+        `loads()` and `dumps()`.  The first importable library from
+        `JSON_LIBS` is used if not given.
+    loads_args : dict, optional
+        Additional keyword arguments for the library's `loads()`.
+    dumps_args : dict, optional
+        Additional keyword arguments for the library's `dumps()`.
+
+    Raises
+    ------
+    ValueError
+        Library is not recognized.
+    ImportError
+        Library can't be imported.
+
+    Returns
+    -------
+    tuple
+        (name, loads, dumps)
+    """
+
+    if json_lib is None:
+        for name in JSON_LIBS:
+            try:
+                return _json_funcs(name, loads_args, dumps_args)
+            except ImportError:
+                pass
+    elif not isinstance(json_lib, six.string_types):
+        name = getattr(json_lib, '__name__', repr(json_lib))
+        if name in JSON_LIBS:
+            return _json_funcs(name, loads_args, dumps_args)
+        json_lib, lib_loads, lib_dumps = name, json_lib.loads, json_lib.dumps
+    elif json_lib not in JSON_LIBS:
+        raise ValueError("Unrecognized JSON library '{}' - options are: {}".format(
+            json_lib, ', '.join(JSON_LIBS)))
+
+    # Only orjson natively serializes to bytes.  simdjson only parses and
+    # delegates serialization to the builtin json library.
+    elif json_lib == 'orjson':
+        import orjson
+        lib_loads = orjson.loads
+        lib_dumps = orjson.dumps
+    elif json_lib == 'simdjson':
+        import json
+        import simdjson
+        lib_loads = simdjson.loads
+        lib_dumps = json.dumps
+    elif json_lib == 'ujson':
+        import ujson
+        lib_loads = ujson.loads
+        lib_dumps = ujson.dumps
+    else:
+        import json
+        lib_dumps = json.dumps
+        if six.PY3 and sys.version_info < (3, 6):
+            def lib_loads(s, **kwargs):
+                return json.loads(s.decode('utf-8') if isinstance(s, bytes) else s, **kwargs)
+        else:
+            lib_loads = json.loads
+
+    if loads_args:
+        lib_loads = functools.partial(lib_loads, **loads_args)
+    if dumps_args:
+        lib_dumps = functools.partial(lib_dumps, **dumps_args)
+    if json_lib == 'orjson' and not dumps_args:
+        return json_lib, lib_loads, lib_dumps
+
+    def dumps(obj):
+        out = lib_dumps(obj)
+        return out.encode('utf-8') if isinstance(out, six.text_type) else out
+
+    return json_lib, lib_loads, dumps
+
+
 class NewlineJSONDriver(_BaseDriver):
 
     """
-    Access data stored as newline delimited JSON.  Driver options are passed to
-    ``newlinejson.open()``.
+    Access data stored as newline delimited JSON.  Lines are parsed directly
+    from bytes and serialized directly to bytes where possible, including
+    when reading and writing through a compression driver.  Blank lines are
+    skipped.
+
+    Driver options:
+
+        json_lib : str or module
+            JSON library to use.  One of 'orjson', 'simdjson', 'ujson', or
+            'json', or any module with `loads()` and `dumps()`.  Defaults to
+            the first library in that list that can be imported.
+        open_args : dict
+            Passed to Python's ``open()`` when given a path.  Files are
+            always UTF-8.
+        skip_failures : bool
+            Log and skip lines that can't be parsed and messages that can't
+            be serialized instead of raising an exception.
+        newline : str
+            Written after every message.  Default is '\\n'.
 
-    https://github.com/geowurster/NewlineJSON
+    Any other options are passed to the JSON library's ``loads()`` when
+    reading or ``dumps()`` when writing.  These options match the options
+    of ``newlinejson.open()``, which earlier versions used.
     """
 
     driver_name = 'NewlineJSON'
     extensions = ('json', 'nljson')
     io_modes = ('r', 'w', 'a')
 
-    def open(self, name, mode='r', **kwargs):
-        import newlinejson as nlj
-        import ujson
-        kwargs.update(json_lib=kwargs.get('json_lib', ujson))
-        return nlj.open(name, mode=mode, **kwargs)
+    def open(self, name, mode='r', json_lib=None, open_args=None, skip_failures=False,
+             newline='\n', **json_args):
+
+        if mode == 'r':
+            funcs = _json_funcs(json_lib, loads_args=json_args)
+        else:
+            funcs = _json_funcs(json_lib, dumps_args=json_args)
+        self.json_lib, self._loads, self._dumps = funcs
+        logger.debug("Using JSON library: %s", self.json_lib)
+        self._skip_failures = skip_failures
+        self._newline = newline.encode('utf-8')
+
+        open_args = dict(open_args or {})
+        open_args.pop('mode', None)
+        open_args.pop('errors', None)
+        encoding = open_args.pop('encoding', None)
+        if encoding is not None and codecs.lookup(encoding).name not in ('utf-8', 'ascii'):
+            raise ValueError("NewlineJSON files must be UTF-8, not {}".format(encoding))
+
+        if isinstance(name, six.string_types):
+            f = raw = open(name, mode=mode + 'b', **open_args)
+            self._binary = True
+        elif isinstance(name, _BaseCompressionDriver):
+            # Bypass the compression driver's per-line decoding and encoding
+            f = name
+            raw = name.f
+            self._binary = True
+        else:
+            f = raw = name
+            raw_mode = getattr(raw, 'mode', '')
+            self._binary = isinstance(raw, (io.BufferedIOBase, io.RawIOBase)) \
+                or (isinstance(raw_mode, six.string_types) and 'b' in raw_mode)
+
+        self._raw = raw
+        self._lines = iter(raw) if mode == 'r' else None
+        self._write = raw.write
+
+        return f
+
+    @property
+    def mode(self):
+        return self._mode
+
+    def tell(self):
+
+        """
+        Get the position in the input where the next message starts.  Only
+        meaningful for binary input, like files opened by path.
+        """
+
+        return self._raw.tell()
+
+    def seek(self, offset):
+
+        """
+        Continue reading from a position produced by `tell()`.
+        """
+
+        if not self._binary or isinstance(self.f, _BaseCompressionDriver):
+            raise _UnsupportedOperation("Can only seek in uncompressed binary input")
+        self._raw.seek(offset)
+        self._lines = iter(self._raw)
+
+    def sync(self, offset):
+
+        """
+        Continue reading from the first line starting at or after a position,
+        which doesn't have to be the start of a line.
+
+        Returns
+        -------
+        int
+            Position of the next message.
+        """
+
+        if offset <= 0:
+            self.seek(0)
+        else:
+            self.seek(offset - 1)
+            self._raw.readline()
+        return self._raw.tell()
+
+    def __next__(self):
+        loads = self._loads
+        for line in self._lines:
+            try:
+                return loads(line)
+            except ValueError as e:
+                if not line.strip():
+                    continue
+                elif not self._skip_failures:
+                    raise
+                logger.warning("Skipping a line that can't be parsed: %s", e)
+        raise StopIteration
+
+    next = __next__
+
+    def write(self, msg):
+        try:
+            line = self._dumps(self.dump(msg)) + self._newline
+        except (TypeError, ValueError, OverflowError) as e:
+            if not self._skip_failures:
+                raise
+            logger.warning("Skipping a message that can't be serialized: %s", e)
+            return
+        if not self._binary:
+            line = line.decode('utf-8')
+        return self._write(line)
 
 
 class GZIPDriver(_BaseCompressionDriver):
@@ -104,65 +327,65 @@ class BZ2Driver(_BaseCompressionDriver):
         return super(BZ2Driver, self).dump(msg)
 
 
-# class NMEADriver(_BaseDriver):
-#
-#     driver_name = 'NMEA'
-#     extensions = 'nmea',
-#     io_modes = 'r',
-#     field_map = {
-#         'cog': 'course',
-#         'id': 'type',
-#         'nav_status': 'status',
-#         'position_accuracy': 'accuracy',
-#         'repeat_indicator': 'repeat',
-#         'rot': 'turn',
-#         'sog': 'speed',
-#         'special_manoeuvre': 'maneuver',
-#         'timestamp': 'second',
-#         'true_heading': 'heading',
-#         'imo_num': 'imo',
-#         'x': 'lon',
-#         'y': 'lat'
-#     }
-#
-#     def open(self, name, mode='r', **kwargs):
-#         import ais
-#         return ais.open(name, mode=mode, **kwargs)
-#
-#     def load(self, msg):
-#
-#         timestamp = datetime.datetime.utcfromtimestamp(msg['matches'][-1]['time'])
-#         msg = {self.field_map.get(k, k): v for k, v in six.iteritems(msg['decoded'])}
-#         msg = {
-#             fld: msg.get(fld, dfn.get('default'))
-#             for fld, dfn in self.schema[msg['type']].items()}
-#
-#         # Adjust libais not-available values to match AIVDM
-#         if 'course' in msg and msg['course'] == 360:
-#             msg['course'] = self.schema[msg['type']]['course']['default']
-#         if 'second' in msg and msg['second'] > 60:
-#             msg['second'] = self.schema[msg['type']]['second']['default']
-#         if msg['type'] != 9 and 'speed' in msg and round(msg['speed'], 0) == 102:
-#             msg['speed'] = self.schema[msg['type']]['speed']['default']
-#         if 'maneuver' in msg and msg['maneuver'] == 3:
-#             msg['maneuver'] = self.schema[msg['type']]['maneuver']['default']
-#         if 'hour' in msg and msg['hour'] > 23:
-#             msg['hour'] = self.schema[msg['type']]['hour']['default']
-#         if 'seqno' in msg and msg['seqno'] is None:
-#             msg['seqno'] = self.schema[msg['type']]['seqno']['default']
-#         if 'heading' in msg and msg['heading'] > 359:
-#             msg['heading'] = self.schema[msg['type']]['heading']['default']
-#
-#         msg['timestamp'] = timestamp
-#
-#         if six.PY2:
-#             msg = {k: int(v) if isinstance(v, long) else v for k, v in six.iteritems(msg)}
-#
-#         # Return formatted message and strip whitespace from strings
-#         return {k: v.strip() if isinstance(v, six.string_types) else v
-#                 for k, v in six.iteritems(msg)}
-#
-#
+class NMEADriver(_BaseDriver):
+
+    """
+    Read AIVDM and AIVDO sentences.  Payloads are decoded natively and
+    multi-sentence messages are reassembled.  Message types 1, 2, 3, 4, 5,
+    11, 18, 19, 21, and 24 are fully decoded but only `type`, `repeat`, and
+    `mmsi` are decoded for other types.  Fields that are not decoded receive
+    the schema's default value.  Lines that are not AIS sentences or that
+    fail to decode are skipped.
+
+    Driver options:
+
+        max_fragments : int
+            Maximum number of incomplete multi-sentence messages to hold while
+            waiting for the remaining sentences.  Default is 1000.
+        checksum : bool
+            Skip sentences with an invalid checksum.  Default is True.
+    """
+
+    driver_name = 'NMEA'
+    extensions = 'nmea',
+    io_modes = 'r',
+
+    def open(self, name, mode='r', max_fragments=1000, checksum=True, **kwargs):
+
+        from gpsdio.nmea import SentenceParser
+
+        self._parser = SentenceParser(max_fragments=max_fragments, checksum=checksum)
+        self._defaults = {
+            mtype: {fld: dfn.get('default') for fld, dfn in six.iteritems(fields)}
+            for mtype, fields in six.iteritems(self.schema or {})}
+
+        if isinstance(name, six.string_types):
+            return open(name, mode=mode, **kwargs)
+        else:
+            return name
+
+    def __next__(self):
+        parse = self._parser.parse
+        while True:
+            msg = parse(next(self.f))
+            if msg is not None:
+                return self.load(msg)
+
+    next = __next__
+
+    def load(self, msg):
+
+        """
+        Fill in fields that were not decoded with their default value and drop
+        any that aren't part of the schema.
+        """
+
+        defaults = self._defaults.get(msg['type'])
+        if defaults is None:
+            return msg
+        return {fld: msg.get(fld, dflt) for fld, dflt in six.iteritems(defaults)}
+
+
 # class _NullGuy:
 #
 #     def __init__(self, name, mode='r'):
@@ -193,6 +416,16 @@ class BZ2Driver(_BaseCompressionDriver):
 #         return _NullGuy(name, mode=mode)
 
 
+# `MsgPackDriver.sync()` reads this many bytes at a time and accepts a
+# position once this many messages unpack from it
+SYNC_WINDOW = 65536
+SYNC_MESSAGES = 3
+
+# First bytes of MsgPack maps and arrays
+_MSGPACK_CONTAINERS = frozenset(
+    list(range(0x80, 0xa0)) + [0xdc, 0xdd, 0xde, 0xdf])
+
+
 class MsgPackDriver(_BaseDriver):
 
     """
@@ -203,44 +436,811 @@ class MsgPackDriver(_BaseDriver):
     opening in ``r`` mode.  When passing in an already open file, the file must
     have been opened in ``rb`` mode.
     https://github.com/msgpack/msgpack-python
+
+    Driver options:
+
+        positional : bool
+            Write each message as an array of values rather than a map, which
+            avoids repeating every field name in every message.  The field
+            order for each type is taken from the schema and stored in a
+            header at the beginning of the file.  Messages that don't exactly
+            match their type's fields are written as a map.  Positional files
+            are detected and read without any options.  Default is False.
+        mmap : bool
+            Memory-map an uncompressed input file and unpack directly from the
+            mapping rather than through a Python file object.  Ignored for
+            already open files and compressed input.  Default is False.
+        read_size : int
+            Number of bytes the unpacker reads at a time.  Defaults to
+            ``MMAP_READ_SIZE`` when memory-mapping and to the ``msgpack``
+            default otherwise.
+        use_list : bool
+            Unpack arrays as lists rather than tuples.  Default is True.
+        raw : bool
+            Leave string values as bytes rather than decoding them as UTF-8.
+            Field names are always decoded, but only once per reader.
+            Default is False.
+        intern : bool
+            Share a single object between equal field names and string
+            values, which reduces memory use when holding many messages.
+            Default is False.
     """
 
     driver_name = 'MsgPack'
     extensions = ('msg', 'msgpack')
     io_modes = ('r', 'w', 'a')
 
-    def open(self, name, mode='r', **kwargs):
+    def open(self, name, mode='r', positional=False, mmap=False, read_size=None,
+             use_list=True, raw=False, intern=False, **kwargs):
 
         if 'encoding' not in kwargs:
             kwargs['encoding'] = 'utf-8'
 
         # We need some additional MsgPack specific objects
         self._unpacker = None
-        self._unpacker_args = kwargs
+        self._first = None
+        self._unpacker_args = dict(kwargs, use_list=use_list)
+        self._fields = None
+        self._mmap = None
+        self._raw = raw
+        self._keys = {} if raw or intern else None
+        self._strings = {} if intern else None
         self.packer = msgpack.Packer(**kwargs)
 
+        if raw:
+            self._unpacker_args.pop('encoding')
+            self._unpacker_args['raw'] = True
+        if read_size is not None:
+            self._unpacker_args['read_size'] = read_size
+
         if mode == 'r':
             mode = 'rb' if six.PY3 else 'r'
         elif mode == 'w':
             mode = 'wb'
+        elif mode == 'a':
+            mode = 'ab'
 
         if isinstance(name, six.string_types):
-            return open(name, mode=mode)
+            f = open(name, mode=mode)
         else:
-            return name
+            f = name
+
+        if mmap and mode in ('r', 'rb'):
+            if f is not name:
+                self._open_mmap(f)
+            else:
+                logger.debug("Can only memory-map files opened by path - reading %r normally",
+                             name)
+
+        if positional and mode == 'wb':
+            header = {_POSITIONAL_HEADER: 1, 'fields': {
+                mtype: [fld for fld in fields if fld != 'type']
+                for mtype, fields in six.iteritems(self.schema)}}
+            self._fields = self._parse_header(header)
+            f.write(self.packer.pack(header))
+        elif positional and mode == 'ab':
+            header = None
+            if isinstance(name, six.string_types):
+                with open(name, 'rb') as existing:
+                    header = next(msgpack.Unpacker(existing, **kwargs), None)
+            if isinstance(header, dict) and _POSITIONAL_HEADER in header:
+                self._fields = self._parse_header(header)
+            else:
+                logger.debug("Can't append positional messages to a file without a "
+                             "positional header - writing maps instead")
+
+        return f
+
+    def _open_mmap(self, f):
+
+        """
+        Memory-map an open file for reading.  Empty files can't be mapped and
+        are read normally.
+        """
+
+        try:
+            self._mmap = _mmap.mmap(f.fileno(), 0, access=_mmap.ACCESS_READ)
+        except ValueError:
+            logger.debug("Can't memory-map %s - reading normally", f.name)
+            return
+        if hasattr(self._mmap, 'madvise'):
+            self._mmap.madvise(_mmap.MADV_SEQUENTIAL)
+        self._unpacker_args.setdefault('read_size', MMAP_READ_SIZE)
+
+    @staticmethod
+    def _parse_header(header):
+
+        """
+        Get the field order for each type from a positional header.  Type is
+        always the first value.
+        """
+
+        return {int(t): ('type',) + tuple(flds) for t, flds in six.iteritems(header['fields'])}
+
+    def _key(self, key):
+
+        """
+        Get the decoded and interned version of a field name.
+        """
+
+        try:
+            return self._keys[key]
+        except KeyError:
+            decoded = key.decode('utf-8') if isinstance(key, six.binary_type) else key
+            decoded = self._keys[key] = self._keys.setdefault(decoded, decoded)
+            return decoded
+
+    def _start(self):
+
+        """
+        Create the unpacker and consume the positional header, if present.
+        Otherwise the first message is held until it is requested.
+        """
+
+        self._offset = 0
+        self._unpacker = msgpack.Unpacker(
+            self._mmap if self._mmap is not None else self.f, **self._unpacker_args)
+        first = next(self._unpacker, None)
+        if isinstance(first, dict) and self._raw:
+            header = {self._key(k): v for k, v in six.iteritems(first)}
+            if _POSITIONAL_HEADER in header:
+                header['fields'] = {t: [self._key(fld) for fld in flds]
+                                    for t, flds in six.iteritems(header['fields'])}
+                first = header
+        if isinstance(first, dict) and _POSITIONAL_HEADER in first:
+            self._fields = self._parse_header(first)
+            self._data_start = self._unpacker.tell()
+        else:
+            self._first = first
+            self._data_start = 0
 
     def __next__(self):
         if self._unpacker is None:
-            self._unpacker = msgpack.Unpacker(self.f, **self._unpacker_args)
-        return next(self._unpacker)
+            self._start()
+        if self._first is not None:
+            first, self._first = self._first, None
+            return self.load(first)
+        return self.load(next(self._unpacker))
 
     next = __next__
 
+    def tell(self):
+
+        """
+        Get the position in the input where the next message starts, which
+        is after the positional header, if present.
+        """
+
+        if self._unpacker is None:
+            self._start()
+        return 0 if self._first is not None else self._offset + self._unpacker.tell()
+
+    def seek(self, offset):
+
+        """
+        Continue reading from a position produced by `tell()`.
+        """
+
+        if isinstance(self.f, _BaseCompressionDriver):
+            raise _UnsupportedOperation("Can only seek in uncompressed input")
+        if self._unpacker is None:
+            self._start()
+        source = self._mmap if self._mmap is not None else self.f
+        source.seek(offset)
+        self._first = None
+        self._offset = offset
+        self._unpacker = msgpack.Unpacker(source, **self._unpacker_args)
+
+    def _is_message(self, obj):
+        if isinstance(obj, dict):
+            return 'type' in obj or b'type' in obj
+        elif isinstance(obj, (list, tuple)) and self._fields and obj:
+            fields = self._fields.get(obj[0])
+            return fields is not None and len(fields) == len(obj)
+        return False
+
+    def sync(self, offset):
+
+        """
+        Continue reading from the first message starting at or after a
+        position, which doesn't have to be the start of a message.  MsgPack
+        has no delimiters, so the next `SYNC_MESSAGES` messages, or the
+        messages up to the end of the file, must unpack as messages for a
+        position to be accepted.
+
+        Returns
+        -------
+        int
+            Position of the next message.
+        """
+
+        if self._unpacker is None:
+            self._start()
+        source = self._mmap if self._mmap is not None else self.f
+        offset = max(offset, self._data_start)
+
+        while True:
+            source.seek(offset)
+            window = source.read(SYNC_WINDOW)
+            at_end = len(window) < SYNC_WINDOW
+            for i in range(len(window)):
+                if six.indexbytes(window, i) not in _MSGPACK_CONTAINERS:
+                    continue
+                unpacker = msgpack.Unpacker(**self._unpacker_args)
+                unpacker.feed(window[i:])
+                count = 0
+                try:
+                    for obj in unpacker:
+                        if not self._is_message(obj):
+                            break
+                        count += 1
+                        if count == SYNC_MESSAGES:
+                            break
+                except (ValueError, TypeError, msgpack.exceptions.UnpackException):
+                    continue
+                if count == SYNC_MESSAGES or \
+                        (count and at_end and unpacker.tell() == len(window) - i):
+                    self.seek(offset + i)
+                    return offset + i
+            if at_end:
+                self.seek(offset + len(window))
+                return offset + len(window)
+            # Messages spanning the end of the window are found in the next
+            offset += len(window) // 2
+
+    def load(self, msg):
+        if isinstance(msg, (list, tuple)):
+            msg = dict(zip(self._fields[msg[0]], msg))
+        elif self._keys is not None:
+            key = self._key
+            msg = {key(k): v for k, v in six.iteritems(msg)}
+        if self._strings is not None:
+            strings = self._strings
+            for k, v in six.iteritems(msg):
+                if isinstance(v, (six.text_type, six.binary_type)):
+                    msg[k] = strings.setdefault(v, v)
+        return msg
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+        return super(MsgPackDriver, self).close()
+
     def dump(self, msg):
         msg = super(MsgPackDriver, self).dump(msg)
+        if self._fields is not None:
+            fields = self._fields.get(msg.get('type'))
+            if fields is not None and len(fields) == len(msg):
+                try:
+                    # Order matches the header, which always places type first
+                    return self.packer.pack([msg['type']] + [msg[f] for f in fields[1:]])
+                except KeyError:
+                    pass
         return self.packer.pack(msg)
 
 
+class FixedWidthDriver(_BaseDriver):
+
+    """
+    Read and write messages as fixed-width binary records with one section
+    per message type.  Files opened by path are memory-mapped and read
+    without parsing, and each type's records are available as a NumPy
+    structured array through `array()`.  Messages can also be accessed by
+    their position in the file with `driver[index]`.  Records are only
+    written to disk when the driver is closed.  Requires `numpy`.  See
+    `gpsdio.fixedwidth` for details about the format.
+
+    Driver options:
+
+        string_widths : dict
+            Maximum number of bytes for string fields like `{'name': 40}`.
+            Defaults to `gpsdio.fixedwidth.STRING_WIDTHS`, and writing a
+            longer value raises an exception.
+    """
+
+    driver_name = 'FixedWidth'
+    extensions = 'fw',
+    io_modes = ('r', 'w')
+    random_access = True
+
+    def open(self, name, mode='r', string_widths=None, **kwargs):
+
+        import numpy as np
+        from gpsdio.fixedwidth import FixedWidthReader
+        from gpsdio.fixedwidth import FixedWidthWriter
+
+        if isinstance(name, six.string_types):
+            f = raw = open(name, mode=mode + 'b', **kwargs)
+        elif isinstance(name, _BaseCompressionDriver):
+            f, raw = name, name.f
+        else:
+            f = raw = name
+
+        self._reader = self._writer = None
+        if mode == 'r':
+            if f is raw and hasattr(raw, 'fileno') and raw.seekable():
+                try:
+                    buf = np.memmap(raw, dtype=np.uint8, mode='r')
+                except ValueError:
+                    buf = np.zeros(0, dtype=np.uint8)
+            else:
+                buf = np.frombuffer(raw.read(), dtype=np.uint8)
+            self._reader = FixedWidthReader(buf)
+            self._records = iter(self._reader)
+        else:
+            self._writer = FixedWidthWriter(raw, self.schema, string_widths=string_widths)
+
+        return f
+
+    @property
+    def mode(self):
+        return self._mode
+
+    def __next__(self):
+        return next(self._records)
+
+    next = __next__
+
+    def __len__(self):
+        return len(self._reader)
+
+    def __getitem__(self, index):
+        return self._reader[index]
+
+    def seek(self, position):
+
+        """
+        Continue reading from a message position.
+        """
+
+        self._records = self._reader.iterate(position)
+
+    @property
+    def types(self):
+
+        """
+        Message types in the file.
+        """
+
+        return list(self._reader.types)
+
+    def array(self, mtype):
+
+        """
+        Get every record for a message type as a structured array.
+
+        Parameters
+        ----------
+        mtype : int
+            Message type.
+
+        Returns
+        -------
+        numpy.ndarray
+            A read-only array with one column per field except `type`.
+        """
+
+        return self._reader.arrays[mtype]
+
+    def write(self, msg):
+        return self._writer.write(msg)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        return super(FixedWidthDriver, self).close()
+
+
+class ParquetDriver(_BaseDriver):
+
+    """
+    Read and write Apache Parquet files.  Every message type shares a single
+    table with one column per field in the schema, and fields that aren't
+    part of a message's type are null.  Messages are written in row groups,
+    and when reading with `gpsdio.open(where=...)` row groups are skipped
+    based on their column statistics and rows are filtered with vectorized
+    comparisons before any messages are built.  Requires `pyarrow`.
+
+    Driver options:
+
+        row_group_size : int
+            Number of messages in each row group when writing.  Smaller row
+            groups can be skipped more precisely but compress less
+            efficiently.  Default is 100000.
+        columns : list
+            Only read these fields, plus `type` and any fields used by a
+            predicate.  Messages will not match the schema, so this
+            requires `_check=False`.
+        batch_size : int
+            Number of rows to convert to messages at a time when reading.
+            Default is 65536.
+
+    Any other options are passed to ``pyarrow.parquet.ParquetWriter()``, like
+    `compression`.
+    """
+
+    driver_name = 'Parquet'
+    extensions = 'parquet',
+    io_modes = ('r', 'w')
+    supports_where = True
+
+    def open(self, name, mode='r', row_group_size=100000, columns=None, batch_size=65536,
+             where=None, **kwargs):
+
+        import pyarrow.parquet as pq
+        import gpsdio.arrow
+        import gpsdio.where
+
+        if isinstance(name, six.string_types):
+            f = open(name, mode=mode + 'b')
+        else:
+            f = name
+
+        self._arrow_schema = gpsdio.arrow.arrow_schema(self.schema)
+        self._writer = None
+        if mode == 'r':
+            pf = pq.ParquetFile(f)
+            names = pf.schema_arrow.names
+            if columns is not None:
+                wanted = set(columns) | {'type'} | set(c[0] for c in where or ())
+                names = [n for n in names if n in wanted]
+            where_bounds = gpsdio.where.bounds(where or [])
+            row_groups = [i for i in range(pf.num_row_groups)
+                          if gpsdio.arrow.row_group_matches(pf.metadata.row_group(i),
+                                                            where_bounds)]
+            logger.debug("Reading %s of %s row groups", len(row_groups), pf.num_row_groups)
+            self._batches = self._read_batches(pf, row_groups, names, batch_size, where)
+            self._messages = gpsdio.arrow.batches_to_messages(
+                self._batches, gpsdio.arrow.type_fields(self.schema, names))
+        else:
+            self._row_group_size = row_group_size
+            self._buffer = []
+            self._writer = pq.ParquetWriter(f, self._arrow_schema, **kwargs)
+
+        return f
+
+    @staticmethod
+    def _read_batches(pf, row_groups, columns, batch_size, where):
+        import gpsdio.arrow
+        if not row_groups:
+            return
+        for batch in pf.iter_batches(
+                batch_size=batch_size, row_groups=row_groups, columns=columns):
+            if where:
+                batch = gpsdio.arrow.filter_batch(batch, where)
+            if batch.num_rows:
+                yield batch
+
+    def iter_batches(self):
+
+        """
+        Get the remaining data as record batches without building messages.
+        Rows that can't match the driver's predicate are removed, but others
+        may remain.
+
+        Returns
+        -------
+        iterator
+            Producing `pyarrow.RecordBatch()` objects.
+        """
+
+        return self._batches
+
+    @property
+    def mode(self):
+        return self._mode
+
+    def __next__(self):
+        return next(self._messages)
+
+    next = __next__
+
+    def write(self, msg):
+        self._buffer.append(msg)
+        if len(self._buffer) >= self._row_group_size:
+            self._write_row_group()
+
+    def _write_row_group(self):
+        import gpsdio.arrow
+        msgs, self._buffer = self._buffer, []
+        if msgs:
+            batch = gpsdio.arrow.messages_to_batch(msgs, self._arrow_schema)
+            self._writer.write_batch(batch, row_group_size=len(msgs))
+
+    def flush(self):
+
+        """
+        Write buffered messages as a row group.
+        """
+
+        if self._writer is not None:
+            self._write_row_group()
+        return super(ParquetDriver, self).flush()
+
+    def close(self):
+        if self._writer is not None:
+            self._write_row_group()
+            self._writer.close()
+            self._writer = None
+        return super(ParquetDriver, self).close()
+
+
+class ArrowDriver(_BaseDriver):
+
+    """
+    Read and write Apache Arrow IPC files, also known as Feather V2, for
+    exchanging data with columnar tools.  Every record batch contains a
+    single message type, so messages are grouped by type rather than written
+    in their original order.  The file's columns are the union of the fields
+    of every type that was written, and fields that aren't part of a batch's
+    type are null.  Files opened by path are memory-mapped and batches are
+    read without copying.  IPC streams can also be read.  Requires `pyarrow`.
+
+    Batches are buffered in temporary files until the driver is closed, which
+    writes the final file.
+
+    Driver options:
+
+        batch_size : int
+            Maximum number of messages in each record batch when writing.
+            Default is 65536.
+        compression : str
+            Compress batches with 'lz4' or 'zstd'.  Compressed batches must
+            be decompressed when reading, which requires a copy.  Default is
+            no compression.
+    """
+
+    driver_name = 'Arrow'
+    extensions = ('arrow', 'feather')
+    io_modes = ('r', 'w')
+    supports_where = True
+
+    def open(self, name, mode='r', batch_size=65536, compression=None, where=None, **kwargs):
+
+        import pyarrow as pa
+        import gpsdio.arrow
+
+        if isinstance(name, six.string_types):
+            f = open(name, mode=mode + 'b')
+        else:
+            f = name
+
+        self._writer = None
+        self._source = None
+        if mode == 'r':
+            if f is not name:
+                source = self._source = pa.memory_map(name, 'r')
+            else:
+                source = pa.BufferReader(f.read())
+            arrow_schema, batches = gpsdio.arrow.read_ipc(source)
+            self._batches = self._read_batches(batches, where)
+            self._messages = gpsdio.arrow.batches_to_messages(
+                self._batches, gpsdio.arrow.type_fields(self.schema, arrow_schema.names))
+        else:
+            self._writer = gpsdio.arrow.TypedBatchWriter(
+                self.schema, batch_size=batch_size, compression=compression)
+
+        return f
+
+    @staticmethod
+    def _read_batches(batches, where):
+        import gpsdio.arrow
+        for batch in batches:
+            if where:
+                batch = gpsdio.arrow.filter_batch(batch, where)
+            if batch.num_rows:
+                yield batch
+
+    def iter_batches(self):
+
+        """
+        Get the remaining data as record batches without building messages.
+        Rows that can't match the driver's predicate are removed.
+
+        Returns
+        -------
+        iterator
+            Producing `pyarrow.RecordBatch()` objects.
+        """
+
+        return self._batches
+
+    @property
+    def mode(self):
+        return self._mode
+
+    def __next__(self):
+        return next(self._messages)
+
+    next = __next__
+
+    def write(self, msg):
+        self._writer.write(msg)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close(self.f)
+            self._writer = None
+        elif self._source is not None:
+            self._source.close()
+        return super(ArrowDriver, self).close()
+
+
+class CSVDriver(_BaseDriver):
+
+    """
+    Read and write CSV with a section per message type, each starting with a
+    header row of the type's fields.  See `gpsdio.delimited` for the layout.
+    Messages are grouped by type rather than written in their original
+    order.  Missing values are empty cells.  Values are serialized a column
+    at a time in batches and rebuilt with the schema's validators when
+    reading.
+
+    Rows are buffered in temporary files until the driver is closed, which
+    writes every section.
+
+    Driver options:
+
+        dialect : str
+            CSV dialect.  Default is 'excel'.
+
+    Any other options, like `delimiter`, are passed to the `csv` module's
+    reader or writer.
+    """
+
+    driver_name = 'CSV'
+    extensions = 'csv',
+    io_modes = ('r', 'w', 'a')
+
+    def open(self, name, mode='r', dialect='excel', **kwargs):
+
+        import gpsdio.delimited
+
+        self._text = None
+        if isinstance(name, six.string_types):
+            if six.PY2:  # pragma: no cover
+                f = text = open(name, mode=mode + 'b')
+            else:
+                f = text = open(name, mode=mode, encoding='utf-8', newline='')
+        else:
+            f = name
+            text = name.f if isinstance(name, _BaseCompressionDriver) else name
+            text_mode = getattr(text, 'mode', '')
+            if six.PY3 and (isinstance(text, (io.BufferedIOBase, io.RawIOBase)) or (
+                    isinstance(text_mode, six.string_types) and 'b' in text_mode)):
+                text = self._text = io.TextIOWrapper(text, encoding='utf-8', newline='')
+
+        self._writer = None
+        if mode == 'r':
+            self._messages = gpsdio.delimited.DelimitedReader(
+                text, self.schema, dialect=dialect, **kwargs)
+        else:
+            self._writer = gpsdio.delimited.DelimitedWriter(
+                text, self.schema, dialect=dialect, **kwargs)
+
+        return f
+
+    @property
+    def mode(self):
+        return self._mode
+
+    def __next__(self):
+        return next(self._messages)
+
+    next = __next__
+
+    def write(self, msg):
+        self._writer.write(msg)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._text is not None:
+            # Leave the underlying file for the compression driver or caller
+            self._text.flush()
+            self._text.detach()
+            self._text = None
+        return super(CSVDriver, self).close()
+
+
+class SQLiteDriver(_BaseDriver):
+
+    """
+    Store messages in an SQLite database with one table per message type,
+    which provides an embedded store for looking up vessels without reading
+    every message.  See `gpsdio.sqlite` for the layout.  Messages are
+    inserted in batches inside a single transaction using WAL journaling, and
+    indexes are created when the driver is closed.  Predicates are translated
+    to SQL `WHERE` clauses.  Messages are read in the order they were written.
+
+    Only paths are supported.  Opening a database in write mode drops any
+    existing message tables.
+
+    Driver options:
+
+        batch_size : int
+            Number of messages of a single type to insert at once.  Default
+            is 10000.
+        indexes : list
+            Tuples of columns to index.  Default is `[('mmsi', 'timestamp')]`.
+            Tables lacking any of an index's columns are skipped.
+    """
+
+    driver_name = 'SQLite'
+    extensions = ('sqlite', 'sqlite3')
+    io_modes = ('r', 'w', 'a')
+    supports_where = True
+
+    def open(self, name, mode='r', batch_size=None, indexes=None, where=None, **kwargs):
+
+        import sqlite3
+        import gpsdio.sqlite
+
+        if not isinstance(name, six.string_types):
+            raise ValueError("The SQLite driver requires a path: {}".format(name))
+
+        if mode == 'r':
+            if not os.path.exists(name):
+                raise IOError("No such file: {}".format(name))
+            conn = sqlite3.connect(name)
+        else:
+            conn = sqlite3.connect(name, isolation_level=None)
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = NORMAL')
+            if mode == 'w':
+                for mtype in gpsdio.sqlite.tables(conn):
+                    conn.execute('DROP TABLE {}'.format(
+                        gpsdio.sqlite.quote(gpsdio.sqlite.table_name(mtype))))
+
+        self._name = name
+        self._closed = False
+        self._writer = None
+        if mode == 'r':
+            self._messages = gpsdio.sqlite.query(conn, where=where)
+        else:
+            self._writer = gpsdio.sqlite.SQLiteWriter(
+                conn, self.schema,
+                batch_size=batch_size or gpsdio.sqlite.BATCH_SIZE,
+                indexes=gpsdio.sqlite.INDEXES if indexes is None else indexes)
+
+        return conn
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def mode(self):
+        return self._mode
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def __next__(self):
+        return next(self._messages)
+
+    next = __next__
+
+    def write(self, msg):
+        self._writer.write(msg)
+
+    def flush(self):
+        if self._writer is not None:
+            self._writer.commit()
+
+    def close(self):
+        if self._closed:
+            return
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        self._closed = True
+        return self.f.close()
+
+
 _DRIVERS = _BaseDriver.by_name
 _DRIVERS_BY_EXT = _BaseDriver.by_extension
 _COMPRESSION = _BaseCompressionDriver.by_name
@@ -15,3 +15,11 @@ class SchemaError(GPSDIOException):
     """
     Schema validation failed.
     """
+
+
+class UnsupportedOperation(GPSDIOException):
+
+    """
+    The driver, compression, or input can't perform an operation, like
+    seeking within a compressed file.
+    """
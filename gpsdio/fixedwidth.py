@@ -0,0 +1,383 @@
+"""
+Fixed-width binary records stored in NumPy structured arrays.
+
+Each message type is stored in its own section of fixed-width records, so a
+file can be memory-mapped and read without parsing.  Field types are derived
+from the schema's validators with `gpsdio.schema.field_type()`.  The `type`
+field is implied by the section and is not stored.
+
+File layout::
+
+    MAGIC                       8 bytes
+    header length               little-endian uint64
+    header                      UTF-8 JSON
+    padding                     to a multiple of ALIGN
+    order                       uint16 section index of every message
+    sections                    one per type, each padded to ALIGN
+
+Section and order offsets in the header are relative to the end of the
+padded header.  Missing values are stored as `NULL_INT` for integers, `NaN`
+for floats, `NaT` for datetimes, and `NULL_STR` for strings.
+"""
+
+
+import json
+import logging
+import shutil
+import struct
+import tempfile
+from array import array
+
+import six
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from gpsdio.schema import field_type
+from gpsdio.validate import str2datetime
+
+
+logger = logging.getLogger('gpsdio')
+
+
+MAGIC = b'GPSDIOFW'
+VERSION = 1
+ALIGN = 64
+
+# Messages are buffered and converted to records this many at a time
+CHUNK_SIZE = 65536
+
+# Maximum number of UTF-8 bytes for string fields, taken from the AIVDM
+# field sizes.  `data` holds a hex payload.
+STRING_WIDTHS = {
+    'callsign': 7,
+    'data': 256,
+    'destination': 20,
+    'name': 34,
+    'shipname': 20,
+    'text': 162,
+    'vendorid': 7,
+}
+DEFAULT_STRING_WIDTH = 32
+
+NULL_INT = -2 ** 31
+NULL_STR = b'\xff'
+
+_DTYPES = {
+    'int': '<i4',
+    'float': '<f8',
+    'datetime': '<M8[us]',
+}
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("Fixed-width records require numpy")
+
+
+def _padding(n):
+    return -n % ALIGN
+
+
+def build_dtype(fields, string_widths=None):
+
+    """
+    Build the record dtype for a single message type.
+
+    Parameters
+    ----------
+    fields : dict
+        A single type's fields from `gpsdio.schema.build_schema()`.
+    string_widths : dict, optional
+        Override the maximum number of bytes for string fields.
+
+    Raises
+    ------
+    ValueError
+        A field's kind can't be stored in a fixed-width record.
+
+    Returns
+    -------
+    numpy.dtype
+    """
+
+    _require_numpy()
+
+    widths = dict(STRING_WIDTHS, **(string_widths or {}))
+    descr = []
+    for name, definition in six.iteritems(fields):
+        if name == 'type':
+            continue
+        kind, _ = field_type(definition['validate'])
+        if kind == 'str':
+            descr.append((name, 'S{}'.format(widths.get(name, DEFAULT_STRING_WIDTH))))
+        elif kind in _DTYPES:
+            descr.append((name, _DTYPES[kind]))
+        else:
+            raise ValueError("Can't store field '{}' in a fixed-width record".format(name))
+    return np.dtype(descr)
+
+
+def _encoder(name, dtype):
+
+    """
+    Get a function converting a message value to a record value.
+    """
+
+    kind = dtype.kind
+    if kind == 'S':
+        width = dtype.itemsize
+
+        def encode(value):
+            if value is None:
+                return NULL_STR
+            value = value.encode('utf-8')
+            if len(value) > width:
+                raise ValueError(
+                    "Value for '{}' is longer than {} bytes - increase the width with "
+                    "the `string_widths` option: {!r}".format(name, width, value))
+            return value
+    elif kind == 'M':
+        def encode(value):
+            return np.datetime64('NaT') if value is None else str2datetime(value)
+    elif kind == 'f':
+        def encode(value):
+            return np.nan if value is None else value
+    else:
+        def encode(value):
+            return NULL_INT if value is None else value
+    return encode
+
+
+class _Section(object):
+
+    """
+    Buffer the records for one message type in a temporary file.
+    """
+
+    def __init__(self, index, mtype, dtype, defaults):
+        self.index = index
+        self.mtype = mtype
+        self.dtype = dtype
+        self.count = 0
+        self._fields = [(name, defaults.get(name), _encoder(name, dtype[name]))
+                        for name in dtype.names]
+        self._rows = []
+        self._tmp = tempfile.TemporaryFile()
+
+    def append(self, msg):
+        self._rows.append(tuple(
+            encode(msg.get(name, default)) for name, default, encode in self._fields))
+        if len(self._rows) >= CHUNK_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self._rows:
+            self._tmp.write(np.array(self._rows, dtype=self.dtype).tobytes())
+            self.count += len(self._rows)
+            self._rows = []
+
+    def copy_to(self, f):
+        self._tmp.seek(0)
+        shutil.copyfileobj(self._tmp, f)
+        self._tmp.close()
+
+
+class FixedWidthWriter(object):
+
+    """
+    Write messages as fixed-width records.  Records are buffered per type in
+    temporary files until `close()`, which writes the final file.
+    """
+
+    def __init__(self, f, schema, string_widths=None):
+
+        """
+        Parameters
+        ----------
+        f : file
+            Open in binary write mode.
+        schema : dict
+            From `gpsdio.schema.build_schema()`.
+        string_widths : dict, optional
+            See `build_dtype()`.
+        """
+
+        _require_numpy()
+
+        self._f = f
+        self._schema = schema
+        self._string_widths = string_widths
+        self._sections = {}
+        self._order = array('H')
+
+    def _section(self, mtype):
+        fields = self._schema.get(mtype)
+        if fields is None:
+            raise ValueError("Can't store type {} - not in the schema".format(mtype))
+        section = self._sections[mtype] = _Section(
+            len(self._sections), mtype, build_dtype(fields, self._string_widths),
+            {n: d.get('default') for n, d in six.iteritems(fields)})
+        return section
+
+    def write(self, msg):
+        mtype = msg['type']
+        section = self._sections.get(mtype) or self._section(mtype)
+        section.append(msg)
+        self._order.append(section.index)
+
+    def close(self):
+
+        """
+        Write the header, order, and sections.
+        """
+
+        sections = sorted(self._sections.values(), key=lambda s: s.index)
+        offset = len(self._order) * 2
+        offset += _padding(offset)
+        header = {'version': VERSION, 'count': len(self._order), 'sections': []}
+        for section in sections:
+            section.flush()
+            header['sections'].append({
+                'type': section.mtype,
+                'count': section.count,
+                'offset': offset,
+                'dtype': section.dtype.descr,
+            })
+            offset += section.count * section.dtype.itemsize
+            offset += _padding(offset)
+
+        header = json.dumps(header).encode('utf-8')
+        prefix = MAGIC + struct.pack('<Q', len(header)) + header
+        self._f.write(prefix + b'\0' * _padding(len(prefix)))
+
+        order = np.frombuffer(self._order, dtype='<u2').tobytes()
+        self._f.write(order + b'\0' * _padding(len(order)))
+        for section in sections:
+            section.copy_to(self._f)
+            self._f.write(b'\0' * _padding(section.count * section.dtype.itemsize))
+
+
+class FixedWidthReader(object):
+
+    """
+    Access fixed-width records in a buffer, which is normally a memory-mapped
+    file.  Iterating produces messages in the order they were written.
+    """
+
+    def __init__(self, buf):
+
+        """
+        Parameters
+        ----------
+        buf : numpy.ndarray
+            A `uint8` array or `numpy.memmap()` containing a complete file.
+        """
+
+        _require_numpy()
+
+        if bytes(buf[:len(MAGIC)]) != MAGIC:
+            raise ValueError("Not a fixed-width gpsdio file")
+        size, = struct.unpack('<Q', bytes(buf[len(MAGIC):len(MAGIC) + 8]))
+        start = len(MAGIC) + 8
+        header = json.loads(bytes(buf[start:start + size]).decode('utf-8'))
+        if header['version'] > VERSION:
+            raise ValueError("Unsupported fixed-width version: {}".format(header['version']))
+        start += size
+        start += _padding(start)
+
+        self._count = header['count']
+        self.order = np.frombuffer(buf, dtype='<u2', count=self._count, offset=start)
+        self.types = []
+        self.arrays = {}
+        for section in header['sections']:
+            dtype = np.dtype([tuple(d) for d in section['dtype']])
+            self.types.append(section['type'])
+            self.arrays[section['type']] = np.frombuffer(
+                buf, dtype=dtype, count=section['count'], offset=start + section['offset'])
+        self._rows = None
+
+    def __len__(self):
+        return self._count
+
+    @staticmethod
+    def _decoder(mtype, dtype):
+
+        """
+        Get a function converting a record from `ndarray.tolist()` to a
+        message.
+        """
+
+        names = dtype.names
+        strings = [i for i, n in enumerate(names) if dtype[n].kind == 'S']
+        ints = [i for i, n in enumerate(names) if dtype[n].kind == 'i']
+        floats = [i for i, n in enumerate(names) if dtype[n].kind == 'f']
+
+        def decode(record):
+            values = list(record)
+            for i in strings:
+                v = values[i]
+                values[i] = None if v == NULL_STR else v.decode('utf-8')
+            for i in ints:
+                if values[i] == NULL_INT:
+                    values[i] = None
+            for i in floats:
+                # NaN is the only value that isn't equal to itself
+                if values[i] != values[i]:
+                    values[i] = None
+            msg = dict(zip(names, values))
+            msg['type'] = mtype
+            return msg
+
+        return decode
+
+    def _records(self, mtype, first=0):
+
+        """
+        Produce decoded messages for a single type a chunk at a time.
+        """
+
+        arr = self.arrays[mtype]
+        decode = self._decoder(mtype, arr.dtype)
+        for start in range(first, len(arr), CHUNK_SIZE):
+            for record in arr[start:start + CHUNK_SIZE].tolist():
+                yield decode(record)
+
+    def iterate(self, first=0):
+
+        """
+        Produce messages in the order they were written starting from a
+        position in the file.
+        """
+
+        records = [self._records(mtype, int(np.count_nonzero(self.order[:first] == i)))
+                   for i, mtype in enumerate(self.types)]
+        for start in range(first, self._count, CHUNK_SIZE):
+            for index in self.order[start:start + CHUNK_SIZE].tolist():
+                yield next(records[index])
+
+    def __iter__(self):
+        return self.iterate()
+
+    def __getitem__(self, index):
+
+        """
+        Get the message at a position in the file.
+        """
+
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("Index out of range: {}".format(index))
+        if self._rows is None:
+            # Position of every message within its section
+            rows = np.empty(self._count, dtype=np.int64)
+            for i in range(len(self.types)):
+                mask = self.order == i
+                rows[mask] = np.arange(np.count_nonzero(mask))
+            self._rows = rows
+        mtype = self.types[self.order[index]]
+        arr = self.arrays[mtype]
+        return self._decoder(mtype, arr.dtype)(arr[self._rows[index]].tolist())
@@ -0,0 +1,1002 @@
+"""
+Sidecar offset indexes for seeking within uncompressed files.
+
+`build()` scans a file once and writes an index next to it, like
+`positions.json.idx`, containing:
+
+- The byte offset of every message, by position in the file.
+- Sampled timestamps and their positions, if the file is sorted by time.
+- Ranges of positions containing each MMSI.
+- Ranges of positions inside each cell of a regular `lon`/`lat` grid.
+- The file's bounds and time range.
+
+`gpsdio.open(path, start=..., end=..., mmsi=..., bbox=...)` uses the index,
+when present and current, to read only the byte ranges that can contain
+matching messages.  Messages are still checked against the equivalent
+predicate, so ranges may be generous.  Drivers must have a `tell()` method
+producing the offset of the next message to be indexed.
+
+`write_manifest()` summarizes every file in a directory in a single
+`gpsdio-manifest.json` so `candidates()` can rule out files by bounds and
+time range without opening them.
+"""
+
+
+from array import array
+from bisect import bisect_left
+import io
+import itertools
+import json
+import logging
+import math
+import os
+import sys
+
+import msgpack
+import six
+
+import gpsdio
+import gpsdio.bloom
+from gpsdio.validate import datetime2str
+import gpsdio.where
+
+
+logger = logging.getLogger('gpsdio')
+
+
+try:
+    _accumulate = itertools.accumulate
+except AttributeError:  # pragma: no cover
+    def _accumulate(values):
+        total = 0
+        for v in values:
+            total += v
+            yield total
+
+
+EXTENSION = '.idx'
+VERSION = 1
+
+# Record the timestamp of every Nth message in time sorted files
+SAMPLE = 1000
+
+# Merge ranges for an MMSI separated by this many messages or fewer, which
+# is cheaper to read through than to seek over
+GAP = 16
+
+# Width and height of the spatial grid's cells in degrees
+CELL_SIZE = 1.0
+
+# Directory-level summary written by `write_manifest()`
+MANIFEST = 'gpsdio-manifest.json'
+
+
+def index_path(path):
+
+    """
+    Get the path to a file's index.
+    """
+
+    return path + EXTENSION
+
+
+def _pack(typecode, values):
+
+    """
+    Pack integers into little-endian bytes.
+    """
+
+    values = array(typecode, values)
+    if sys.byteorder == 'big':  # pragma: no cover
+        values.byteswap()
+    return values.tobytes() if six.PY3 else values.tostring()
+
+
+def _unpack(typecode, data):
+
+    """
+    Unpack integers from `_pack()`.
+    """
+
+    values = array(typecode)
+    if six.PY3:
+        values.frombytes(data)
+    else:  # pragma: no cover
+        values.fromstring(data)
+    if sys.byteorder == 'big':  # pragma: no cover
+        values.byteswap()
+    return values
+
+
+def _timestamp(value):
+    return datetime2str(gpsdio.where.to_datetime(value))
+
+
+def _grid(cell_size):
+
+    """
+    Get the number of rows and columns in a global grid.
+    """
+
+    return int(math.ceil(180 / cell_size)), int(math.ceil(360 / cell_size))
+
+
+def _cell_coords(lon, lat, cell_size):
+
+    """
+    Get the `(row, col)` of the cell containing a point.  Points outside the
+    valid range are placed in the nearest cell.
+    """
+
+    rows, cols = _grid(cell_size)
+    row = min(max(int((lat + 90) // cell_size), 0), rows - 1)
+    col = min(max(int((lon + 180) // cell_size), 0), cols - 1)
+    return row, col
+
+
+def cell(lon, lat, cell_size=CELL_SIZE):
+
+    """
+    Get the ID of the grid cell containing a point.
+
+    Parameters
+    ----------
+    lon : float
+        Longitude.
+    lat : float
+        Latitude.
+    cell_size : float, optional
+        Cell size in degrees.
+
+    Returns
+    -------
+    int
+    """
+
+    row, col = _cell_coords(lon, lat, cell_size)
+    return row * _grid(cell_size)[1] + col
+
+
+def _add_run(runs, key, position, gap):
+
+    """
+    Add a position to the `[start, stop, ...]` ranges for a key.
+    """
+
+    ranges = runs.get(key)
+    if ranges is None:
+        runs[key] = [position, position + 1]
+    elif position - ranges[-1] <= gap:
+        ranges[-1] = position + 1
+    else:
+        ranges.extend((position, position + 1))
+
+
+def _select(runs, keys, first, stop):
+
+    """
+    Merge the ranges for several keys, clipped to `first` and `stop`.
+    """
+
+    ranges = []
+    for key in keys:
+        found = runs.get(key, ())
+        for a, b in zip(found[::2], found[1::2]):
+            a, b = max(a, first), min(b, stop)
+            if a < b:
+                ranges.append((a, b))
+
+    out = []
+    for a, b in sorted(ranges):
+        if out and a <= out[-1][1]:
+            out[-1] = (out[-1][0], max(b, out[-1][1]))
+        else:
+            out.append((a, b))
+    return out
+
+
+def _intersect(left, right):
+
+    """
+    Intersect two lists of sorted, non-overlapping ranges.
+    """
+
+    out = []
+    i = j = 0
+    while i < len(left) and j < len(right):
+        a = max(left[i][0], right[j][0])
+        b = min(left[i][1], right[j][1])
+        if a < b:
+            out.append((a, b))
+        if left[i][1] < right[j][1]:
+            i += 1
+        else:
+            j += 1
+    return out
+
+
+def _pack_runs(runs):
+    return (
+        _pack('Q', runs),
+        _pack('I', (len(r) for r in six.itervalues(runs))),
+        _pack('I', itertools.chain.from_iterable(six.itervalues(runs))))
+
+
+def _unpack_runs(keys, counts, ranges):
+    out = {}
+    ranges = _unpack('I', ranges)
+    start = 0
+    for key, count in zip(_unpack('Q', keys), _unpack('I', counts)):
+        out[key] = ranges[start:start + count].tolist()
+        start += count
+    return out
+
+
+class _Extent(object):
+
+    """
+    Track the bounds and time range of messages, like `gpsdio info`.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.bounds = None
+        self.time_range = None
+        self.mmsi = set()
+
+    def update(self, msg):
+        self.count += 1
+
+        m = msg.get('mmsi')
+        if m is not None:
+            self.mmsi.add(m)
+
+        x = msg.get('lon')
+        y = msg.get('lat')
+        if x is not None and y is not None:
+            if self.bounds is None:
+                self.bounds = (x, y, x, y)
+            else:
+                xmin, ymin, xmax, ymax = self.bounds
+                self.bounds = (min(x, xmin), min(y, ymin), max(x, xmax), max(y, ymax))
+
+        ts = msg.get('timestamp')
+        if ts is not None:
+            ts = datetime2str(ts)
+            if self.time_range is None:
+                self.time_range = (ts, ts)
+            else:
+                self.time_range = (min(ts, self.time_range[0]), max(ts, self.time_range[1]))
+
+
+class Index(object):
+
+    """
+    Message offsets for a single file.
+    """
+
+    def __init__(self, offsets, end, size, mtime, driver, timestamps=None, mmsi=None,
+                 cells=None, cell_size=None, bounds=None, time_range=None):
+
+        """
+        Parameters
+        ----------
+        offsets : array.array
+            Byte offset of every message.  Written to disk as differences
+            between consecutive offsets.
+        end : int
+            Offset of the end of the last message.
+        size : int
+            Size of the indexed file.
+        mtime : float
+            Modification time of the indexed file.
+        driver : str
+            Name of the driver used to read the file.
+        timestamps : list, optional
+            Sorted `(timestamp, position)` samples.  Only present for files
+            sorted by time.
+        mmsi : dict, optional
+            `{mmsi: [start, stop, start, stop, ...]}` ranges of positions.
+        cells : dict, optional
+            `{cell: [start, stop, start, stop, ...]}` ranges of positions for
+            each grid cell from `cell()`.
+        cell_size : float, optional
+            Size of the grid's cells in degrees.  Required for `cells`.
+        bounds : tuple, optional
+            `(xmin, ymin, xmax, ymax)` of every message with a position.
+        time_range : tuple, optional
+            Earliest and latest timestamp as strings.
+        """
+
+        self.offsets = offsets
+        self.end = end
+        self.size = size
+        self.mtime = mtime
+        self.driver = driver
+        self.timestamps = timestamps
+        self.mmsi = mmsi or {}
+        self.cells = cells or {}
+        self.cell_size = cell_size
+        self.bounds = bounds
+        self.time_range = time_range
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def cells_in(self, bbox):
+
+        """
+        Get the indexed grid cells intersecting a bounding box.
+
+        Parameters
+        ----------
+        bbox : tuple
+            `(xmin, ymin, xmax, ymax)`.
+
+        Returns
+        -------
+        list
+        """
+
+        xmin, ymin, xmax, ymax = bbox
+        row0, col0 = _cell_coords(xmin, ymin, self.cell_size)
+        row1, col1 = _cell_coords(xmax, ymax, self.cell_size)
+        cols = _grid(self.cell_size)[1]
+        return [c for c in self.cells
+                if row0 <= c // cols <= row1 and col0 <= c % cols <= col1]
+
+    def record_ranges(self, start=None, end=None, mmsi=None, bbox=None):
+
+        """
+        Get the ranges of positions that can contain matching messages.
+
+        Parameters
+        ----------
+        start : str or datetime.datetime, optional
+            Earliest timestamp.
+        end : str or datetime.datetime, optional
+            Latest timestamp, exclusive.
+        mmsi : iterable, optional
+            MMSIs to find.
+        bbox : tuple, optional
+            `(xmin, ymin, xmax, ymax)` containing the messages to find.
+
+        Returns
+        -------
+        list or None
+            Sorted, non-overlapping `(start, stop)` tuples, or `None` if the
+            index can't narrow the search.
+        """
+
+        first, stop = 0, len(self)
+        narrowed = False
+        if self.timestamps and (start is not None or end is not None):
+            narrowed = True
+            times = [t for t, _ in self.timestamps]
+            if start is not None:
+                i = bisect_left(times, _timestamp(start)) - 1
+                first = self.timestamps[i][1] if i >= 0 else 0
+            if end is not None:
+                i = bisect_left(times, _timestamp(end))
+                stop = self.timestamps[i][1] if i < len(times) else len(self)
+
+        selections = []
+        if mmsi is not None:
+            selections.append(_select(self.mmsi, mmsi, first, stop))
+        if bbox is not None and self.cell_size:
+            selections.append(_select(self.cells, self.cells_in(bbox), first, stop))
+
+        if not selections:
+            if not narrowed:
+                return None
+            return [(first, stop)] if first < stop else []
+
+        out = selections[0]
+        for other in selections[1:]:
+            out = _intersect(out, other)
+        return out
+
+    def byte_ranges(self, record_ranges):
+
+        """
+        Convert ranges of positions to ranges of bytes.  Any bytes before the
+        first message, like a header, are always included.
+
+        Parameters
+        ----------
+        record_ranges : list
+            From `record_ranges()`.
+
+        Returns
+        -------
+        list
+            `(start, stop)` byte offsets.
+        """
+
+        out = []
+        if len(self) and self.offsets[0] > 0:
+            out.append((0, self.offsets[0]))
+        for a, b in record_ranges:
+            start = self.offsets[a]
+            stop = self.offsets[b] if b < len(self) else self.end
+            if out and out[-1][1] == start:
+                out[-1] = (out[-1][0], stop)
+            else:
+                out.append((start, stop))
+        return out
+
+    def is_current(self, path):
+
+        """
+        Determine if the index still describes a file.
+        """
+
+        stat = os.stat(path)
+        return stat.st_size == self.size and stat.st_mtime == self.mtime
+
+    def save(self, path):
+
+        """
+        Write the index.
+
+        Parameters
+        ----------
+        path : str
+            Index path.
+        """
+
+        # Offsets are stored as differences, which are never larger than a
+        # single message
+        deltas = [b - a for a, b in zip(itertools.chain([0], self.offsets), self.offsets)]
+        mmsi, counts, ranges = _pack_runs(self.mmsi)
+        cells, cell_counts, cell_ranges = _pack_runs(self.cells)
+        data = {
+            'version': VERSION,
+            'driver': self.driver,
+            'size': self.size,
+            'mtime': self.mtime,
+            'end': self.end,
+            'offsets': _pack('I', deltas),
+            'timestamps': self.timestamps,
+            'mmsi': mmsi,
+            'counts': counts,
+            'ranges': ranges,
+            'cell_size': self.cell_size,
+            'cells': cells,
+            'cell_counts': cell_counts,
+            'cell_ranges': cell_ranges,
+            'bounds': self.bounds,
+            'time_range': self.time_range,
+        }
+        with open(path, 'wb') as f:
+            f.write(msgpack.packb(data, use_bin_type=True))
+
+    @classmethod
+    def load(cls, path):
+
+        """
+        Read an index.
+
+        Parameters
+        ----------
+        path : str
+            Index path.
+
+        Raises
+        ------
+        ValueError
+            If the index was written by a newer version.
+
+        Returns
+        -------
+        Index
+        """
+
+        with open(path, 'rb') as f:
+            data = msgpack.unpackb(f.read(), raw=False)
+        if data['version'] > VERSION:
+            raise ValueError("Unsupported index version: {}".format(data['version']))
+
+        return cls(
+            array('Q', _accumulate(_unpack('I', data['offsets']))),
+            data['end'], data['size'], data['mtime'], data['driver'],
+            timestamps=[tuple(t) for t in data['timestamps']] if data['timestamps'] else None,
+            mmsi=_unpack_runs(data['mmsi'], data['counts'], data['ranges']),
+            cells=_unpack_runs(data['cells'], data['cell_counts'], data['cell_ranges']),
+            cell_size=data['cell_size'],
+            bounds=tuple(data['bounds']) if data['bounds'] else None,
+            time_range=tuple(data['time_range']) if data['time_range'] else None)
+
+
+def build(path, driver=None, sample=SAMPLE, gap=GAP, do=None, write=True,
+          cell_size=CELL_SIZE):
+
+    """
+    Scan a file and write its index.
+
+    Parameters
+    ----------
+    path : str
+        Uncompressed file to index.
+    driver : str, optional
+        Driver name.  Normally detected from the path.
+    sample : int, optional
+        Record the timestamp of every Nth message in time sorted files.
+    gap : int, optional
+        Merge ranges for an MMSI or grid cell separated by this many messages
+        or fewer.
+    do : dict, optional
+        Driver options.
+    write : bool, optional
+        Write the index to `index_path(path)`.
+    cell_size : float, optional
+        Size of the spatial grid's cells in degrees.
+
+    Raises
+    ------
+    ValueError
+        The file is compressed or the driver can't report offsets.
+
+    Returns
+    -------
+    Index
+    """
+
+    from gpsdio.drivers import _COMPRESSION_BY_EXT
+
+    if os.path.splitext(path)[1].strip('.') in _COMPRESSION_BY_EXT:
+        raise ValueError("Can't index compressed files: {}".format(path))
+
+    stat = os.stat(path)
+    offsets = array('Q')
+    mmsi = {}
+    cells = {}
+    extent = _Extent()
+    timestamps = []
+    last = None
+    is_sorted = True
+
+    with gpsdio.open(path, driver=driver, compression=False, do=do, _check=False) as src:
+        if not hasattr(src.driver, 'tell'):
+            raise ValueError("The {} driver can't report message offsets".format(
+                src.driver.driver_name))
+        tell = src.driver.tell
+        position = 0
+        while True:
+            offset = tell()
+            try:
+                msg = next(src)
+            except StopIteration:
+                break
+            offsets.append(offset)
+            extent.update(msg)
+
+            m = msg.get('mmsi')
+            if m is not None:
+                _add_run(mmsi, m, position, gap)
+
+            x, y = msg.get('lon'), msg.get('lat')
+            if x is not None and y is not None:
+                try:
+                    _add_run(cells, cell(x, y, cell_size), position, gap)
+                except (TypeError, ValueError):
+                    pass
+
+            if is_sorted:
+                ts = msg.get('timestamp')
+                ts = None if ts is None else datetime2str(ts)
+                if ts is None or (last is not None and ts < last):
+                    logger.debug("%s isn't sorted by time at message %s", path, position)
+                    is_sorted = False
+                else:
+                    if position % sample == 0:
+                        timestamps.append((ts, position))
+                    last = ts
+
+            position += 1
+        end = tell()
+        driver = src.driver.driver_name
+
+    index = Index(offsets, end, stat.st_size, stat.st_mtime, driver,
+                  timestamps=timestamps if is_sorted else None, mmsi=mmsi,
+                  cells=cells, cell_size=cell_size, bounds=extent.bounds,
+                  time_range=extent.time_range)
+    if write:
+        index.save(index_path(path))
+    return index
+
+
+def load(path):
+
+    """
+    Load a file's index if it exists and is current.
+
+    Parameters
+    ----------
+    path : str
+        Indexed file.
+
+    Returns
+    -------
+    Index or None
+    """
+
+    ipath = index_path(path)
+    if not os.path.exists(ipath):
+        return None
+    index = Index.load(ipath)
+    if not index.is_current(path):
+        logger.warning("Ignoring %s - the file has changed since it was indexed", ipath)
+        return None
+    return index
+
+
+class RangeFile(io.RawIOBase):
+
+    """
+    A read-only binary file presenting byte ranges of another file as if
+    they were contiguous.
+    """
+
+    def __init__(self, path, ranges):
+
+        """
+        Parameters
+        ----------
+        path : str
+            File to read.
+        ranges : list
+            `(start, stop)` byte offsets in ascending order.
+        """
+
+        super(RangeFile, self).__init__()
+        self.name = path
+        self.mode = 'rb'
+        self._f = open(path, 'rb')
+        self._ranges = iter(ranges)
+        self._remaining = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._remaining:
+            try:
+                start, stop = next(self._ranges)
+            except StopIteration:
+                return 0
+            self._f.seek(start)
+            self._remaining = stop - start
+        data = self._f.read(min(len(b), self._remaining))
+        self._remaining -= len(data)
+        b[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        self._f.close()
+        super(RangeFile, self).close()
+
+
+def open_ranges(path, start=None, end=None, mmsi=None, bbox=None):
+
+    """
+    Get a file object containing only the parts of a file that can contain
+    matching messages according to its index.
+
+    Parameters
+    ----------
+    path : str
+        Indexed file.
+    start : str or datetime.datetime, optional
+        Earliest timestamp.
+    end : str or datetime.datetime, optional
+        Latest timestamp, exclusive.
+    mmsi : iterable, optional
+        MMSIs to find.
+    bbox : tuple, optional
+        `(xmin, ymin, xmax, ymax)` containing the messages to find.
+
+    Returns
+    -------
+    io.BufferedReader or None
+        `None` if the file doesn't have a current index or the index can't
+        narrow the search.
+    """
+
+    index = load(path)
+    if index is None:
+        return None
+    ranges = index.record_ranges(start=start, end=end, mmsi=mmsi, bbox=bbox)
+    if ranges is None:
+        return None
+    logger.debug("Reading %s message ranges from %s using its index", len(ranges), path)
+    return io.BufferedReader(RangeFile(path, index.byte_ranges(ranges)))
+
+
+def data_files(directory):
+
+    """
+    Find the files in a directory that gpsdio can read, sorted by name.
+    Sidecar files and the manifest are skipped.
+
+    Parameters
+    ----------
+    directory : str
+        Directory to list.
+
+    Returns
+    -------
+    list
+        Paths.
+    """
+
+    from gpsdio.drivers import _COMPRESSION_BY_EXT
+    from gpsdio.drivers import _DRIVERS_BY_EXT
+
+    out = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if name.startswith('.') or name == MANIFEST or not os.path.isfile(path):
+            continue
+        base, ext = os.path.splitext(name)
+        if ext.strip('.') in _COMPRESSION_BY_EXT:
+            base, ext = os.path.splitext(base)
+        if ext.strip('.') in _DRIVERS_BY_EXT:
+            out.append(path)
+    return out
+
+
+def summarize(path, driver=None, compression=None, do=None, co=None):
+
+    """
+    Scan a file for its manifest entry without indexing it, which also works
+    for compressed files.
+
+    Parameters
+    ----------
+    path : str
+        File to scan.
+    driver : str, optional
+        Driver name.  Normally detected from the path.
+    compression : str, optional
+        Compression name.  Normally detected from the path.
+    do : dict, optional
+        Driver options.
+    co : dict, optional
+        Compression options.
+
+    Returns
+    -------
+    dict
+        See `write_manifest()`.
+    """
+
+    return _entry(_scan(path, driver=driver, compression=compression, do=do, co=co),
+                  os.stat(path))
+
+
+def _scan(path, **kwargs):
+    extent = _Extent()
+    with gpsdio.open(path, _check=False, **kwargs) as src:
+        for msg in src:
+            extent.update(msg)
+    return extent
+
+
+def _entry(extent, stat):
+    return {
+        'count': extent.count,
+        'bounds': list(extent.bounds) if extent.bounds else None,
+        'min_timestamp': extent.time_range[0] if extent.time_range else None,
+        'max_timestamp': extent.time_range[1] if extent.time_range else None,
+        'size': stat.st_size,
+        'mtime': stat.st_mtime,
+    }
+
+
+def write_manifest(directory, driver=None, do=None, sample=SAMPLE, gap=GAP,
+                   cell_size=CELL_SIZE, bloom=None):
+
+    """
+    Index every uncompressed file in a directory and write a manifest
+    summarizing each file.  Compressed files are scanned but not indexed.
+
+    The manifest is JSON like::
+
+        {
+            "version": 1,
+            "files": {
+                "2015-01-01.json": {
+                    "count": 1024,
+                    "bounds": [xmin, ymin, xmax, ymax],
+                    "min_timestamp": "2015-01-01T00:00:01.000000Z",
+                    "max_timestamp": "2015-01-01T23:59:58.000000Z",
+                    "size": 181239,
+                    "mtime": 1420156800.0
+                }
+            }
+        }
+
+    where `bounds` are the same as `gpsdio info --bounds`.
+
+    Parameters
+    ----------
+    directory : str
+        Directory containing data files.
+    driver : str, optional
+        Driver name for every file.  Normally detected from each path.
+    do : dict, optional
+        Driver options.
+    sample : int, optional
+        See `build()`.
+    gap : int, optional
+        See `build()`.
+    cell_size : float, optional
+        See `build()`.
+    bloom : dict, optional
+        Also write a Bloom filter for every file with `gpsdio.bloom.write()`
+        using these options, like `{'rate': 0.001}`.
+
+    Returns
+    -------
+    dict
+        The manifest.
+    """
+
+    files = {}
+    for path in data_files(directory):
+        try:
+            index = build(path, driver=driver, sample=sample, gap=gap, do=do,
+                          cell_size=cell_size)
+        except ValueError as e:
+            logger.debug("Not indexing %s: %s", path, e)
+            extent = _scan(path, driver=driver, do=do)
+        else:
+            extent = _Extent()
+            extent.count = len(index)
+            extent.bounds = index.bounds
+            extent.time_range = index.time_range
+            extent.mmsi = index.mmsi
+        files[os.path.basename(path)] = _entry(extent, os.stat(path))
+        if bloom is not None:
+            gpsdio.bloom.write(path, extent.mmsi, **bloom)
+
+    manifest = {'version': VERSION, 'files': files}
+    with open(os.path.join(directory, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(directory):
+
+    """
+    Read a directory's manifest.
+
+    Parameters
+    ----------
+    directory : str
+        Directory containing a manifest from `write_manifest()`.
+
+    Raises
+    ------
+    ValueError
+        If the manifest was written by a newer version.
+
+    Returns
+    -------
+    dict or None
+        `{name: entry}` or `None` if the directory doesn't have a manifest.
+    """
+
+    path = os.path.join(directory, MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        manifest = json.load(f)
+    if manifest['version'] > VERSION:
+        raise ValueError("Unsupported manifest version: {}".format(manifest['version']))
+    return manifest['files']
+
+
+def _can_match(entry, start=None, end=None, bbox=None):
+
+    """
+    Determine if a file described by a manifest entry can contain a match.
+    """
+
+    if not entry['count']:
+        return False
+    if bbox is not None:
+        if entry['bounds'] is None:
+            return False
+        xmin, ymin, xmax, ymax = entry['bounds']
+        if xmax < bbox[0] or ymax < bbox[1] or xmin > bbox[2] or ymin > bbox[3]:
+            return False
+    if start is not None or end is not None:
+        if entry['min_timestamp'] is None:
+            return False
+        if start is not None and entry['max_timestamp'] < _timestamp(start):
+            return False
+        if end is not None and entry['min_timestamp'] >= _timestamp(end):
+            return False
+    return True
+
+
+def select(paths, start=None, end=None, bbox=None, mmsi=None):
+
+    """
+    Remove files that can't contain matching messages.  Files with a current
+    entry in their directory's manifest are skipped without being opened if
+    their bounds or time range can't match, and files with a current Bloom
+    filter from `gpsdio.bloom` are skipped if none of the MMSIs can be
+    present.  Files without an entry or filter, or that changed since they
+    were written, are always included.
+
+    Parameters
+    ----------
+    paths : iterable
+        Data files.
+    start : str or datetime.datetime, optional
+        Earliest timestamp.
+    end : str or datetime.datetime, optional
+        Latest timestamp, exclusive.
+    bbox : tuple, optional
+        `(xmin, ymin, xmax, ymax)` containing the messages to find.
+    mmsi : iterable, optional
+        MMSIs to find.
+
+    Returns
+    -------
+    list
+        Paths in their original order.
+    """
+
+    manifests = {}
+    out = []
+    for path in paths:
+        if start is not None or end is not None or bbox is not None:
+            directory = os.path.dirname(path) or os.curdir
+            if directory not in manifests:
+                manifests[directory] = load_manifest(directory) or {}
+            entry = manifests[directory].get(os.path.basename(path))
+            if entry is not None:
+                stat = os.stat(path)
+                if stat.st_size != entry['size'] or stat.st_mtime != entry['mtime']:
+                    logger.warning(
+                        "Ignoring the manifest entry for %s - the file has changed", path)
+                elif not _can_match(entry, start=start, end=end, bbox=bbox):
+                    logger.debug("Skipping %s - the manifest says it can't match", path)
+                    continue
+        if mmsi is not None and not gpsdio.bloom.might_contain(path, mmsi):
+            logger.debug("Skipping %s - its Bloom filter doesn't contain the MMSIs", path)
+            continue
+        out.append(path)
+    return out
+
+
+def candidates(directory, start=None, end=None, bbox=None, mmsi=None):
+
+    """
+    Find the files in a directory that can contain matching messages with
+    `select()`.
+
+    Parameters
+    ----------
+    directory : str
+        Directory containing data files.
+    start : str or datetime.datetime, optional
+        Earliest timestamp.
+    end : str or datetime.datetime, optional
+        Latest timestamp, exclusive.
+    bbox : tuple, optional
+        `(xmin, ymin, xmax, ymax)` containing the messages to find.
+    mmsi : iterable, optional
+        MMSIs to find.
+
+    Returns
+    -------
+    list
+        Paths sorted by name.
+    """
+
+    return select(data_files(directory), start=start, end=end, bbox=bbox, mmsi=mmsi)
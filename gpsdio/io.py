@@ -8,18 +8,40 @@ with gpsdio.open(infile) as src, gpsdio.open(outfile, 'w') as dst:
 """
 
 
+from collections import deque
+from collections import OrderedDict
+import glob
+import itertools
+import keyword
 import logging
 import os
+import re
 import sys
 
 import six
 
 import gpsdio.base
+import gpsdio.errors
 
 
 logger = logging.getLogger('gpsdio')
 
 
+# Multi-file reads use this many threads, read this many messages at a time,
+# and hold up to this many batches per file
+WORKERS = 4
+BATCH_SIZE = 1000
+READAHEAD = 4
+
+# Partitioned writes keep this many files open and hold up to this many
+# messages per partition, and in total, before writing
+MAX_OPEN = 64
+PARTITION_BUFFER = 1000
+MAX_BUFFERED = 100000
+
+_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
 def open(
         name,
         mode='r',
@@ -29,6 +51,14 @@ def open(
         co=None,
         schema=None,
         schema_extensions=True,
+        where=None,
+        start=None,
+        end=None,
+        mmsi=None,
+        bbox=None,
+        assume_sorted=False,
+        workers=WORKERS,
+        readahead=READAHEAD,
         **kwargs):
 
     """
@@ -37,8 +67,11 @@ def open(
 
     Parameters
     ----------
-    path : str
-        File to be opened.
+    path : str or list
+        File to be opened.  URLs like `tcp://host:port` connect to a network
+        feed, which is read with the `NMEA` driver unless another is given.
+        When reading, a list of paths, a glob like `data/*.json`, or a
+        directory opens every file with a `GPSDIOMultiReader()`.
     mode : str, optional
         Mode to open both the file and driver with.
     compression : str, optional
@@ -51,6 +84,33 @@ def open(
         Additional options to pass to the compression driver.
     schema_extensions : bool, optional
         Use external field extensions?  Ignored if a `schema` is given.
+    where : list, optional
+        Only read messages satisfying every `(field, op, value)` clause.  See
+        `gpsdio.where`.  Drivers that support it use the clauses to skip data
+        that can't match.
+    start : str or datetime.datetime, optional
+        Only read messages with a `timestamp` at or after this time.
+    end : str or datetime.datetime, optional
+        Only read messages with a `timestamp` before this time.
+    mmsi : int or list, optional
+        Only read messages from these vessels.  Like `start` and `end` this is
+        added to `where`, and an uncompressed file with an index from
+        `gpsdio.index.build()` is only read where matches can be found.
+    bbox : tuple, optional
+        Only read messages whose `lon` and `lat` are inside this
+        `(xmin, ymin, xmax, ymax)` box, including its edges.  Uses the
+        spatial grid in the file's index, if present.
+    assume_sorted : bool, optional
+        The input is sorted by `timestamp`, so an uncompressed file without
+        an index can be binary searched for `start` and `end` with
+        `gpsdio.search`.  Unsorted files produce incomplete results.  When
+        reading multiple files, each file must be sorted and they are merged
+        into a single stream sorted by `timestamp`.
+    workers : int, optional
+        Number of threads reading files when reading multiple files.
+    readahead : int, optional
+        Number of batches of messages to read ahead of the consumer per file
+        when reading multiple files.
     kwargs : **kwargs, optional
         Additional options to pass to the file-like object.
 
@@ -58,23 +118,43 @@ def open(
     -------
     GPSDIOReader
         If reading.
+    GPSDIOMultiReader
+        If reading multiple files.
     GPSDIOWriter
         If writing or appending.
     """
 
-    # Drivers have to be imported inside open in order to prevent an import
-    # collision when registering external drivers.
+    import gpsdio.index
+    import gpsdio.net
     import gpsdio.schema
-    from gpsdio.drivers import _COMPRESSION
-    from gpsdio.drivers import _COMPRESSION_BY_EXT
-    from gpsdio.drivers import _DRIVERS
-    from gpsdio.drivers import _DRIVERS_BY_EXT
+    import gpsdio.search
+    import gpsdio.where
+
+    paths = _expand(name)
+    if paths is not None:
+        if mode != 'r':
+            raise ValueError("Multiple files can only be read: {}".format(name))
+        schema = schema or gpsdio.schema.build_schema(extensions=schema_extensions)
+        if mmsi is not None:
+            mmsi = [mmsi] if isinstance(mmsi, six.integer_types) else list(mmsi)
+        paths = gpsdio.index.select(paths, start=start, end=end, bbox=bbox, mmsi=mmsi)
+        return GPSDIOMultiReader(
+            paths, merge=assume_sorted, workers=workers, readahead=readahead,
+            compression=compression, driver=driver, do=do, co=co, schema=schema, where=where,
+            start=start, end=end, mmsi=mmsi, bbox=bbox, assume_sorted=assume_sorted, **kwargs)
 
     if name == '-' and 'r' in mode:
         logger.debug("")
         name = sys.stdin
     elif name == '-' and mode in ('w', 'a'):
         name = sys.stdout
+    elif gpsdio.net.is_url(name):
+        if mode != 'r':
+            raise ValueError("Network sources can only be read: {}".format(name))
+        logger.debug("Connecting to %s", name)
+        name = gpsdio.net.SocketFile(name)
+        compression = compression or False
+        driver = driver or 'NMEA'
 
     logger.debug("Opening '%s' with mode '%s'", name, mode)
 
@@ -85,6 +165,96 @@ def open(
 
     in_name = name if isinstance(name, six.string_types) else getattr(name, 'name', None)
 
+    io_driver, cmp_driver = _drivers(in_name, driver=driver, compression=compression)
+
+    logger.debug("compression driver: %s", cmp_driver)
+    logger.debug("I/O driver: %s", io_driver)
+
+    if cmp_driver:
+        cmp_stream = cmp_driver()
+        cmp_stream.start(name=name, mode=mode, **co)
+        logger.debug("Started compression stream")
+    else:
+        cmp_stream = name
+
+    # Shortcuts for common predicates, which can also use an index
+    shortcuts = []
+    if start is not None:
+        shortcuts.append(('timestamp', '>=', start))
+    if end is not None:
+        shortcuts.append(('timestamp', '<', end))
+    if mmsi is not None:
+        mmsi = [mmsi] if isinstance(mmsi, six.integer_types) else list(mmsi)
+        shortcuts.append(('mmsi', 'in', mmsi))
+    if bbox is not None:
+        xmin, ymin, xmax, ymax = bbox
+        if xmin > xmax or ymin > ymax:
+            raise ValueError("Invalid bounding box: {}".format(bbox))
+        shortcuts.extend([
+            ('lon', '>=', xmin), ('lon', '<=', xmax), ('lat', '>=', ymin), ('lat', '<=', ymax)])
+    if shortcuts:
+        where = gpsdio.where.normalize(where) + shortcuts
+
+    if where:
+        if mode != 'r':
+            raise ValueError("Predicates can only be used when reading")
+        where = gpsdio.where.normalize(where, schema)
+        if io_driver.supports_where:
+            do = dict(do, where=where)
+
+        # Seek straight to the parts of an indexed file that can match
+        if shortcuts and not cmp_driver and isinstance(name, six.string_types):
+            ranges = gpsdio.index.open_ranges(
+                name, start=start, end=end, mmsi=mmsi, bbox=bbox)
+            if ranges is None and assume_sorted and (start is not None or end is not None):
+                ranges = gpsdio.search.open_sorted(
+                    name, start=start, end=end, driver=io_driver.driver_name, do=do)
+            if ranges is not None:
+                cmp_stream = ranges
+
+    stream = io_driver(schema=schema)
+    stream.start(name=cmp_stream, mode=mode, **do)
+    logger.debug("Started I/O stream")
+
+    if mode == 'r':
+        logger.debug("Starting read session")
+        return GPSDIOReader(stream, mode=mode, schema=schema, where=where, **kwargs)
+    elif mode in ('w', 'a'):
+        logger.debug("Starting write or append session")
+        return GPSDIOWriter(stream, mode=mode, schema=schema, **kwargs)
+    else:
+        raise ValueError("Mode '{}' is invalid.".format(mode))
+
+
+def _drivers(name, driver=None, compression=None):
+
+    """
+    Get the I/O driver and compression driver classes for a file, detecting
+    them from its path if not given.
+
+    Parameters
+    ----------
+    name : str
+        Path.
+    driver : str, optional
+        Driver name.
+    compression : str or bool, optional
+        Compression name, or `False` to disable compression.
+
+    Returns
+    -------
+    tuple
+        `(io_driver, cmp_driver)` where `cmp_driver` is `None` if the file
+        isn't compressed.
+    """
+
+    # Drivers have to be imported here in order to prevent an import
+    # collision when registering external drivers.
+    from gpsdio.drivers import _COMPRESSION
+    from gpsdio.drivers import _COMPRESSION_BY_EXT
+    from gpsdio.drivers import _DRIVERS
+    from gpsdio.drivers import _DRIVERS_BY_EXT
+
     # Disable compression checks with False
     if compression is False:
         logger.debug("Disabled auto-checking compression")
@@ -99,7 +269,7 @@ def open(
     else:
         cmp_driver = None
         logger.debug("Detecting compression ...")
-        ext = os.path.splitext(in_name)[1].strip('.')
+        ext = os.path.splitext(name)[1].strip('.')
         if ext in _DRIVERS_BY_EXT:
             logger.debug("Skipping compression - not given and extension matches a driver")
         elif not ext:
@@ -116,34 +286,59 @@ def open(
     # Detect driver
     else:
         logger.debug("Detecting driver ...")
-        _path, ext = os.path.splitext(in_name)
+        _path, ext = os.path.splitext(name)
         if ext.strip('.') in _COMPRESSION_BY_EXT:
             _path, ext = os.path.splitext(_path)
         io_driver = _DRIVERS_BY_EXT[ext.strip('.')]
         logger.debug("Successfully detected driver")
 
-    logger.debug("compression driver: %s", cmp_driver)
-    logger.debug("I/O driver: %s", io_driver)
+    return io_driver, cmp_driver
 
-    if cmp_driver:
-        cmp_stream = cmp_driver()
-        cmp_stream.start(name=name, mode=mode, **co)
-        logger.debug("Started compression stream")
-    else:
-        cmp_stream = name
 
-    stream = io_driver(schema=schema)
-    stream.start(name=cmp_stream, mode=mode, **do)
-    logger.debug("Started I/O stream")
+def _expand(name):
+
+    """
+    Get the paths to read for a list of paths, a glob, or a directory, or
+    `None` for a single input.
+    """
+
+    import gpsdio.index
+    import gpsdio.net
+
+    if isinstance(name, (list, tuple)):
+        return list(name)
+    elif not isinstance(name, six.string_types) or name == '-' or gpsdio.net.is_url(name):
+        return None
+    elif os.path.isdir(name):
+        return gpsdio.index.data_files(name)
+    elif any(c in name for c in '*?[') and not os.path.exists(name):
+        paths = sorted(glob.glob(name))
+        if not paths:
+            raise IOError("No files match: {}".format(name))
+        return paths
+    return None
 
-    if mode == 'r':
-        logger.debug("Starting read session")
-        return GPSDIOReader(stream, mode=mode, schema=schema, **kwargs)
-    elif mode in ('w', 'a'):
-        logger.debug("Starting write or append session")
-        return GPSDIOWriter(stream, mode=mode, schema=schema, **kwargs)
-    else:
-        raise ValueError("Mode '{}' is invalid.".format(mode))
+
+class _Counter(object):
+
+    """
+    Count the messages produced by a driver to track the position in the
+    file.  Like the drivers, iteration can continue after `StopIteration`.
+    """
+
+    def __init__(self, stream, position=0):
+        self.stream = stream
+        self.position = position
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        msg = next(self.stream)
+        self.position += 1
+        return msg
+
+    next = __next__
 
 
 class GPSDIOReader(gpsdio.base.GPSDIOBaseStream):
@@ -153,6 +348,37 @@ class GPSDIOReader(gpsdio.base.GPSDIOBaseStream):
     which can be significant when multiplied across a large number of messages.
     """
 
+    def __init__(self, stream, where=None, **kwargs):
+
+        """
+        See `GPSDIOBaseStream()` for additional parameters.
+
+        Parameters
+        ----------
+        where : list, optional
+            Only produce messages satisfying every clause from
+            `gpsdio.where.normalize()`.  Messages are checked before they are
+            validated.
+        """
+
+        super(GPSDIOReader, self).__init__(stream, **kwargs)
+        self.where = where
+        self._offsets = None
+        self._reset(0)
+
+    def _reset(self, position):
+
+        """
+        Start counting messages from a position and rebuild the iterator.
+        """
+
+        import gpsdio.where
+
+        self._counter = self._iterator = _Counter(self._stream, position)
+        if self.where:
+            self._iterator = six.moves.filter(
+                gpsdio.where.predicate(self.where), self._iterator)
+
     def __iter__(self):
         return self
 
@@ -166,6 +392,162 @@ class GPSDIOReader(gpsdio.base.GPSDIOBaseStream):
 
     next = __next__
 
+    def _offset_index(self):
+
+        """
+        Get an offset index for drivers that seek by byte offset, which is
+        loaded from the file's sidecar index or built by scanning the file.
+        """
+
+        import gpsdio.index
+
+        if self._offsets is None:
+            driver = self._stream
+            f = driver.f
+            if not (hasattr(driver, 'tell') and hasattr(driver, 'seek')):
+                raise gpsdio.errors.UnsupportedOperation(
+                    "The {} driver doesn't support random access".format(driver.driver_name))
+            elif isinstance(f, gpsdio.base.BaseCompressionDriver):
+                raise gpsdio.errors.UnsupportedOperation(
+                    "Can't access compressed input by position: {}".format(self.name))
+            elif isinstance(getattr(f, 'raw', None), gpsdio.index.RangeFile) or \
+                    not isinstance(self.name, six.string_types) or \
+                    not os.path.isfile(self.name):
+                raise gpsdio.errors.UnsupportedOperation(
+                    "Can only access files opened by path by position: {}".format(self.name))
+
+            self._offsets = gpsdio.index.load(self.name) or gpsdio.index.build(
+                self.name, driver=driver.driver_name, write=False)
+        return self._offsets
+
+    def _length(self):
+        if self._stream.random_access:
+            return len(self._stream)
+        return len(self._offset_index())
+
+    def tell(self):
+
+        """
+        Get the position in the file of the next message to be read, which is
+        the number of messages read from the driver since the file was opened
+        or `seek()` was called.  Messages that don't satisfy the predicate
+        are counted.
+
+        Returns
+        -------
+        int
+        """
+
+        return self._counter.position
+
+    def seek(self, position):
+
+        """
+        Continue reading from a message's position in the file.  Drivers that
+        support random access, like `FixedWidth`, do so natively.  For
+        uncompressed `NewlineJSON` and `MsgPack` files opened by path, the
+        first call loads the file's index from `gpsdio index`, or scans the
+        file to build one in memory.
+
+        Parameters
+        ----------
+        position : int
+            Message position.  Negative values count from the end.
+
+        Raises
+        ------
+        gpsdio.errors.UnsupportedOperation
+            The driver, compression, or input can't seek.
+        IndexError
+            Position is outside the file.
+        """
+
+        length = self._length()
+        if position < 0:
+            position += length
+        if not 0 <= position <= length:
+            raise IndexError("Position out of range: {}".format(position))
+
+        if self._stream.random_access:
+            self._stream.seek(position)
+        else:
+            index = self._offset_index()
+            self._stream.seek(index.offsets[position] if position < length else index.end)
+        self._reset(position)
+
+    def __getitem__(self, key):
+
+        """
+        Get validated messages by their position in the file, like `src[10]`
+        or `src[10:20]`.  The predicate is not applied.  Reading continues
+        from the same position afterwards.  See `seek()` for the drivers that
+        support this.
+        """
+
+        length = self._length()
+        if isinstance(key, slice):
+            positions = range(*key.indices(length))
+        else:
+            positions = [key + length if key < 0 else key]
+            if not 0 <= positions[0] < length:
+                raise IndexError("Position out of range: {}".format(key))
+
+        if self._stream.random_access:
+            msgs = [self._stream[p] for p in positions]
+        else:
+            position = self.tell()
+            msgs = []
+            for p in positions:
+                if p != self.tell():
+                    self.seek(p)
+                msgs.append(next(self._counter))
+            self.seek(position)
+
+        msgs = [self.validate_msg(m) for m in msgs]
+        return msgs if isinstance(key, slice) else msgs[0]
+
+    def to_arrow(self, batch_size=65536):
+
+        """
+        Read the remaining data as Apache Arrow record batches.  Drivers that
+        store data in Arrow's format, like `Arrow` and `Parquet`, produce their
+        batches directly without building messages or validating.  For other
+        drivers messages are read and converted.  Requires `pyarrow`.
+
+        Parameters
+        ----------
+        batch_size : int, optional
+            Number of messages per batch when converting messages.
+
+        Raises
+        ------
+        ValueError
+            The reader's predicate can't be evaluated against a batch.
+
+        Yields
+        ------
+        pyarrow.RecordBatch
+            Columns are the union of all fields in the schema, or of the
+            fields in the file.
+        """
+
+        import gpsdio.arrow
+
+        iter_batches = getattr(self._stream, 'iter_batches', None)
+        if iter_batches is not None:
+            for batch in iter_batches():
+                if self.where:
+                    batch = gpsdio.arrow.filter_batch(batch, self.where, exact=True)
+                if batch.num_rows:
+                    yield batch
+        else:
+            arrow_schema = gpsdio.arrow.arrow_schema(self.schema)
+            while True:
+                msgs = list(itertools.islice(self, batch_size))
+                if not msgs:
+                    break
+                yield gpsdio.arrow.messages_to_batch(msgs, arrow_schema)
+
 
 class GPSDIOWriter(gpsdio.base.GPSDIOBaseStream):
 
@@ -174,6 +556,23 @@ class GPSDIOWriter(gpsdio.base.GPSDIOBaseStream):
     which can be significant when multiplied across a large number of messages.
     """
 
+    def __init__(self, stream, bloom=False, **kwargs):
+
+        """
+        See `GPSDIOBaseStream()` for additional parameters.
+
+        Parameters
+        ----------
+        bloom : bool or dict, optional
+            Write a Bloom filter of the file's MMSIs with `gpsdio.bloom.write()`
+            when the writer is closed.  A dictionary provides the filter's
+            `rate` or `size`.  Only files opened by path get a filter.
+        """
+
+        super(GPSDIOWriter, self).__init__(stream, **kwargs)
+        self._bloom = dict(bloom) if isinstance(bloom, dict) else {} if bloom else None
+        self._mmsi = set() if self._bloom is not None else None
+
     def write(self, msg):
 
         """
@@ -185,4 +584,524 @@ class GPSDIOWriter(gpsdio.base.GPSDIOBaseStream):
             GPSd message.
         """
 
-        return self._stream.write(self.validate_msg(msg))
+        msg = self.validate_msg(msg)
+        if self._mmsi is not None and msg.get('mmsi') is not None:
+            self._mmsi.add(msg['mmsi'])
+        return self._stream.write(msg)
+
+    def close(self):
+
+        """
+        Close the underlying stream and write the Bloom filter, if requested.
+        """
+
+        out = self._stream.close()
+        if self._bloom is not None:
+            import gpsdio.bloom
+
+            if isinstance(self.name, six.string_types) and os.path.isfile(self.name):
+                gpsdio.bloom.write(self.name, self._mmsi, **self._bloom)
+            else:
+                logger.warning("Not writing a Bloom filter for %s - not a file", self.name)
+            self._bloom = None
+        return out
+
+    def flush(self):
+
+        """
+        Flush buffered messages to disk.
+        """
+
+        return self._stream.flush()
+
+
+class _Prefetcher(object):
+
+    """
+    Read batches of messages from a file in an executor.  At most one read
+    is in progress at a time and it stops once `readahead` batches are
+    waiting, so workers never block on a slow consumer.  The file is opened
+    by the first read.
+    """
+
+    def __init__(self, opener, executor, batch_size=BATCH_SIZE, readahead=READAHEAD):
+        self._opener = opener
+        self._executor = executor
+        self._batch_size = batch_size
+        self._readahead = readahead
+        self._batches = deque()
+        self._src = None
+        self._future = None
+        self._exhausted = False
+        self._closed = False
+
+    def _fill(self):
+        if self._src is None:
+            self._src = self._opener()
+        while len(self._batches) < self._readahead and not self._closed:
+            batch = list(itertools.islice(self._src, self._batch_size))
+            if not batch:
+                self._exhausted = True
+                self._src.close()
+                return
+            self._batches.append(batch)
+
+    def start(self):
+
+        """
+        Start reading ahead if a read isn't already in progress.
+        """
+
+        if self._future is not None and self._future.done():
+            future, self._future = self._future, None
+            future.result()
+        if self._future is None and not self._exhausted and not self._closed:
+            self._future = self._executor.submit(self._fill)
+
+    def __iter__(self):
+        while True:
+            if not self._batches:
+                if self._future is None:
+                    if self._exhausted or self._closed:
+                        return
+                    self.start()
+                future, self._future = self._future, None
+                future.result()
+                continue
+            batch = self._batches.popleft()
+            self.start()
+            for msg in batch:
+                yield msg
+
+    def close(self):
+        self._closed = True
+        future, self._future = self._future, None
+        if future is not None:
+            # Nothing will consume this read, so neither will its errors
+            error = future.exception()
+            if error is not None:
+                logger.debug("Ignoring an error reading ahead: %s", error)
+        if self._src is not None and not self._exhausted:
+            self._src.close()
+
+
+class GPSDIOMultiReader(object):
+
+    """
+    Read several files as a single stream of messages.  Each file is opened
+    with `open()`, so its driver and compression are detected from its path
+    and its index is used, and is read in batches by a pool of threads while
+    messages are consumed.  Files are either concatenated, reading ahead in
+    up to `workers` files at a time, or merged by `timestamp` if each is
+    sorted by time.
+    """
+
+    def __init__(self, paths, merge=False, workers=WORKERS, readahead=READAHEAD,
+                 batch_size=BATCH_SIZE, **kwargs):
+
+        """
+        Parameters
+        ----------
+        paths : list
+            Files to read.
+        merge : bool, optional
+            Every file is sorted by `timestamp`, so produce messages sorted by
+            `timestamp` by merging the files with `gpsdio.ops.merge()`.
+            Every file is open for the entire read.
+        workers : int, optional
+            Number of threads reading files.
+        readahead : int, optional
+            Maximum number of batches of messages read ahead per file.
+        batch_size : int, optional
+            Number of messages read at a time.
+        kwargs : **kwargs, optional
+            Passed to `open()` for every file.  Include a `schema` to avoid
+            building one for every file.
+        """
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        self._paths = list(paths)
+        self._schema = kwargs.get('schema')
+        self._kwargs = kwargs
+        self.where = kwargs.get('where')
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers))
+        self._workers = max(1, workers)
+        self._prefetchers = [
+            _Prefetcher(self._opener(p), self._executor, batch_size, readahead)
+            for p in self._paths]
+        self._closed = False
+        self._merge = merge
+        self._iterator = self._merged() if merge else self._concatenated()
+        logger.debug("Reading %s files with %s workers", len(self._paths), self._workers)
+
+    def _opener(self, path):
+        return lambda: open(path, **self._kwargs)
+
+    def _concatenated(self):
+        for i, prefetcher in enumerate(self._prefetchers):
+            for ahead in self._prefetchers[i:i + self._workers]:
+                ahead.start()
+            for msg in prefetcher:
+                yield msg
+
+    def _merged(self):
+        import gpsdio.ops
+
+        for prefetcher in self._prefetchers:
+            prefetcher.start()
+        for msg in gpsdio.ops.merge(self._prefetchers, 'timestamp'):
+            yield msg
+
+    @property
+    def names(self):
+        return list(self._paths)
+
+    @property
+    def name(self):
+        return ', '.join(self._paths)
+
+    @property
+    def schema(self):
+        return self._schema
+
+    @property
+    def mode(self):
+        return 'r'
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._iterator)
+
+    next = __next__
+
+    def to_arrow(self, batch_size=65536):
+
+        """
+        Read the remaining messages as Apache Arrow record batches.  Unlike
+        `GPSDIOReader.to_arrow()` messages are always built and converted.
+        Requires `pyarrow`.
+
+        Parameters
+        ----------
+        batch_size : int, optional
+            Number of messages per batch.
+
+        Yields
+        ------
+        pyarrow.RecordBatch
+            Columns are the union of all fields in the schema.
+        """
+
+        import gpsdio.arrow
+
+        arrow_schema = gpsdio.arrow.arrow_schema(self.schema)
+        while True:
+            msgs = list(itertools.islice(self, batch_size))
+            if not msgs:
+                break
+            yield gpsdio.arrow.messages_to_batch(msgs, arrow_schema)
+
+    def close(self):
+
+        """
+        Stop reading ahead and close every file.
+        """
+
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            for prefetcher in self._prefetchers:
+                prefetcher.close()
+        finally:
+            self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def _segment_path(path, segment):
+
+    """
+    Insert a segment number before a path's driver and compression
+    extensions, like `123.msg.gz` -> `123-1.msg.gz`.
+    """
+
+    from gpsdio.drivers import _COMPRESSION_BY_EXT
+
+    base, ext = os.path.splitext(path)
+    if ext.strip('.') in _COMPRESSION_BY_EXT:
+        base, driver_ext = os.path.splitext(base)
+        ext = driver_ext + ext
+    return '{}-{}{}'.format(base, segment, ext)
+
+
+class PartitionedWriter(object):
+
+    """
+    Write messages to one file per partition key, like one file per vessel
+    or per day.  Each key's path comes from a template, like
+    `by_mmsi/{key}.msg.gz`, and its messages are buffered and written in
+    batches.  At most `max_open` files are open at once and the least
+    recently written is closed to make room for another.  A partition
+    written again after its file was closed is appended to, or with
+    `segments=True` or a driver that can't append, continued in a new file
+    like `by_mmsi/123456789-1.msg.gz`.
+
+    Messages are validated as they are written to their file, so validation
+    errors can be raised by a later `write()`, `flush()`, or `close()`.
+    """
+
+    def __init__(self, template, by, mode='w', max_open=MAX_OPEN,
+                 buffer_size=PARTITION_BUFFER, max_buffered=MAX_BUFFERED, segments=False,
+                 driver=None, compression=None, do=None, co=None, schema=None,
+                 schema_extensions=True, bloom=False, **kwargs):
+
+        """
+        Parameters
+        ----------
+        template : str
+            Path for each partition, formatted with the partition key as
+            `{key}`.  When partitioning by a field the key is also available
+            by the field's name, like `{mmsi}`.
+        by : str or callable
+            Field name, expression like `str(timestamp)[:10]` evaluated with
+            `gpsdio.ops.expression()`, or a function taking a message and
+            returning its key.  Messages whose key is `None` are skipped.
+        mode : str, optional
+            Mode each partition's file is first opened with, `w` or `a`.
+        max_open : int, optional
+            Maximum number of files open at once.
+        buffer_size : int, optional
+            Number of messages held per partition before writing them.
+        max_buffered : int, optional
+            Number of messages held across all partitions before writing
+            every partition.
+        segments : bool, optional
+            Write to a new file instead of appending when a partition is
+            reopened.
+        driver : str, optional
+            Driver name.  Normally detected from the path.
+        compression : str, optional
+            Compression name.  Normally detected from the path.
+        do : dict, optional
+            Driver options.
+        co : dict, optional
+            Compression options.
+        schema : dict, optional
+            Used for every file.  Built once if not given.
+        schema_extensions : bool, optional
+            Use external field extensions?  Ignored if a `schema` is given.
+        bloom : bool or dict, optional
+            Write a Bloom filter for every file when the writer is closed.
+            See `GPSDIOWriter()`.  Not allowed with mode `a` since existing
+            messages wouldn't be in the filter.
+        kwargs : **kwargs, optional
+            Passed to `open()` for every file.
+        """
+
+        import gpsdio.ops
+        import gpsdio.schema
+
+        if mode not in ('w', 'a'):
+            raise ValueError("Mode '{}' is invalid - must be 'w' or 'a'".format(mode))
+        if max_open < 1:
+            raise ValueError("max_open must be at least 1: {}".format(max_open))
+        if bloom and mode == 'a':
+            raise ValueError("Bloom filters can't be written when appending to existing files")
+
+        self._template = template
+        self._field = None
+        if callable(by):
+            self._key = by
+        elif _IDENTIFIER.match(by) and not keyword.iskeyword(by):
+            self._field = by
+            self._key = lambda msg: msg.get(by)
+        else:
+            self._key = gpsdio.ops.expression(by)
+
+        self._mode = mode
+        self.max_open = max_open
+        self.buffer_size = buffer_size
+        self.max_buffered = max_buffered
+        self._segments = segments
+        self._schema = schema or gpsdio.schema.build_schema(extensions=schema_extensions)
+        self._kwargs = dict(
+            kwargs, driver=driver, compression=compression, do=do, co=co, schema=self._schema)
+        self._bloom = dict(bloom) if isinstance(bloom, dict) else {} if bloom else None
+
+        self._paths_by_key = {}
+        self._buffers = {}
+        self._buffered = 0
+        self._open = OrderedDict()
+        self._opened = {}
+        self._targets = {}
+        self._files = []
+        self._mmsi = {}
+        self._closed = False
+        self.skipped = 0
+
+    def _path(self, key):
+        path = self._paths_by_key.get(key)
+        if path is None:
+            fields = {self._field: key} if self._field else {}
+            path = self._paths_by_key[key] = self._template.format(key=key, **fields)
+        return path
+
+    def _open_partition(self, path):
+
+        """
+        Open a partition's file in write or append mode, or its next segment.
+        """
+
+        count = self._opened.get(path, 0)
+        self._opened[path] = count + 1
+        mode = self._mode if count == 0 else 'a'
+        target = path
+        if count > 0:
+            io_driver, _ = _drivers(
+                path, driver=self._kwargs['driver'], compression=self._kwargs['compression'])
+            if self._segments or 'a' not in io_driver.io_modes:
+                mode = 'w'
+                target = _segment_path(path, count)
+
+        if target != self._targets.get(path):
+            self._targets[path] = target
+            self._files.append(target)
+            directory = os.path.dirname(target)
+            if directory and not os.path.isdir(directory):
+                os.makedirs(directory)
+
+        logger.debug("Opening partition %s with mode '%s'", target, mode)
+        return open(target, mode, **self._kwargs)
+
+    def _handle(self, path):
+
+        """
+        Get an open writer for a partition, closing the least recently used
+        writer if too many are open.
+        """
+
+        dst = self._open.pop(path, None)
+        if dst is None:
+            if len(self._open) >= self.max_open:
+                _, lru = self._open.popitem(last=False)
+                lru.close()
+            dst = self._open_partition(path)
+        self._open[path] = dst
+        return dst
+
+    def _write_buffer(self, path):
+        msgs = self._buffers.pop(path)
+        self._buffered -= len(msgs)
+        dst = self._handle(path)
+        for msg in msgs:
+            dst.write(msg)
+        if self._bloom is not None:
+            mmsi = self._mmsi.setdefault(self._targets[path], set())
+            mmsi.update(m['mmsi'] for m in msgs if m.get('mmsi') is not None)
+
+    def _write_buffers(self):
+
+        # Partitions that are already open go first so fewer are reopened
+        for path in sorted(self._buffers, key=lambda p: p not in self._open):
+            self._write_buffer(path)
+
+    def write(self, msg):
+
+        """
+        Buffer a message for its partition.
+
+        Parameters
+        ----------
+        msg : dict
+            GPSd message.
+        """
+
+        key = self._key(msg)
+        if key is None:
+            self.skipped += 1
+            return
+        path = self._path(key)
+        buf = self._buffers.get(path)
+        if buf is None:
+            buf = self._buffers[path] = []
+        buf.append(msg)
+        self._buffered += 1
+        if len(buf) >= self.buffer_size:
+            self._write_buffer(path)
+        elif self._buffered >= self.max_buffered:
+            self._write_buffers()
+
+    def flush(self):
+
+        """
+        Write every partition's buffered messages and flush open files.
+        """
+
+        self._write_buffers()
+        for dst in self._open.values():
+            dst.flush()
+
+    def close(self):
+
+        """
+        Write buffered messages, close every file, and write Bloom filters.
+        """
+
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._write_buffers()
+        finally:
+            while self._open:
+                self._open.popitem(last=False)[1].close()
+        if self._bloom is not None:
+            import gpsdio.bloom
+
+            for path in self._files:
+                gpsdio.bloom.write(path, self._mmsi.get(path, ()), **self._bloom)
+        if self.skipped:
+            logger.warning("Skipped %s messages without a partition key", self.skipped)
+
+    @property
+    def paths(self):
+
+        """
+        Every file written, in the order they were created.
+        """
+
+        return list(self._files)
+
+    @property
+    def name(self):
+        return self._template
+
+    @property
+    def schema(self):
+        return self._schema
+
+    @property
+    def mode(self):
+        return self._mode
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
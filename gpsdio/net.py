@@ -0,0 +1,138 @@
+"""
+Network sources.
+
+`gpsdio.open('tcp://host:port')` reads sentences from a TCP feed with a
+blocking socket.  See `gpsdio.aio.ingest()` for long running ``asyncio``
+services and `gpsdio.aio.replay()` for serving a file over TCP.
+"""
+
+
+import logging
+import socket
+
+import six
+from six.moves.urllib.parse import urlparse
+
+
+logger = logging.getLogger('gpsdio')
+
+
+SCHEMES = ('tcp',)
+
+
+def parse_url(url):
+
+    """
+    Split a URL like `tcp://host:port` into its host and port.
+
+    Parameters
+    ----------
+    url : str
+        Network URL.
+
+    Raises
+    ------
+    ValueError
+        URL has an unsupported scheme or lacks a host or port.
+
+    Returns
+    -------
+    tuple
+        (host, port)
+    """
+
+    parsed = urlparse(url)
+    if parsed.scheme not in SCHEMES:
+        raise ValueError("Unsupported scheme '{}' in URL: {}".format(parsed.scheme, url))
+    if not parsed.hostname or not parsed.port:
+        raise ValueError("URL requires a host and port: {}".format(url))
+    return parsed.hostname, parsed.port
+
+
+def is_url(name):
+
+    """
+    Determine if an input name is a URL for a supported network source.
+    """
+
+    return isinstance(name, six.string_types) and '://' in name \
+        and name.split('://', 1)[0] in SCHEMES
+
+
+class SocketFile(object):
+
+    """
+    A read-only file-like object producing lines from a TCP connection.
+    """
+
+    def __init__(self, url, timeout=None):
+
+        """
+        Parameters
+        ----------
+        url : str
+            Like `tcp://host:port`.
+        timeout : float, optional
+            Seconds to wait for the connection.  Reads block indefinitely.
+        """
+
+        self.name = url
+        self.mode = 'r'
+        self._sock = socket.create_connection(parse_url(url), timeout=timeout)
+        self._sock.settimeout(None)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        self._f = self._sock.makefile('rb')
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self._f.readline()
+        if not line:
+            raise StopIteration
+        return line
+
+    next = __next__
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def closed(self):
+        return self._f.closed
+
+    def close(self):
+        self._f.close()
+        self._sock.close()
+
+
+class LineBuffer(object):
+
+    """
+    A file-like object that is refilled with batches of lines and raises
+    `StopIteration` whenever it is empty, which allows a driver to consume
+    the same source one batch at a time.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.mode = 'r'
+        self.closed = False
+        self._lines = iter(())
+
+    def feed(self, lines):
+        self._lines = iter(lines)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._lines)
+
+    next = __next__
+
+    def close(self):
+        self.closed = True
@@ -0,0 +1,152 @@
+"""
+Parse AIVDM and AIVDO sentences into GPSd messages.
+"""
+
+
+from collections import OrderedDict
+import datetime
+import logging
+
+import six
+
+from gpsdio._nmea import checksum_ok
+from gpsdio._nmea import decode
+
+
+logger = logging.getLogger('gpsdio')
+
+
+def _tag_block_time(tags):
+
+    """
+    Extract the UNIX timestamp from the `c:` field of an NMEA 4.10 tag block
+    like `s:r003669945,c:1325394060*3F`.
+    """
+
+    for tag in tags.split('*', 1)[0].split(','):
+        if tag.startswith('c:') and tag[2:].isdigit():
+            return tag[2:]
+    return None
+
+
+class SentenceParser(object):
+
+    """
+    Turn a stream of sentences into decoded messages.  Multi-sentence messages
+    are reassembled in a bounded buffer keyed by sequential message ID and
+    channel.  When the buffer is full the oldest incomplete message is
+    discarded.
+
+    Message timestamps come from the `c:` field of an NMEA 4.10 tag block or
+    from the first purely numeric field a receiver appended after the
+    checksum, and are `None` if neither is present.  The timestamp of a
+    multi-sentence message comes from its final sentence.
+    """
+
+    def __init__(self, max_fragments=1000, checksum=True):
+
+        """
+        Parameters
+        ----------
+        max_fragments : int, optional
+            Maximum number of incomplete multi-sentence messages to hold.
+        checksum : bool, optional
+            Drop sentences with an invalid checksum.
+        """
+
+        self.max_fragments = max_fragments
+        self.checksum = checksum
+        self._fragments = OrderedDict()
+        self.skipped = 0
+
+    def _skip(self, line, reason):
+        self.skipped += 1
+        logger.debug("Skipping sentence - %s: %s", reason, line)
+
+    def parse(self, line):
+
+        """
+        Parse a single line.
+
+        Parameters
+        ----------
+        line : str or bytes
+            A sentence, optionally with a leading tag block or trailing
+            receiver fields.
+
+        Returns
+        -------
+        dict or None
+            A decoded message, or `None` if the line did not complete a
+            message.
+        """
+
+        if not isinstance(line, six.text_type):
+            line = line.decode('ascii', 'replace')
+        line = line.strip()
+        if not line:
+            return None
+
+        timestamp = None
+        if line[0] == '\\':
+            try:
+                _, tags, line = line.split('\\', 2)
+            except ValueError:
+                self._skip(line, "malformed tag block")
+                return None
+            timestamp = _tag_block_time(tags)
+
+        if line[:1] != '!':
+            idx = line.find('!')
+            if idx == -1:
+                return None
+            line = line[idx:]
+
+        fields = line.split(',')
+        if len(fields) < 7 or fields[0][3:6] not in ('VDM', 'VDO'):
+            return None
+        if self.checksum and not checksum_ok(line):
+            self._skip(line, "bad checksum")
+            return None
+
+        if timestamp is None:
+            for field in fields[7:]:
+                if field.isdigit():
+                    timestamp = field
+                    break
+
+        try:
+            total = int(fields[1])
+            num = int(fields[2])
+        except ValueError:
+            self._skip(line, "bad fragment count")
+            return None
+
+        if not 1 <= num <= total:
+            self._skip(line, "bad fragment number")
+            return None
+
+        payload = fields[5]
+        if total > 1:
+            key = (fields[3], fields[4])
+            parts = self._fragments.get(key)
+            if parts is None or num == 1 or len(parts) != total:
+                parts = self._fragments[key] = [None] * total
+                if len(self._fragments) > self.max_fragments:
+                    self._fragments.popitem(last=False)
+                    self.skipped += 1
+            parts[num - 1] = payload
+            if None in parts:
+                return None
+            del self._fragments[key]
+            payload = ''.join(parts)
+
+        try:
+            msg = decode(payload)
+        except ValueError as e:
+            self._skip(line, str(e))
+            return None
+
+        msg['timestamp'] = datetime.datetime.utcfromtimestamp(int(timestamp)) \
+            if timestamp is not None else None
+        return msg
@@ -3,27 +3,669 @@ Operations
 """
 
 
+from collections import deque
+from collections import OrderedDict
+import datetime
+from heapq import heappop
+from heapq import heappush
+from heapq import merge as _heap_merge
+import logging
+import math
+
 import six
 
+from gpsdio.validate import datetime2str
+from gpsdio.where import to_datetime
+
+
+logger = logging.getLogger('gpsdio')
+
+
+# Duplicates are dropped if received within this long of the first copy
+DEDUPE_WINDOW = datetime.timedelta(minutes=1)
+
+# Number of keys each of the Bloom filters used by `dedupe()` is sized for
+DEDUPE_CAPACITY = 100000
+
+# Size of the time buckets used by space-filling curve sorts like `hilbert:time`
+CURVE_BUCKET = datetime.timedelta(days=1)
 
-def sort(stream, field, default=None):
+# Tracks are split when a vessel's positions are further apart in time
+TRACK_GAP = datetime.timedelta(hours=2)
+
+# Fields of the arrays produced by `tracks(columns=True)`
+TRACK_COLUMNS = ('mmsi', 'timestamp', 'lon', 'lat')
+
+# Mean radius of the Earth in kilometers
+EARTH_RADIUS = 6371.0088
+
+
+def sort(stream, field, default=None, max_delay=None, late='drop'):
 
     """
     A generator to sort data by the specified field.  Requires the entire stream
-    to be held in memory.  Messages lacking the specified field are dropped.
+    to be held in memory unless `max_delay` is given.  When sorting by a
+    single field in memory, messages lacking it are sorted as if their value
+    was `default`.
+
+    Several fields, like `('mmsi', 'timestamp')`, are extracted into NumPy
+    arrays, with timestamps as int64 microseconds, and sorted with
+    `numpy.lexsort()`, which is much faster and uses less memory than
+    sorting messages by tuples.  Messages lacking a field sort before those
+    that have it, and equal messages keep their order.  Without NumPy, or if
+    a field's values can't be stored in an array, messages are sorted by
+    tuples instead.
+
+    The field can also be a space-filling curve from `gpsdio.curve`, like
+    `hilbert` or `morton`, to order messages by their position along the
+    curve so nearby positions are stored together.  Messages without a valid
+    `lon` and `lat` sort first.  Adding `:time`, like `hilbert:time`, orders
+    messages by `CURVE_BUCKET` sized time buckets first and then along the
+    curve.  Requires NumPy.
+
+    With `max_delay` the stream must be nearly sorted, like a live feed whose
+    messages arrive at most a few minutes late.  Messages are held in a heap
+    and produced once a message more than `max_delay` newer has arrived, so
+    only messages within `max_delay` of the newest are held in memory, and
+    the rest of the heap is produced at the end of the stream.  A message is
+    late if it arrives after a message it should follow was already
+    produced.  Messages lacking the field are produced as soon as they
+    arrive.
+
+    Example:
+
+        >>> import datetime
+        >>> import gpsdio
+        >>> import gpsdio.ops
+        >>> late = []
+        >>> with gpsdio.open('tcp://localhost:5000') as src:
+        ...     delay = datetime.timedelta(minutes=5)
+        ...     for msg in gpsdio.ops.sort(src, 'timestamp', max_delay=delay, late=late.append):
+        ...         # Do something
 
     Parameters
     ----------
     stream : iter
         Iterator producing one message per iteration.
+    field : str or tuple
+        Field or curve to sort by, or several in order of significance.
+    default : object, optional
+        Value for messages lacking the field when sorting in memory by a
+        single field.
+    max_delay : datetime.timedelta or number, optional
+        Maximum lateness of a message.  Requires a single field.  With a
+        `datetime.timedelta`, string values are converted to datetimes.
+    late : str or callable, optional
+        What to do with late messages when `max_delay` is given: `drop` them,
+        `emit` them immediately out of order, or pass them to a function,
+        like a list's `append()` or a writer's `write()`.
+
+    Raises
+    ------
+    ValueError
+        If `late` isn't a valid policy or `max_delay` is given with several
+        fields.
+
+    Yields
+    ------
+    dict
+        Messages sorted by `field`.
+    """
+
+    if isinstance(field, six.string_types) and _is_curve(field):
+        field = field,
+    if not isinstance(field, six.string_types):
+        if max_delay is not None:
+            raise ValueError("Can only sort by a single field with max_delay: {}".format(field))
+        for msg in _sort_fields(stream, tuple(field)):
+            yield msg
+        return
+
+    if max_delay is None:
+        for msg in sorted(stream, key=lambda x: x.get(field, default)):
+            yield msg
+        return
+
+    if late not in ('drop', 'emit') and not callable(late):
+        raise ValueError("Late message policy must be 'drop', 'emit', or a function: {}".format(
+            late))
+    if isinstance(max_delay, datetime.timedelta):
+        convert = _timestamps()
+    else:
+        def convert(value):
+            return value
+
+    heap = []
+    newest = None
+    last = None
+    dropped = 0
+    for seq, msg in enumerate(stream):
+        value = convert(msg.get(field))
+        if value is None:
+            yield msg
+            continue
+
+        if last is not None and value < last:
+            if late == 'emit':
+                yield msg
+            elif late == 'drop':
+                dropped += 1
+            else:
+                late(msg)
+            continue
+
+        # Sequence numbers are unique so messages are never compared
+        heappush(heap, (value, seq, msg))
+        if newest is None or value > newest:
+            newest = value
+            watermark = newest - max_delay
+            while heap and heap[0][0] <= watermark:
+                last, _, out = heappop(heap)
+                yield out
+
+    while heap:
+        yield heappop(heap)[2]
+
+    if dropped:
+        logger.warning("Dropped %s messages more than %s late", dropped, max_delay)
+
+
+def _key_arrays(np, values):
+
+    """
+    Convert a column of sort keys to arrays for `numpy.lexsort()`, least
+    significant first.  Datetimes and timestamp strings become int64
+    microseconds, and a flag sorting missing values first is added if any
+    are missing.
+
+    Raises
+    ------
+    TypeError
+        If the values can't be stored in a single array.
+    """
+
+    sample = next((v for v in values if v is not None), None)
+    if sample is None:
+        return []
+    missing = None in values
+
+    if isinstance(sample, datetime.datetime) or (
+            isinstance(sample, six.string_types) and sample[:4].isdigit() and
+            sample.endswith('Z')):
+        array = None
+        if not missing and not isinstance(sample, datetime.datetime):
+            # Timestamps in a single format are converted without Python
+            # string operations if they all end in the timezone designator,
+            # which NumPy doesn't accept and is dropped by narrowing
+            text = np.array(values, dtype='S')
+            width = text.dtype.itemsize
+            if (text.view('u1').reshape(-1, width)[:, -1] == ord('Z')).all():
+                array = text.astype('S{}'.format(width - 1)).astype('datetime64[us]')
+        if array is None:
+            epoch = datetime.datetime(1970, 1, 1)
+            array = np.array(
+                [epoch if v is None else v[:-1] if isinstance(v, six.string_types) else v
+                 for v in values], dtype='datetime64[us]')
+        array = array.view('int64')
+        kinds = 'i'
+    elif isinstance(sample, six.string_types):
+        array = np.array(['' if v is None else v for v in values] if missing else values)
+        kinds = 'U'
+    else:
+        array = np.array([0 if v is None else v for v in values] if missing else values)
+        kinds = 'biuf'
+    if array.dtype.kind not in kinds or array.ndim != 1:
+        raise TypeError("Can't sort mixed values like {!r} in an array".format(sample))
+
+    if missing:
+        return [array, np.array([v is not None for v in values])]
+    return [array]
+
+
+def _is_curve(field):
+    import gpsdio.curve
+    return field.partition(':')[0] in gpsdio.curve.CURVES
+
+
+def _curve_arrays(np, msgs, field):
+
+    """
+    Get arrays for `numpy.lexsort()` ordering messages along a space-filling
+    curve, least significant first.
+    """
+
+    import gpsdio.curve
+
+    curve, _, option = field.partition(':')
+    if option not in ('', 'time'):
+        raise ValueError("Unknown curve option '{}' - only 'time' is supported".format(option))
+
+    # Missing values become NaN, which fail every comparison
+    lon = np.array([m.get('lon') for m in msgs], dtype='f8')
+    lat = np.array([m.get('lat') for m in msgs], dtype='f8')
+    valid = (lon >= -180) & (lon <= 180) & (lat >= -90) & (lat <= 90)
+    keys = [gpsdio.curve.codes(np.where(valid, lon, 0), np.where(valid, lat, 0), curve), valid]
+
+    if option == 'time':
+        timestamps = _key_arrays(np, [m.get('timestamp') for m in msgs])
+        if timestamps:
+            timestamps[0] = timestamps[0] // int(CURVE_BUCKET.total_seconds() * 1e6)
+        keys.extend(timestamps)
+    return keys
+
+
+def _sort_fields(stream, fields):
+
+    """
+    Sort messages by several fields.  See `sort()`.
+    """
+
+    msgs = list(stream)
+    curves = [f for f in fields if _is_curve(f)]
+    try:
+        import numpy as np
+    except ImportError:  # pragma: no cover
+        if curves:
+            raise ImportError("Sorting along a space-filling curve requires numpy")
+        np = None
+
+    if np is not None:
+        try:
+            keys = []
+            for field in reversed(fields):
+                if field in curves:
+                    keys.extend(_curve_arrays(np, msgs, field))
+                else:
+                    keys.extend(_key_arrays(np, [m.get(field) for m in msgs]))
+        except (TypeError, ValueError) as e:
+            if curves:
+                raise
+            logger.debug("Sorting by tuples instead of arrays: %s", e)
+        else:
+            if not keys:
+                return msgs
+            return [msgs[i] for i in np.lexsort(keys).tolist()]
+
+    def key(msg):
+        return tuple((0,) if msg.get(f) is None else (1, _merge_key(msg.get(f)))
+                     for f in fields)
+
+    return sorted(msgs, key=key)
+
+
+def _merge_key(value):
+
+    """
+    Make datetimes comparable with timestamps that are still strings.
+    """
+
+    return datetime2str(value) if isinstance(value, datetime.datetime) else value
+
+
+def merge(streams, field='timestamp', check=False):
+
+    """
+    A generator merging streams that are each sorted by a field into a single
+    sorted stream.  Only the next message from each stream is held in memory.
+    Messages lacking the field, or where it is `None`, are produced as soon
+    as they are reached in their stream.  Datetimes and timestamp strings
+    are compared as strings.
+
+    Example:
+
+        >>> import gpsdio
+        >>> import gpsdio.ops
+        >>> with gpsdio.open('a.msg') as a, gpsdio.open('b.msg') as b:
+        ...     for msg in gpsdio.ops.merge([a, b]):
+        ...         # Do something
+
+    Parameters
+    ----------
+    streams : iterable
+        Iterables producing messages sorted by `field`.
     field : str, optional
-        Field to sort by.
+        Field the streams are sorted by.
+    check : bool, optional
+        Raise an exception as soon as a stream is found to be out of order.
+
+    Raises
+    ------
+    ValueError
+        If `check=True` and a stream isn't sorted.
+
+    Yields
+    ------
+    dict
+        Messages sorted by `field`.
+    """
+
+    def keyed(index, stream):
+        last = None
+        for seq, msg in enumerate(stream):
+            value = msg.get(field)
+            if value is None:
+                yield (0,), index, seq, msg
+                continue
+            value = _merge_key(value)
+            if check:
+                if last is not None and value < last:
+                    raise ValueError(
+                        "Input {} isn't sorted by '{}': {} follows {}".format(
+                            index, field, value, last))
+                last = value
+            yield (1, value), index, seq, msg
+
+    # Stream indexes and sequence numbers are unique so messages are never
+    # compared
+    for _, _, _, msg in _heap_merge(*[keyed(i, s) for i, s in enumerate(streams)]):
+        yield msg
+
+
+def _dedupe_key(key):
+
+    """
+    Get a function producing a message's deduplication key.
+    """
+
+    if key is None:
+        return lambda msg: tuple(sorted(
+            (k, v) for k, v in six.iteritems(msg) if k != 'timestamp'))
+    elif callable(key):
+        return key
+    fields = (key,) if isinstance(key, six.string_types) else tuple(key)
+    return lambda msg: tuple(msg.get(f) for f in fields)
+
+
+def _timestamps():
+
+    """
+    Get a function converting timestamps to datetimes that remembers the last
+    conversion, since duplicate messages usually share timestamps.
+    """
+
+    last = [None, None]
+
+    def convert(value):
+        if value is None or isinstance(value, datetime.datetime):
+            return value
+        if value != last[0]:
+            last[0], last[1] = value, to_datetime(value)
+        return last[1]
+
+    return convert
+
+
+def dedupe(stream, key=None, window=DEDUPE_WINDOW, bloom=False):
+
     """
+    A generator dropping duplicate messages, like the same transmission
+    received by several stations.  A message is a duplicate if another with
+    the same key was produced no more than `window` earlier or later.  Keys
+    are only remembered for `window` past the newest `timestamp` seen, so
+    memory is bounded on endless streams.  Messages lacking a `timestamp`
+    are always produced.
 
-    for msg in sorted(stream, key=lambda x: x.get(field, default)):
+    Example:
+
+        >>> import gpsdio
+        >>> import gpsdio.ops
+        >>> with gpsdio.open('merged.msg.gz') as src:
+        ...     for msg in gpsdio.ops.dedupe(src, window=30):
+        ...         # Do something
+
+    Parameters
+    ----------
+    stream : iter
+        Iterator producing one message per iteration, roughly sorted by
+        `timestamp`.
+    key : str or tuple or callable, optional
+        Fields identifying duplicates, or a function taking a message and
+        returning a hashable key.  Default is every field except `timestamp`.
+    window : datetime.timedelta or float, optional
+        Maximum time between duplicates.  Numbers are seconds.
+    bloom : bool or dict, optional
+        Remember keys in a pair of Bloom filters from `gpsdio.bloom`, each
+        covering one window, instead of a set.  Uses much less memory but
+        drops a fraction of unique messages equal to the false positive
+        rate, and duplicates are dropped if they arrive within one to two
+        windows of the first.  A dictionary provides the `capacity` of
+        each filter and its `rate`.
+
+    Yields
+    ------
+    dict
+        The first message for each key.
+    """
+
+    if not isinstance(window, datetime.timedelta):
+        window = datetime.timedelta(seconds=window)
+    get_key = _dedupe_key(key)
+    convert = _timestamps()
+
+    if bloom:
+        import gpsdio.bloom
+
+        options = dict(bloom) if isinstance(bloom, dict) else {}
+        options.setdefault('capacity', DEDUPE_CAPACITY)
+        current = gpsdio.bloom.BloomFilter.create((), **options)
+        previous = None
+        started = None
+        for msg in stream:
+            ts = convert(msg.get('timestamp'))
+            if ts is None:
+                yield msg
+                continue
+            if started is None:
+                started = ts
+            elif ts - started >= window:
+                previous = current if ts - started < 2 * window else None
+                current = gpsdio.bloom.BloomFilter.create((), **options)
+                started = ts
+            k = repr(get_key(msg))
+            if previous is not None and k in previous:
+                continue
+            elif current.add(k):
+                continue
+            yield msg
+        return
+
+    # Keys in the order they were first seen, so the oldest can be forgotten
+    seen = {}
+    order = deque()
+    newest = None
+    for msg in stream:
+        ts = convert(msg.get('timestamp'))
+        if ts is None:
+            yield msg
+            continue
+
+        if newest is None or ts > newest:
+            newest = ts
+            cutoff = newest - window
+            while order and order[0][0] < cutoff:
+                old_ts, old_key = order.popleft()
+                if seen.get(old_key) == old_ts:
+                    del seen[old_key]
+
+        k = get_key(msg)
+        try:
+            first = seen.get(k)
+        except TypeError:
+            # Unhashable values like lists
+            k = repr(k)
+            first = seen.get(k)
+        if first is not None and abs(ts - first) <= window:
+            continue
+        seen[k] = ts
+        order.append((ts, k))
         yield msg
 
 
+def distance(lon1, lat1, lon2, lat2):
+
+    """
+    Get the great circle distance between two positions in kilometers.
+    """
+
+    lon1, lat1, lon2, lat2 = map(math.radians, (lon1, lat1, lon2, lat2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _track_columns(np, msgs, fields):
+
+    """
+    Convert a track's messages to a dictionary of arrays, with timestamps as
+    `datetime64[us]`.
+    """
+
+    out = {}
+    for f in fields:
+        values = [m.get(f) for m in msgs]
+        if f == 'timestamp':
+            out[f] = np.array(
+                [None if v is None else to_datetime(v) for v in values], dtype='datetime64[us]')
+        else:
+            out[f] = np.array(values)
+    return out
+
+
+def tracks(stream, max_gap=TRACK_GAP, max_jump_km=None, idle=None, max_vessels=None,
+           max_points=None, columns=None):
+
+    """
+    A generator grouping positions into tracks, each containing consecutive
+    positions from a single vessel.  A vessel's track is split when its next
+    position is more than `max_gap` later or `max_jump_km` away.  Only the
+    open track of each vessel is held in memory and tracks are produced as
+    soon as they are complete, so on a stream sorted by `timestamp` a track
+    is produced once its vessel has been idle for `idle` or its next track
+    starts.  Remaining tracks are produced at the end of the stream.
+
+    Messages lacking an `mmsi`, `timestamp`, or valid `lon` and `lat` are
+    skipped, as are messages older than their vessel's previous position.
+
+    Example:
+
+        >>> import gpsdio
+        >>> import gpsdio.ops
+        >>> with gpsdio.open('sorted.msg.gz') as src:
+        ...     for track in gpsdio.ops.tracks(src, max_gap=3600, max_jump_km=50):
+        ...         # Do something
+
+    Parameters
+    ----------
+    stream : iter
+        Iterator producing one message per iteration, sorted by `timestamp`.
+    max_gap : datetime.timedelta or float, optional
+        Maximum time between consecutive positions in a track.  Numbers are
+        seconds.
+    max_jump_km : float, optional
+        Maximum distance between consecutive positions in a track.
+    idle : datetime.timedelta or float, optional
+        Close a vessel's track once the newest `timestamp` in the stream is
+        this much later than its last position.  Defaults to `max_gap`,
+        which never splits a track that could still be continued.
+    max_vessels : int, optional
+        Maximum number of open tracks.  Opening another closes the least
+        recently updated track early, bounding memory on streams with many
+        vessels at the cost of splitting some tracks.
+    max_points : int, optional
+        Split tracks after this many positions.
+    columns : bool or tuple, optional
+        Produce each track as a dictionary mapping fields to NumPy arrays,
+        with timestamps as `datetime64[us]`, instead of a list of messages.
+        `True` produces the fields in `TRACK_COLUMNS`.
+
+    Raises
+    ------
+    ImportError
+        If `columns` is given and NumPy isn't installed.
+
+    Yields
+    ------
+    list or dict
+        Messages of a single track in order.
+    """
+
+    if not isinstance(max_gap, datetime.timedelta):
+        max_gap = datetime.timedelta(seconds=max_gap)
+    if idle is None:
+        idle = max_gap
+    elif not isinstance(idle, datetime.timedelta):
+        idle = datetime.timedelta(seconds=idle)
+
+    if columns:
+        try:
+            import numpy as np
+        except ImportError:  # pragma: no cover
+            raise ImportError("Columnar tracks require numpy")
+        fields = TRACK_COLUMNS if columns is True else tuple(columns)
+        track = lambda msgs: _track_columns(np, msgs, fields)
+    else:
+        track = lambda msgs: msgs
+
+    convert = _timestamps()
+
+    # Open tracks by MMSI, least recently updated first
+    # {mmsi: (messages, timestamp, lon, lat)}
+    open_tracks = OrderedDict()
+    newest = None
+    skipped = late = evicted = 0
+    for msg in stream:
+        mmsi = msg.get('mmsi')
+        ts = convert(msg.get('timestamp'))
+        lon = msg.get('lon')
+        lat = msg.get('lat')
+        if mmsi is None or ts is None or lon is None or lat is None \
+                or not (-180 <= lon <= 180 and -90 <= lat <= 90):
+            skipped += 1
+            continue
+
+        # On a sorted stream the least recently updated tracks are the
+        # oldest, so stop at the first one that isn't idle
+        if newest is None or ts > newest:
+            newest = ts
+            cutoff = newest - idle
+            while open_tracks:
+                key = next(iter(open_tracks))
+                if open_tracks[key][1] >= cutoff:
+                    break
+                yield track(open_tracks.pop(key)[0])
+
+        state = open_tracks.get(mmsi)
+        if state is None:
+            msgs = []
+            if max_vessels is not None and len(open_tracks) >= max_vessels:
+                evicted += 1
+                yield track(open_tracks.popitem(last=False)[1][0])
+        else:
+            msgs, last_ts, last_lon, last_lat = state
+            if ts < last_ts:
+                late += 1
+                continue
+            del open_tracks[mmsi]
+            if ts - last_ts > max_gap \
+                    or (max_points is not None and len(msgs) >= max_points) \
+                    or (max_jump_km is not None
+                        and distance(last_lon, last_lat, lon, lat) > max_jump_km):
+                yield track(msgs)
+                msgs = []
+
+        msgs.append(msg)
+        open_tracks[mmsi] = (msgs, ts, lon, lat)
+
+    for msgs, _, _, _ in open_tracks.values():
+        yield track(msgs)
+
+    if late:
+        logger.warning("Skipped %s positions older than their vessel's previous position", late)
+    if evicted:
+        logger.warning("Closed %s tracks early to stay under %s open tracks", evicted, max_vessels)
+    logger.debug("Skipped %s messages without a valid mmsi, timestamp, and position", skipped)
+
+
 def filter(expressions, stream):
 
     """
@@ -58,22 +700,15 @@ def filter(expressions, stream):
 
     if isinstance(expressions, six.string_types):
         expressions = expressions,
-
-    scope_blacklist = ('eval', 'compile', 'exec', 'execfile', 'builtin', 'builtins',
-                       '__builtin__', '__builtins__', 'globals', 'locals')
-
-    global_scope = {
-        k: v for k, v in globals().items() if k not in ('builtins', '__builtins__')}
-    global_scope['__builtins__'] = {
-        k: v for k, v in globals()['__builtins__'].items() if k not in scope_blacklist}
-    global_scope['builtins'] = global_scope['__builtins__']
+    codes = [compile(expr, '<expression>', 'eval') for expr in expressions]
+    global_scope = _global_scope()
 
     for msg in stream:
         local_scope = msg.copy()
         local_scope['msg'] = msg
-        for expr in expressions:
+        for code in codes:
             try:
-                result = eval(expr, global_scope, local_scope)
+                result = eval(code, global_scope, local_scope)
             except NameError:
                 # A message doesn't contain something in the expression so just
                 # force a failure since we don't need to check the other expressions.
@@ -85,6 +720,63 @@ def filter(expressions, stream):
             yield msg
 
 
+def _global_scope():
+
+    """
+    Global scope for evaluating expressions, without some blacklisted items
+    like `exec()`, `eval()`, etc.
+    """
+
+    scope_blacklist = ('eval', 'compile', 'exec', 'execfile', 'builtin', 'builtins',
+                       '__builtin__', '__builtins__', 'globals', 'locals')
+
+    global_scope = {
+        k: v for k, v in globals().items() if k not in ('builtins', '__builtins__')}
+    global_scope['__builtins__'] = {
+        k: v for k, v in globals()['__builtins__'].items() if k not in scope_blacklist}
+    global_scope['builtins'] = global_scope['__builtins__']
+    return global_scope
+
+
+def expression(expr):
+
+    """
+    Compile a Pythonic expression into a function evaluating it for a
+    message, with the same scope as `filter()`.
+
+    Example:
+
+        >>> import gpsdio.ops
+        >>> day = gpsdio.ops.expression("str(timestamp)[:10]")
+        >>> day({'timestamp': '2015-01-01T00:00:00.000000Z'})
+        '2015-01-01'
+
+    Parameters
+    ----------
+    expr : str
+        Expression referencing fields by name or the message as `msg`.
+
+    Returns
+    -------
+    callable
+        Takes a message and returns the expression's value, or `None` if the
+        expression raises a `NameError` because the message lacks a field.
+    """
+
+    code = compile(expr, '<expression>', 'eval')
+    global_scope = _global_scope()
+
+    def evaluate(msg):
+        local_scope = msg.copy()
+        local_scope['msg'] = msg
+        try:
+            return eval(code, global_scope, local_scope)
+        except NameError:
+            return None
+
+    return evaluate
+
+
 def msg2geojson(msg):
 
     """
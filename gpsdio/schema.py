@@ -21,7 +21,7 @@ from pkg_resources import iter_entry_points
 import six
 
 from gpsdio.validate import (
-    Int, IntRange, DateTime, FloatRange, IntIn, Float, Instance, Any, In)
+    Int, IntRange, DateTime, FloatRange, IntIn, Float, Instance, Any, All, In)
 
 
 logger = logging.getLogger('gpsdio')
@@ -1062,3 +1062,70 @@ for ep in iter_entry_points('gpsdio.human_type_descriptions'):
         logger.info("Registered external human type descriptions from: %s", ep.name)
     except Exception:
         logger.exception("Failed to load external human type descriptions from: %s", ep.name)
+
+
+def _python_kind(type_):
+
+    """
+    Map a Python type to a field kind.
+    """
+
+    if issubclass(type_, six.string_types):
+        return 'str'
+    elif issubclass(type_, float):
+        return 'float'
+    elif issubclass(type_, six.integer_types):
+        return 'int'
+    else:
+        return 'object'
+
+
+def field_type(validator):
+
+    """
+    Determine which kind of value a field's validator accepts.  Drivers
+    storing typed columns use this to map the schema onto their own types.
+
+    Parameters
+    ----------
+    validator : callable
+        A field's `validate` object.
+
+    Returns
+    -------
+    tuple
+        `(kind, nullable)` where `kind` is one of `'int'`, `'float'`, `'str'`,
+        `'datetime'`, or `'object'` if the kind can't be determined, and
+        `nullable` indicates if `None` is allowed.  Fields accepting both
+        `int` and `float` are `'float'`.
+    """
+
+    kinds = set()
+    nullable = False
+    validators = [validator]
+    while validators:
+        v = validators.pop()
+        if isinstance(v, (Any, All)):
+            validators.extend(v.tests)
+        elif isinstance(v, DateTime):
+            kinds.add('datetime')
+        elif isinstance(v, (Int, IntRange, IntIn)):
+            kinds.add('int')
+        elif isinstance(v, (Float, FloatRange)):
+            kinds.add('float')
+        elif isinstance(v, (Instance, In)):
+            types = v.types if isinstance(v, Instance) else [type(i) for i in v.values]
+            for t in types:
+                if t is type(None):
+                    nullable = True
+                else:
+                    kinds.add(_python_kind(t))
+        else:
+            kinds.add('object')
+
+    if kinds == {'int', 'float'}:
+        return 'float', nullable
+    elif len(kinds) == 1:
+        return kinds.pop(), nullable
+    else:
+        return 'object', nullable
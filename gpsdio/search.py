@@ -0,0 +1,166 @@
+"""
+Binary search uncompressed files that are sorted by time.
+
+`gpsdio.open(path, start=..., end=..., assume_sorted=True)` uses
+`open_sorted()` to find the byte offsets of the first message at or after
+`start` and the first message at or after `end` by bisecting the file,
+without an index.  Drivers must have a `sync()` method that moves to the
+first message boundary at or after an arbitrary byte offset, and a `tell()`
+method.  Messages without a timestamp are skipped while searching.
+
+Searching a file that isn't sorted by time produces incomplete results, so
+callers must know the file is sorted, like when `gpsdio info --sorted`
+reports `True`.
+"""
+
+
+import io
+import logging
+import os
+
+import gpsdio
+import gpsdio.index
+from gpsdio.validate import datetime2str
+import gpsdio.where
+
+
+logger = logging.getLogger('gpsdio')
+
+
+def _probe(driver, offset):
+
+    """
+    Get the timestamp of the first timestamped message starting at or after
+    a byte offset, and the offset of the message following it.  Returns
+    `None` at the end of the file.
+    """
+
+    driver.sync(offset)
+    for msg in driver:
+        ts = msg.get('timestamp')
+        if ts is not None:
+            return datetime2str(ts), driver.tell()
+    return None
+
+
+def find(driver, timestamp, lo, hi):
+
+    """
+    Find the byte offset of the first message with a timestamp at or after a
+    given time.
+
+    Parameters
+    ----------
+    driver : BaseDriver
+        Open driver with `sync()` and `tell()` methods.
+    timestamp : str or datetime.datetime
+        Time to find.
+    lo : int
+        Offset of a message boundary.  Every message before it must be
+        earlier than `timestamp`.
+    hi : int
+        Offset where the search ends, like the size of the file.
+
+    Returns
+    -------
+    int
+        Offset of a message boundary, or the end of the file.
+    """
+
+    timestamp = datetime2str(gpsdio.where.to_datetime(timestamp))
+    probes = 0
+    while lo < hi:
+        mid = (lo + hi) // 2
+        found = _probe(driver, mid)
+        probes += 1
+        if found is None or found[0] >= timestamp:
+            hi = mid
+        else:
+            lo = found[1]
+    logger.debug("Found %s at offset %s after %s probes", timestamp, lo, probes)
+    return driver.sync(lo)
+
+
+def byte_ranges(path, start=None, end=None, driver=None, do=None):
+
+    """
+    Get the byte ranges of a sorted file that contain messages between two
+    times.  The file's header, if any, is always included.
+
+    Parameters
+    ----------
+    path : str
+        Uncompressed file sorted by time.
+    start : str or datetime.datetime, optional
+        Earliest timestamp.
+    end : str or datetime.datetime, optional
+        Latest timestamp, exclusive.
+    driver : str, optional
+        Driver name.  Normally detected from the path.
+    do : dict, optional
+        Driver options.
+
+    Raises
+    ------
+    ValueError
+        If the driver can't search by byte offset.
+
+    Returns
+    -------
+    list
+        `(start, stop)` byte offsets.
+    """
+
+    with gpsdio.open(path, driver=driver, compression=False, do=do, _check=False) as src:
+        drv = src.driver
+        if not hasattr(drv, 'sync'):
+            raise ValueError("The {} driver can't search by byte offset".format(
+                drv.driver_name))
+        data_start = drv.sync(0)
+        size = os.path.getsize(path)
+        first = data_start if start is None else find(drv, start, data_start, size)
+        stop = size if end is None else find(drv, end, first, size)
+
+    out = []
+    if data_start > 0:
+        out.append((0, data_start))
+    if first < stop:
+        if out and out[-1][1] == first:
+            out[-1] = (0, stop)
+        else:
+            out.append((first, stop))
+    return out
+
+
+def open_sorted(path, start=None, end=None, driver=None, do=None):
+
+    """
+    Get a file object containing only the part of a sorted file between two
+    times.
+
+    Parameters
+    ----------
+    path : str
+        Uncompressed file sorted by time.
+    start : str or datetime.datetime, optional
+        Earliest timestamp.
+    end : str or datetime.datetime, optional
+        Latest timestamp, exclusive.
+    driver : str, optional
+        Driver name.  Normally detected from the path.
+    do : dict, optional
+        Driver options.
+
+    Returns
+    -------
+    io.BufferedReader or None
+        `None` if the driver can't search by byte offset.
+    """
+
+    try:
+        ranges = byte_ranges(path, start=start, end=end, driver=driver, do=do)
+    except ValueError as e:
+        logger.debug("Not searching %s: %s", path, e)
+        return None
+    logger.debug("Reading bytes %s from %s", ranges, path)
+    return io.BufferedReader(gpsdio.index.RangeFile(path, ranges))
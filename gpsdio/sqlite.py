@@ -0,0 +1,263 @@
+"""
+Store messages in an SQLite database.
+
+Each message type has its own table named like `type_1` whose columns are
+the type's fields, except `type`, which is implied by the table.  Column
+types are derived from the field validators with
+`gpsdio.schema.field_type()`, and datetimes are stored as text in
+`DATETIME_FORMAT`, which sorts and compares correctly.  Every table also has
+a `_seq` column holding each message's position in the stream, which is used
+to restore the original order across tables.
+"""
+
+
+from heapq import merge
+import logging
+
+import six
+
+from gpsdio.schema import field_type
+from gpsdio.validate import datetime2str
+import gpsdio.where
+
+
+logger = logging.getLogger('gpsdio')
+
+
+SEQ = '_seq'
+
+# Messages are buffered per type and inserted this many at a time
+BATCH_SIZE = 10000
+
+# Indexes created when a writer is closed.  Tables lacking any of an index's
+# columns are skipped.
+INDEXES = (('mmsi', 'timestamp'),)
+
+_SQL_TYPES = {
+    'int': 'INTEGER',
+    'float': 'REAL',
+    'str': 'TEXT',
+    'datetime': 'TEXT',
+}
+
+
+def quote(name):
+
+    """
+    Quote an SQL identifier.
+    """
+
+    return '"{}"'.format(name.replace('"', '""'))
+
+
+def table_name(mtype):
+
+    """
+    Get the name of the table holding a message type.
+    """
+
+    return 'type_{}'.format(mtype)
+
+
+def tables(conn):
+
+    """
+    Find the tables holding messages.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        Database connection.
+
+    Returns
+    -------
+    dict
+        `{type: ('column', ...)}` excluding the `_seq` column.
+    """
+
+    out = {}
+    names = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'type\\_%' ESCAPE '\\'")
+    for name, in names.fetchall():
+        try:
+            mtype = int(name[len('type_'):])
+        except ValueError:
+            continue
+        columns = conn.execute('PRAGMA table_info({})'.format(quote(name))).fetchall()
+        out[mtype] = tuple(c[1] for c in columns if c[1] != SEQ)
+    return out
+
+
+def _table_messages(conn, mtype, columns, sql, params):
+
+    """
+    Produce `(seq, msg)` tuples for a single table in sequence order.
+    """
+
+    table = table_name(mtype)
+    query = 'SELECT {} FROM {}'.format(', '.join(map(quote, (SEQ,) + columns)), quote(table))
+    if sql:
+        query += ' WHERE ' + sql
+    query += ' ORDER BY {}'.format(quote(SEQ))
+    logger.debug("Querying %s: %s %s", table, query, params)
+
+    for row in conn.execute(query, params):
+        msg = dict(zip(columns, row[1:]))
+        msg['type'] = mtype
+        yield row[0], msg
+
+
+def query(conn, where=None):
+
+    """
+    Read messages in their original order.  Clauses are translated to SQL with
+    `gpsdio.where.to_sql()` so indexes can be used, and tables that can't
+    contain a match aren't queried.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        Database connection.
+    where : list, optional
+        Clauses from `gpsdio.where.normalize()`.
+
+    Returns
+    -------
+    iterator
+        Producing GPSd messages.
+    """
+
+    streams = []
+    for mtype, columns in sorted(six.iteritems(tables(conn))):
+        translated = gpsdio.where.to_sql(where or [], columns, {'type': mtype})
+        if translated is None:
+            logger.debug("Skipping %s - can't match predicate", table_name(mtype))
+            continue
+        streams.append(_table_messages(conn, mtype, columns, *translated))
+
+    # Sequence numbers are unique so messages are never compared
+    return (msg for _, msg in merge(*streams))
+
+
+class SQLiteWriter(object):
+
+    """
+    Insert messages into per-type tables with batched `executemany()` calls
+    inside a single transaction, which is committed by `commit()` or
+    `close()`.  Indexes are created when the writer is closed so they don't
+    have to be maintained during the load.
+    """
+
+    def __init__(self, conn, schema, batch_size=BATCH_SIZE, indexes=INDEXES):
+
+        """
+        Parameters
+        ----------
+        conn : sqlite3.Connection
+            Opened with `isolation_level=None` so transactions can be
+            managed explicitly.
+        schema : dict
+            From `gpsdio.schema.build_schema()`.
+        batch_size : int, optional
+            Number of messages of a single type to insert at once.
+        indexes : iterable, optional
+            Tuples of columns to index.
+        """
+
+        self._conn = conn
+        self._schema = schema
+        self._batch_size = batch_size
+        self._indexes = indexes
+        self._tables = tables(conn)
+        self._inserts = {}
+        self._buffers = {}
+
+        # Continue numbering when appending
+        self._seq = 0
+        for mtype in self._tables:
+            last, = conn.execute('SELECT MAX({}) FROM {}'.format(
+                quote(SEQ), quote(table_name(mtype)))).fetchone()
+            if last is not None:
+                self._seq = max(self._seq, last + 1)
+
+        conn.execute('BEGIN')
+
+    def _create(self, mtype):
+
+        """
+        Create a message type's table if it doesn't exist and prepare its
+        insert statement.
+        """
+
+        fields = self._schema.get(mtype)
+        if fields is None:
+            raise ValueError("Can't store type {} - not in the schema".format(mtype))
+
+        table = table_name(mtype)
+        if mtype not in self._tables:
+            definitions = ['{} INTEGER PRIMARY KEY'.format(quote(SEQ))]
+            for name, definition in six.iteritems(fields):
+                if name != 'type':
+                    sql_type = _SQL_TYPES.get(field_type(definition['validate'])[0], '')
+                    definitions.append('{} {}'.format(quote(name), sql_type).strip())
+            self._conn.execute('CREATE TABLE {} ({})'.format(quote(table), ', '.join(definitions)))
+            self._tables[mtype] = tuple(n for n in fields if n != 'type')
+
+        columns = self._tables[mtype]
+        datetimes = [i for i, n in enumerate(columns)
+                     if n in fields and field_type(fields[n]['validate'])[0] == 'datetime']
+        statement = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            quote(table), ', '.join(map(quote, (SEQ,) + columns)),
+            ', '.join('?' * (len(columns) + 1)))
+        self._inserts[mtype] = (statement, columns, datetimes)
+        self._buffers[mtype] = []
+
+    def write(self, msg):
+        mtype = msg['type']
+        if mtype not in self._inserts:
+            self._create(mtype)
+        _, columns, datetimes = self._inserts[mtype]
+
+        row = [self._seq]
+        row.extend(msg.get(n) for n in columns)
+        for i in datetimes:
+            if row[i + 1] is not None and not isinstance(row[i + 1], six.string_types):
+                row[i + 1] = datetime2str(row[i + 1])
+        self._seq += 1
+
+        buf = self._buffers[mtype]
+        buf.append(row)
+        if len(buf) >= self._batch_size:
+            self._flush(mtype)
+
+    def _flush(self, mtype):
+        rows, self._buffers[mtype] = self._buffers[mtype], []
+        if rows:
+            self._conn.executemany(self._inserts[mtype][0], rows)
+
+    def commit(self):
+
+        """
+        Insert buffered messages and commit the transaction.
+        """
+
+        for mtype in list(self._buffers):
+            self._flush(mtype)
+        self._conn.execute('COMMIT')
+        self._conn.execute('BEGIN')
+
+    def close(self):
+
+        """
+        Insert buffered messages, create indexes, and commit.
+        """
+
+        for mtype in list(self._buffers):
+            self._flush(mtype)
+        for mtype, columns in sorted(six.iteritems(self._tables)):
+            for index in self._indexes:
+                if all(c in columns for c in index):
+                    name = '{}_{}'.format(table_name(mtype), '_'.join(index))
+                    self._conn.execute('CREATE INDEX IF NOT EXISTS {} ON {} ({})'.format(
+                        quote(name), quote(table_name(mtype)), ', '.join(map(quote, index))))
+        self._conn.execute('COMMIT')
@@ -0,0 +1,340 @@
+"""
+Simple predicates for selecting messages by field value.
+
+A predicate is a list of `(field, op, value)` clauses that must all be true,
+like `[('mmsi', '==', 123456789), ('timestamp', '>=', '2015-01-01')]`.
+Unlike the expressions used by `gpsdio.ops.filter()` they can be inspected,
+which allows drivers to skip data that can't possibly match before any
+messages are built.  A clause comparing a missing or `None` field to
+anything other than `None` is false, even with `!=`.
+"""
+
+
+import datetime
+import operator
+
+import six
+
+from gpsdio.validate import DATETIME_FORMAT
+
+
+OPERATORS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    'in': lambda a, b: a in b,
+    'not in': lambda a, b: a not in b,
+}
+
+
+# Formats accepted for datetime clause values in addition to datetime objects
+DATETIME_FORMATS = (DATETIME_FORMAT, '%Y-%m-%dT%H:%M:%SZ', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d')
+
+
+def to_datetime(value):
+
+    """
+    Convert a string in one of the `DATETIME_FORMATS` to a datetime.
+
+    Parameters
+    ----------
+    value : str or datetime.datetime
+        Timestamp.
+
+    Raises
+    ------
+    ValueError
+        Value doesn't match any format.
+
+    Returns
+    -------
+    datetime.datetime
+    """
+
+    if isinstance(value, datetime.datetime) or value is None:
+        return value
+    for fmt in DATETIME_FORMATS:
+        try:
+            return datetime.datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    raise ValueError("Can't convert to a datetime: {}".format(value))
+
+
+def normalize(where, schema=None):
+
+    """
+    Check a predicate's clauses and convert datetime values.
+
+    Parameters
+    ----------
+    where : list
+        `(field, op, value)` clauses.  A single clause is also accepted.
+    schema : dict, optional
+        From `gpsdio.schema.build_schema()`.  Values for datetime fields are
+        converted to `datetime.datetime()` objects.
+
+    Raises
+    ------
+    ValueError
+        A clause is malformed or has an unknown operator.
+
+    Returns
+    -------
+    list
+        `(field, op, value)` tuples.  `in` and `not in` values are tuples.
+    """
+
+    if where and isinstance(where[0], six.string_types):
+        where = [where]
+
+    datetimes = set()
+    if schema:
+        from gpsdio.schema import field_type
+
+        for fields in six.itervalues(schema):
+            for name, definition in six.iteritems(fields):
+                if field_type(definition['validate'])[0] == 'datetime':
+                    datetimes.add(name)
+
+    out = []
+    for clause in where or ():
+        try:
+            field, op, value = clause
+        except (TypeError, ValueError):
+            raise ValueError("Clauses must be like (field, op, value): {}".format(clause))
+        if op not in OPERATORS:
+            raise ValueError("Unknown operator '{}' - must be one of: {}".format(
+                op, ', '.join(sorted(OPERATORS))))
+        convert = to_datetime if field in datetimes else lambda v: v
+        if op in ('in', 'not in'):
+            value = tuple(convert(v) for v in value)
+        else:
+            value = convert(value)
+        out.append((field, op, value))
+    return out
+
+
+def _compile(where):
+
+    """
+    Add the text form of datetime values to each clause so timestamps that
+    are still strings in `DATETIME_FORMAT` can be compared without parsing.
+    """
+
+    out = []
+    for field, op, value in where:
+        text = None
+        if op in ('in', 'not in'):
+            if any(isinstance(v, datetime.datetime) for v in value):
+                text = tuple(v.strftime(DATETIME_FORMAT) if isinstance(v, datetime.datetime)
+                             else v for v in value)
+        elif isinstance(value, datetime.datetime):
+            text = value.strftime(DATETIME_FORMAT)
+        out.append((field, op, value, text))
+    return out
+
+
+# Length of a timestamp in `DATETIME_FORMAT`
+_DATETIME_LENGTH = len('2015-01-01T00:00:00.000000Z')
+
+
+def _matches(msg, clauses):
+    for field, op, value, text in clauses:
+        v = msg.get(field)
+        if v is None:
+            if (op == '==' and value is None) or (op == 'in' and None in value):
+                continue
+            return False
+        if text is not None and isinstance(v, six.string_types):
+            if len(v) == _DATETIME_LENGTH and v[-1] == 'Z':
+                value = text
+            else:
+                v = to_datetime(v)
+        try:
+            if not OPERATORS[op](v, value):
+                return False
+        except TypeError:
+            return False
+    return True
+
+
+def matches(msg, where):
+
+    """
+    Determine if a message satisfies every clause.  String values are
+    converted when compared to a datetime.
+
+    Parameters
+    ----------
+    msg : dict
+        GPSd message.
+    where : list
+        Clauses from `normalize()`.
+
+    Returns
+    -------
+    bool
+    """
+
+    return _matches(msg, _compile(where))
+
+
+def predicate(where):
+
+    """
+    Get a function that determines if a message satisfies every clause.
+
+    Parameters
+    ----------
+    where : list
+        Clauses from `normalize()`.
+
+    Returns
+    -------
+    callable
+    """
+
+    clauses = _compile(where)
+    return lambda msg: _matches(msg, clauses)
+
+
+def bounds(where):
+
+    """
+    Get the range of values each field can have while satisfying every clause,
+    which drivers can compare against the minimum and maximum values of a
+    block of data.  Bounds are inclusive and may be wider than the clauses.
+
+    Parameters
+    ----------
+    where : list
+        Clauses from `normalize()`.
+
+    Returns
+    -------
+    dict
+        `{field: (min, max)}` where either value may be `None` if unbounded.
+        Fields that can't be bounded are omitted.
+    """
+
+    out = {}
+    for field, op, value in where:
+        if value is None or op in ('!=', 'not in'):
+            continue
+        if op == 'in':
+            try:
+                lo, hi = min(value), max(value)
+            except (TypeError, ValueError):
+                continue
+        elif op == '==':
+            lo = hi = value
+        elif op in ('<', '<='):
+            lo, hi = None, value
+        else:
+            lo, hi = value, None
+
+        old_lo, old_hi = out.get(field, (None, None))
+        try:
+            if old_lo is not None and (lo is None or old_lo > lo):
+                lo = old_lo
+            if old_hi is not None and (hi is None or old_hi < hi):
+                hi = old_hi
+        except TypeError:
+            continue
+        out[field] = (lo, hi)
+    return out
+
+
+def overlaps(where_bounds, field, minimum, maximum):
+
+    """
+    Determine if a block of data with the given minimum and maximum value for
+    a field could contain a message satisfying the bounds from `bounds()`.
+
+    Parameters
+    ----------
+    where_bounds : dict
+        From `bounds()`.
+    field : str
+        Field name.
+    minimum : object
+        Minimum value of the field in the block.
+    maximum : object
+        Maximum value of the field in the block.
+
+    Returns
+    -------
+    bool
+        `False` only if the block definitely doesn't contain a match.
+    """
+
+    if field not in where_bounds or minimum is None or maximum is None:
+        return True
+    lo, hi = where_bounds[field]
+    try:
+        return not ((lo is not None and maximum < lo) or (hi is not None and minimum > hi))
+    except TypeError:
+        return True
+
+
+def to_sql(where, columns, constants=None):
+
+    """
+    Translate a predicate into an SQL `WHERE` clause for a table.  Datetimes
+    are compared as strings in `DATETIME_FORMAT`.
+
+    Parameters
+    ----------
+    where : list
+        Clauses from `normalize()`.
+    columns : iterable
+        Columns in the table.  Fields that aren't columns or constants are
+        treated as `None`.
+    constants : dict, optional
+        Fields that have the same value for every row, like `{'type': 1}`,
+        which are evaluated in Python.
+
+    Returns
+    -------
+    tuple or None
+        `(sql, params)` where `sql` is an empty string if every row matches,
+        or `None` if no row can match.
+    """
+
+    columns = set(columns)
+    constants = constants or {}
+    sql = []
+    params = []
+
+    def convert(v):
+        return v.strftime(DATETIME_FORMAT) if isinstance(v, datetime.datetime) else v
+
+    for field, op, value in where:
+        if field in constants or field not in columns:
+            if not matches({field: constants.get(field)}, [(field, op, value)]):
+                return None
+            continue
+
+        col = '"{}"'.format(field.replace('"', '""'))
+        if op in ('in', 'not in'):
+            values = [convert(v) for v in value if v is not None]
+            placeholders = ', '.join('?' * len(values))
+            if op == 'in':
+                terms = ['{} IN ({})'.format(col, placeholders)] if values else []
+                if len(values) != len(value):
+                    terms.append('{} IS NULL'.format(col))
+                sql.append('({})'.format(' OR '.join(terms)) if terms else '0')
+            else:
+                sql.append('({} IS NOT NULL AND {} NOT IN ({}))'.format(col, col, placeholders))
+            params.extend(values)
+        elif value is None:
+            sql.append({'==': '{} IS NULL', '!=': '{} IS NOT NULL'}.get(op, '0').format(col))
+        else:
+            sql.append('{} {} ?'.format(col, '=' if op == '==' else op))
+            params.append(convert(value))
+
+    return ' AND '.join(sql), params
@@ -8,6 +8,7 @@ Setup script for gpsdio
 
 from codecs import open
 import os
+import sys
 
 from Cython.Build import cythonize
 from setuptools.extension import Extension
@@ -47,31 +48,57 @@ with open(os.path.join('gpsdio', '__init__.py'), encoding='utf-8') as f:
     source = dunders['__source__']
 
 
-ext_modules = cythonize([Extension('gpsdio._validate', ['gpsdio/_validate.pyx'])])
+commands = [
+    'cat=gpsdio.cli.cat:cat',
+    'env=gpsdio.cli.env:env',
+    'etl=gpsdio.cli.etl:etl',
+    'index=gpsdio.cli.index:index',
+    'info=gpsdio.cli.info:info',
+    'insp=gpsdio.cli.insp:insp',
+    'load=gpsdio.cli.load:load',
+    'merge=gpsdio.cli.merge:merge',
+    'split=gpsdio.cli.split:split',
+]
+
+# The feed commands rely on async/await syntax
+if sys.version_info >= (3, 5):
+    commands += [
+        'ingest=gpsdio.cli.ingest:ingest',
+        'replay=gpsdio.cli.replay:replay',
+    ]
+
+
+ext_modules = cythonize([
+    Extension('gpsdio._validate', ['gpsdio/_validate.pyx']),
+    Extension('gpsdio._nmea', ['gpsdio/_nmea.pyx'])
+])
 
 
 setup(
     author=author,
     author_email=email,
     description="A general purpose AIS I/O library using the GPSd AIVDM schema.",
-    entry_points='''
-        [console_scripts]
-        gpsdio=gpsdio.cli.main:main_group
-
-        [gpsdio.gpsdio_commands]
-        cat=gpsdio.cli.cat:cat
-        env=gpsdio.cli.env:env
-        etl=gpsdio.cli.etl:etl
-        info=gpsdio.cli.info:info
-        insp=gpsdio.cli.insp:insp
-        load=gpsdio.cli.load:load
-    ''',
+    entry_points={
+        'console_scripts': [
+            'gpsdio=gpsdio.cli.main:main_group',
+        ],
+        'gpsdio.gpsdio_commands': commands,
+    },
     ext_modules=ext_modules,
     extras_require={
         'dev': [
             'pytest',
             'pytest-cov',
             'coveralls'
+        ],
+        'numpy': [
+            'numpy'
+        ],
+        'parquet': [
+            'pyarrow'
+        ],
+        'arrow': [
+            'pyarrow'
         ]
     },
     install_requires=[
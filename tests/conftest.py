@@ -64,6 +64,31 @@ def types_nmea_gz_path():
     return os.path.join('tests', 'data', 'types.nmea.gz')
 
 
+@pytest.fixture(scope='function')
+def sorted_copy():
+    def _sorted_copy(src_path, pth, **kwargs):
+
+        """
+        Write several copies of a file's messages to a new file sorted by
+        time, with timestamps spread over several decades.
+        """
+
+        import gpsdio
+        from gpsdio.validate import datetime2str
+
+        with gpsdio.open(src_path) as src:
+            msgs = sorted(list(src) * 4, key=lambda m: datetime2str(m['timestamp']))
+        msgs = [dict(m, timestamp=str(2012 + i // 3) + datetime2str(m['timestamp'])[4:])
+                for i, m in enumerate(msgs)]
+        msgs.sort(key=lambda m: m['timestamp'])
+        with gpsdio.open(pth, 'w', **kwargs) as dst:
+            for msg in msgs:
+                dst.write(msg)
+        with gpsdio.open(pth) as src:
+            return list(src)
+    return _sorted_copy
+
+
 @pytest.fixture(scope='function')
 def compare_msg():
     def _compare_msg(msg1, msg2, float_tolerance=0.00001):
@@ -0,0 +1,148 @@
+"""
+Unittests for gpsdio.aio
+"""
+
+
+import asyncio
+
+import pytest
+
+import gpsdio
+import gpsdio.aio
+import gpsdio.base
+import gpsdio.errors
+
+
+def test_read(types_msg_gz_path):
+
+    async def read():
+        out = []
+        async with gpsdio.aopen(types_msg_gz_path, batch_size=3) as src:
+            async for msg in src:
+                out.append(msg)
+        return out
+
+    with gpsdio.open(types_msg_gz_path) as src:
+        expected = list(src)
+    assert asyncio.run(read()) == expected
+
+
+def test_round_trip(types_json_path, tmpdir):
+
+    pth = str(tmpdir.mkdir('test').join('test_aio_round_trip.msg.gz'))
+
+    async def copy():
+        async with gpsdio.aopen(types_json_path, batch_size=2, queue_size=1) as src, \
+                gpsdio.aopen(pth, 'w', batch_size=4, queue_size=1) as dst:
+            async for msg in src:
+                await dst.write(msg)
+
+    asyncio.run(copy())
+    with gpsdio.open(types_json_path) as expected, gpsdio.open(pth) as actual:
+        assert list(expected) == list(actual)
+
+
+def test_close_early(types_json_path):
+
+    async def read_one():
+        src = gpsdio.aopen(types_json_path, batch_size=1, queue_size=1)
+        msg = await src.__anext__()
+        await src.close()
+        assert src.closed
+        assert src.stream.closed
+        with pytest.raises(ValueError):
+            await src.__anext__()
+        return msg
+
+    assert 'type' in asyncio.run(read_one())
+
+
+def test_write_error_surfaces(tmpdir):
+
+    pth = str(tmpdir.mkdir('test').join('test_aio_bad_msg.json'))
+
+    async def write():
+        async with gpsdio.aopen(pth, 'w', batch_size=1) as dst:
+            await dst.write({'type': 1})
+            await dst.flush()
+
+    with pytest.raises(gpsdio.errors.SchemaError):
+        asyncio.run(write())
+
+
+def test_bad_args():
+    with pytest.raises(ValueError):
+        gpsdio.aopen('whatever.json', mode='x')
+    with pytest.raises(ValueError):
+        gpsdio.aopen('whatever.json', batch_size=0)
+
+
+def test_ingest_replay(types_nmea_path, tmpdir):
+
+    pth = str(tmpdir.mkdir('test').join('test_ingest.json'))
+
+    async def run():
+        server = await gpsdio.aio.replay(types_nmea_path, rate=1000, repeat=2)
+        host, port = server.sockets[0].getsockname()[:2]
+        url = 'tcp://{}:{}'.format(host, port)
+        async with server:
+            async with gpsdio.aopen(pth, 'w', batch_size=7) as dst:
+                return await gpsdio.aio.ingest(url, dst, batch_size=5, flush_interval=0.01)
+
+    assert asyncio.run(run()) == 52
+    # JSON stores timestamps as strings
+    dump = gpsdio.base.BaseDriver().dump
+    with gpsdio.open(pth) as src, gpsdio.open(types_nmea_path) as expected:
+        expected = [dump(msg) for msg in expected]
+        assert list(src) == expected + expected
+
+
+def test_ingest_max_messages(types_nmea_gz_path, tmpdir):
+
+    pth = str(tmpdir.mkdir('test').join('test_ingest_max.msg'))
+
+    async def run():
+        server = await gpsdio.aio.replay(types_nmea_gz_path, repeat=100)
+        host, port = server.sockets[0].getsockname()[:2]
+        async with server:
+            async with gpsdio.aopen(pth, 'w') as dst:
+                return await gpsdio.aio.ingest(
+                    'tcp://{}:{}'.format(host, port), dst, max_messages=30)
+
+    assert asyncio.run(run()) == 30
+    with gpsdio.open(pth) as src:
+        assert len(list(src)) == 30
+
+
+def test_run_serve(types_nmea_path):
+
+    async def run():
+        server = await gpsdio.aio.replay(types_nmea_path)
+        task = asyncio.ensure_future(gpsdio.aio.serve(server))
+        await asyncio.sleep(0)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        return server
+
+    assert not gpsdio.aio.run(run()).sockets
+
+    # Interrupted coroutines are cancelled so they can clean up
+    cancelled = []
+
+    def interrupt():
+        raise KeyboardInterrupt
+
+    async def interrupted():
+        asyncio.get_event_loop().call_soon(interrupt)
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    with pytest.raises(KeyboardInterrupt):
+        gpsdio.aio.run(interrupted())
+    assert cancelled
@@ -0,0 +1,85 @@
+"""
+Unittests for gpsdio.bloom
+"""
+
+
+import pytest
+
+import gpsdio
+import gpsdio.bloom
+import gpsdio.cli.main
+
+
+def test_bloom_filter():
+    values = range(100000000, 100001000)
+    bloom = gpsdio.bloom.BloomFilter.create(values, rate=0.01)
+    assert all(v in bloom for v in values)
+    misses = sum(1 for v in range(200000000, 200010000) if v in bloom)
+    assert misses < 300
+    assert bloom.false_positive_rate < 0.02
+
+    small = gpsdio.bloom.BloomFilter.create(values, size=64)
+    assert len(small.bits) == 64
+    assert all(v in small for v in values)
+
+    with pytest.raises(ValueError):
+        gpsdio.bloom.BloomFilter.create(values, rate=1.5)
+    with pytest.raises(ValueError):
+        gpsdio.bloom.BloomFilter.create(values, size=0)
+
+
+def test_bloom_sidecar(types_json_path, tmpdir):
+    with gpsdio.open(types_json_path) as src:
+        msgs = list(src)
+    mmsi = set(m['mmsi'] for m in msgs)
+
+    pth = str(tmpdir.join('test.json'))
+    with gpsdio.open(pth, 'w', bloom={'rate': 0.001}) as dst:
+        for msg in msgs:
+            dst.write(msg)
+    bloom = gpsdio.bloom.load(pth)
+    assert all(m in bloom for m in mmsi)
+    assert gpsdio.bloom.might_contain(pth, list(mmsi)[0])
+    assert not gpsdio.bloom.might_contain(pth, [1, 2, 3])
+
+    # Built by scanning, including compressed files
+    gz = str(tmpdir.join('test.json.gz'))
+    with gpsdio.open(gz, 'w') as dst:
+        for msg in msgs:
+            dst.write(msg)
+    assert gpsdio.bloom.load(gz) is None
+    gpsdio.bloom.build(gz, size=128)
+    assert len(gpsdio.bloom.load(gz).bits) == 128
+
+    # Stale filters are ignored
+    with open(pth, 'a') as f:
+        f.write('\n')
+    assert gpsdio.bloom.load(pth) is None
+    assert gpsdio.bloom.might_contain(pth, 1)
+
+
+def test_cli_bloom(types_json_path, tmpdir, runner):
+    data = tmpdir.mkdir('data')
+    with gpsdio.open(types_json_path) as src:
+        msgs = list(src)
+    mmsi = msgs[0]['mmsi']
+    for name, subset in (('a.json', msgs), ('b.json', [m for m in msgs if m['mmsi'] != mmsi])):
+        with gpsdio.open(str(data.join(name)), 'w') as dst:
+            for msg in subset:
+                dst.write(msg)
+
+    result = runner.invoke(gpsdio.cli.main.main_group, [
+        'info', str(data.join('a.json')), '--bloom', '--bloom-rate', '0.001'])
+    assert result.exit_code == 0
+    assert data.join('a.json.bloom').exists()
+
+    result = runner.invoke(gpsdio.cli.main.main_group, ['index', str(data), '--bloom'])
+    assert result.exit_code == 0
+    assert not gpsdio.bloom.might_contain(str(data.join('b.json')), mmsi)
+
+    out = str(tmpdir.join('out.json'))
+    result = runner.invoke(gpsdio.cli.main.main_group, [
+        'etl', str(data), out, '--mmsi', str(mmsi)])
+    assert result.exit_code == 0
+    with gpsdio.open(out) as src:
+        assert list(src) == [m for m in msgs if m['mmsi'] == mmsi]
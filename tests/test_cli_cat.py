@@ -48,3 +48,11 @@ def test_cat_geojson_non_posit(types_json_path, tmpdir):
     geojson = [json.loads(l) for l in result.splitlines()]
     assert len(geojson) is 1
     assert geojson[0]['properties']['type'] is 1
+
+
+def test_cat_multiple(types_json_path, types_msg_gz_path):
+    result = subprocess.check_output(
+        ['gpsdio', 'cat', types_json_path, types_msg_gz_path]).decode('utf-8')
+    with gpsdio.open(types_json_path) as a, gpsdio.open(types_msg_gz_path) as b:
+        expected = len(list(a)) + len(list(b))
+    assert len(result.splitlines()) == expected
@@ -4,10 +4,12 @@ Unittests for gpsdio etl
 
 
 from click.testing import CliRunner
+import pytest
 
 import gpsdio
 import gpsdio.cli
 import gpsdio.cli.main
+import gpsdio.ops
 
 
 def test_sort_time(types_msg_gz_path, tmpdir, runner):
@@ -80,3 +82,121 @@ def test_filter(types_msg_gz_path, tmpdir, runner):
                 prev = msg
             else:
                 assert msg['lat'] >= prev['lat']
+
+
+def test_where_parquet(types_json_path, tmpdir, runner):
+    pytest.importorskip('pyarrow')
+    tmp = tmpdir.mkdir('test')
+    parquet = str(tmp.join('test.parquet'))
+    pth = str(tmp.join('test.json'))
+
+    result = runner.invoke(gpsdio.cli.main.main_group, [
+        'etl', types_json_path, parquet, '--odo', 'row_group_size=5'])
+    assert result.exit_code == 0
+
+    result = runner.invoke(gpsdio.cli.main.main_group, [
+        'etl', parquet, pth,
+        '--where', 'type', 'in', '[1, 2, 3]',
+        '--where', 'timestamp', '>=', '2012-01-01T12:00:00'])
+    assert result.exit_code == 0
+
+    with gpsdio.open(types_json_path) as src:
+        expected = [m for m in src if m['type'] in (1, 2, 3)
+                    and m['timestamp'] >= '2012-01-01T12:00:00']
+    with gpsdio.open(pth) as src:
+        actual = list(src)
+    assert expected
+    assert actual == expected
+
+
+def test_where_bad_operator(types_json_path, tmpdir, runner):
+    result = runner.invoke(gpsdio.cli.main.main_group, [
+        'etl', types_json_path, str(tmpdir.join('out.json')), '--where', 'mmsi', '=~', '1'])
+    assert result.exit_code != 0
+    assert 'Unknown operator' in result.output
+
+
+def test_multiple_inputs(types_json_path, types_msg_gz_path, tmpdir, runner):
+    out = str(tmpdir.join('out.json'))
+    result = runner.invoke(gpsdio.cli.main.main_group, [
+        'etl', types_json_path, types_msg_gz_path, out])
+    assert result.exit_code == 0
+    with gpsdio.open(types_json_path) as a, gpsdio.open(types_msg_gz_path) as b:
+        expected = len(list(a)) + len(list(b))
+    with gpsdio.open(out) as src:
+        assert len(list(src)) == expected
+
+
+def test_dedupe(types_json_path, tmpdir, runner):
+
+    # Two stations receiving the same messages
+    with gpsdio.open(types_json_path) as src:
+        expected = sorted(src, key=lambda m: m['timestamp'])
+    paths = [str(tmpdir.join('a.json')), str(tmpdir.join('b.json'))]
+    for pth in paths:
+        with gpsdio.open(pth, 'w') as dst:
+            for msg in expected:
+                dst.write(msg)
+
+    pth = str(tmpdir.join('out.json'))
+    result = runner.invoke(gpsdio.cli.main.main_group, [
+        'etl', paths[0], paths[1], pth, '--assume-sorted', '--dedupe',
+        '--dedupe-key', 'mmsi', '--dedupe-key', 'type'])
+    assert result.exit_code == 0
+    with gpsdio.open(pth) as src:
+        assert [m['mmsi'] for m in src] == [m['mmsi'] for m in expected]
+
+
+def test_sort_max_delay(types_json_path, tmpdir, runner):
+    with gpsdio.open(types_json_path) as src:
+        msgs = list(src)
+    pth = str(tmpdir.join('out.json'))
+
+    # The test data spans days, so a large delay is needed to sort it
+    result = runner.invoke(gpsdio.cli.main.main_group, [
+        'etl', types_json_path, pth, '--sort', 'timestamp', '--max-delay', str(10 * 86400)])
+    assert result.exit_code == 0
+    with gpsdio.open(pth) as src:
+        assert [m['timestamp'] for m in src] == sorted(m['timestamp'] for m in msgs)
+
+    result = runner.invoke(gpsdio.cli.main.main_group, [
+        'etl', types_json_path, pth, '--sort', 'mmsi', '--max-delay', '1'])
+    assert result.exit_code != 0
+    assert '--max-delay' in result.output
+
+
+def test_sort_fields(types_json_path, tmpdir, runner):
+    with gpsdio.open(types_json_path) as src:
+        msgs = list(src)
+    pth = str(tmpdir.join('out.json'))
+    result = runner.invoke(gpsdio.cli.main.main_group, [
+        'etl', types_json_path, pth, '--sort', 'type,timestamp'])
+    assert result.exit_code == 0
+    with gpsdio.open(pth) as src:
+        assert [(m['type'], m['timestamp']) for m in src] == sorted(
+            (m['type'], m['timestamp']) for m in msgs)
+
+
+def test_sort_missing(types_json_path, tmpdir, runner):
+    with gpsdio.open(types_json_path) as src:
+        msgs = list(src)
+    assert any('lon' not in m for m in msgs)
+    pth = str(tmpdir.join('out.json'))
+    result = runner.invoke(gpsdio.cli.main.main_group, [
+        'etl', types_json_path, pth, '--sort', 'lon'])
+    assert result.exit_code == 0
+    with gpsdio.open(pth) as src:
+        actual = [m.get('lon') for m in src]
+    missing = sum(1 for m in msgs if m.get('lon') is None)
+    assert actual[:missing] == [None] * missing
+    assert actual[missing:] == sorted(m['lon'] for m in msgs if m.get('lon') is not None)
+
+def test_sort_hilbert(types_json_path, tmpdir, runner):
+    pth = str(tmpdir.join('out.json'))
+    result = runner.invoke(gpsdio.cli.main.main_group, [
+        'etl', types_json_path, pth, '--sort', 'hilbert'])
+    assert result.exit_code == 0
+    with gpsdio.open(types_json_path) as src:
+        expected = list(gpsdio.ops.sort(src, 'hilbert'))
+    with gpsdio.open(pth) as src:
+        assert list(src) == expected
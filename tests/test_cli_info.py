@@ -154,3 +154,15 @@ def test_unsorted(types_json_path, tmpdir, runner):
     ])
     assert result.exit_code == 0
     assert json.loads(result.output)['sorted'] is False
+
+
+def test_multiple_inputs(types_json_path, types_msg_gz_path, runner):
+    result = runner.invoke(gpsdio.cli.main.main_group, [
+        'info', '--count', types_json_path, types_msg_gz_path])
+    assert result.exit_code == 0
+    single = runner.invoke(gpsdio.cli.main.main_group, ['info', '--count', types_json_path])
+    assert int(result.output) == 2 * int(single.output)
+
+    result = runner.invoke(gpsdio.cli.main.main_group, [
+        'info', '--bloom', types_json_path, types_msg_gz_path])
+    assert result.exit_code != 0
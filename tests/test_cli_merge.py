@@ -0,0 +1,42 @@
+"""
+Unittests for gpsdio merge
+"""
+
+
+import gpsdio
+import gpsdio.base
+import gpsdio.cli.main
+
+
+def _split(src_path, tmpdir, count=3):
+    dump = gpsdio.base.BaseDriver().dump
+    with gpsdio.open(src_path) as src:
+        msgs = sorted((dump(m) for m in src if m.get('timestamp')),
+                      key=lambda m: m['timestamp'])
+    paths = []
+    for i in range(count):
+        pth = str(tmpdir.join('{}.msg.gz'.format(i)))
+        with gpsdio.open(pth, 'w') as dst:
+            for msg in msgs[i::count]:
+                dst.write(msg)
+        paths.append(pth)
+    return paths, msgs
+
+
+def test_merge(types_json_path, tmpdir, runner):
+    paths, expected = _split(types_json_path, tmpdir)
+    out = str(tmpdir.join('out.json'))
+    result = runner.invoke(gpsdio.cli.main.main_group, ['merge', '--check'] + paths + [out])
+    assert result.exit_code == 0
+    with gpsdio.open(out) as src:
+        actual = list(src)
+    assert [m['timestamp'] for m in actual] == [m['timestamp'] for m in expected]
+
+
+def test_merge_unsorted(types_json_path, tmpdir, runner):
+    paths, _ = _split(types_json_path, tmpdir, count=1)
+    out = str(tmpdir.join('out.json'))
+    result = runner.invoke(gpsdio.cli.main.main_group, [
+        'merge', '--check', '--field', 'mmsi'] + paths + [out])
+    assert result.exit_code != 0
+    assert "isn't sorted" in result.output
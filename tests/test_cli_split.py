@@ -0,0 +1,33 @@
+"""
+Unittests for gpsdio split
+"""
+
+
+import gpsdio
+import gpsdio.cli.main
+
+
+def test_split(types_json_path, tmpdir, runner):
+    with gpsdio.open(types_json_path) as src:
+        msgs = list(src)
+    template = str(tmpdir.join('by_mmsi', '{mmsi}.msg'))
+    result = runner.invoke(gpsdio.cli.main.main_group, [
+        'split', types_json_path, template, '--by', 'mmsi', '--max-open', '2'])
+    assert result.exit_code == 0
+    mmsi = set(m['mmsi'] for m in msgs)
+    assert len(tmpdir.join('by_mmsi').listdir()) == len(mmsi)
+    for m in mmsi:
+        with gpsdio.open(template.format(mmsi=m)) as src:
+            assert [msg['mmsi'] for msg in src] == [msg['mmsi'] for msg in msgs if msg['mmsi'] == m]
+
+
+def test_split_expression(types_json_path, tmpdir, runner):
+    template = str(tmpdir.join('{key}.json'))
+    result = runner.invoke(gpsdio.cli.main.main_group, [
+        'split', types_json_path, template, '--by', 'str(timestamp)[:10]', '--bloom'])
+    assert result.exit_code == 0
+    with gpsdio.open(types_json_path) as src:
+        days = set(str(m['timestamp'])[:10] for m in src)
+    names = set(p.basename for p in tmpdir.listdir())
+    assert names == set('{}.json'.format(d) for d in days) | set(
+        '{}.json.bloom'.format(d) for d in days)
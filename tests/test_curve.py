@@ -0,0 +1,104 @@
+"""
+Unittests for gpsdio.curve
+"""
+
+
+import datetime
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+import gpsdio
+import gpsdio.curve
+import gpsdio.ops
+
+
+def test_hilbert():
+    assert gpsdio.curve.hilbert([0, 0, 1, 1], [0, 1, 1, 0], order=1).tolist() == [0, 1, 2, 3]
+
+    # Every cell is visited once and consecutive cells are adjacent
+    n = 64
+    x, y = np.meshgrid(np.arange(n), np.arange(n))
+    x, y = x.ravel(), y.ravel()
+    d = gpsdio.curve.hilbert(x, y, order=6)
+    assert sorted(d.tolist()) == list(range(n * n))
+    order = np.argsort(d)
+    assert (np.abs(np.diff(x[order])) + np.abs(np.diff(y[order])) == 1).all()
+
+
+def test_morton():
+    assert gpsdio.curve.morton([0, 1, 0, 1, 2], [0, 0, 1, 1, 0], order=2).tolist() == [
+        0, 1, 2, 3, 4]
+
+
+def test_codes():
+    x, y = gpsdio.curve.grid([-180, 0, 180], [-90, 0, 90], order=2)
+    assert x.tolist() == [0, 2, 3]
+    assert y.tolist() == [0, 2, 3]
+    assert gpsdio.curve.codes([-180], [90], curve='morton', order=1).tolist() == [2]
+    with pytest.raises(ValueError):
+        gpsdio.curve.codes([0], [0], curve='peano')
+
+
+def _points(count=2000):
+    rand = random.Random(1)
+    start = datetime.datetime(2015, 1, 1)
+    return [{'type': 1, 'mmsi': i,
+             'lon': rand.uniform(-180, 180), 'lat': rand.uniform(-90, 90),
+             'timestamp': start + datetime.timedelta(seconds=rand.randrange(3 * 86400))}
+            for i in range(count)]
+
+
+def test_sort_curve():
+    msgs = _points()
+    missing = [{'type': 5, 'mmsi': 1}, {'type': 1, 'mmsi': 2, 'lon': 181, 'lat': 91}]
+
+    actual = list(gpsdio.ops.sort(msgs + missing, 'hilbert'))
+    assert actual[:2] == missing
+    codes = gpsdio.curve.codes([m['lon'] for m in actual[2:]], [m['lat'] for m in actual[2:]])
+    assert (np.diff(codes.astype('i8')) >= 0).all()
+
+    actual = list(gpsdio.ops.sort(msgs, 'morton:time'))
+    days = [m['timestamp'].date() for m in actual]
+    assert days == sorted(days)
+    for day in set(days):
+        same = [m for m in actual if m['timestamp'].date() == day]
+        codes = gpsdio.curve.codes(
+            [m['lon'] for m in same], [m['lat'] for m in same], curve='morton')
+        assert (np.diff(codes.astype('i8')) >= 0).all()
+
+    assert list(gpsdio.ops.sort(msgs, ('type', 'hilbert'))) == list(
+        gpsdio.ops.sort(msgs, 'hilbert'))
+    with pytest.raises(ValueError):
+        list(gpsdio.ops.sort(msgs, 'hilbert:space'))
+
+
+def test_sort_curve_row_groups(types_json_path, tmpdir):
+
+    """
+    Row groups of a file sorted along a curve have small bounding boxes, so
+    a spatial query reads few of them.
+    """
+
+    pq = pytest.importorskip('pyarrow.parquet')
+    import gpsdio.arrow
+    import gpsdio.where
+
+    with gpsdio.open(types_json_path) as src:
+        base = next(m for m in src if m['type'] == 1)
+    msgs = [dict(base, **m) for m in _points()]
+    bounds = gpsdio.where.bounds(
+        [('lon', '>=', 10), ('lon', '<=', 20), ('lat', '>=', 10), ('lat', '<=', 20)])
+
+    def matching_row_groups(order):
+        pth = str(tmpdir.join('{}.parquet'.format(order)))
+        with gpsdio.open(pth, 'w', do={'row_group_size': 50}) as dst:
+            for msg in gpsdio.ops.sort(msgs, order):
+                dst.write(msg)
+        meta = pq.ParquetFile(pth).metadata
+        return sum(gpsdio.arrow.row_group_matches(meta.row_group(i), bounds)
+                   for i in range(meta.num_row_groups))
+
+    assert matching_row_groups('hilbert') * 5 < matching_row_groups('timestamp')
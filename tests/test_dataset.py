@@ -0,0 +1,79 @@
+"""
+Unittests for gpsdio.dataset
+"""
+
+
+import pytest
+
+import gpsdio
+import gpsdio.base
+import gpsdio.dataset
+
+
+def _dataset(types_json_path, tmpdir):
+
+    """
+    Partition the test data by day and type, with an unreadable file in a
+    partition that tests prune.
+    """
+
+    dump = gpsdio.base.BaseDriver().dump
+    with gpsdio.open(types_json_path) as src:
+        msgs = [dump(m) for m in src]
+    root = tmpdir.mkdir('dataset')
+    template = str(root.join('date={key[0]}', 'type={key[1]}', 'part.msg.gz'))
+    with gpsdio.PartitionedWriter(
+            template, lambda m: (m['timestamp'][:10], m['type'])) as dst:
+        for msg in msgs:
+            dst.write(msg)
+    root.mkdir('date=1999-01-01').mkdir('type=99').join('bad.json').write('not json\n')
+    root.mkdir('_tmp').join('bad.json').write('not json\n')
+    return str(root), msgs
+
+
+def test_parse_partition():
+    assert gpsdio.dataset.parse_partition('type=1') == ('type', 1)
+    assert gpsdio.dataset.parse_partition('date=2015-01-01') == ('date', '2015-01-01')
+    assert gpsdio.dataset.parse_partition('name=a%2Fb') == ('name', 'a/b')
+    assert gpsdio.dataset.parse_partition('type') is None
+    assert gpsdio.dataset.parse_partition('=1') is None
+
+
+def test_open_dataset(types_json_path, tmpdir):
+    root, msgs = _dataset(types_json_path, tmpdir)
+    dump = gpsdio.base.BaseDriver().dump
+
+    # Partition clauses prune directories, including the unreadable file, and
+    # aren't applied to messages lacking the key
+    where = [('date', '>=', '2000-01-01'), ('type', 'in', [1, 2, 3])]
+    with gpsdio.open_dataset(root, where=where, workers=1) as src:
+        assert isinstance(src, gpsdio.dataset.GPSDIODataset)
+        assert src.name == root
+        assert src.partition_keys == ['date', 'type']
+        assert all(p['type'] in (1, 2, 3) for p in src.partitions)
+        actual = [dump(m) for m in src]
+    assert sorted(actual, key=lambda m: m['type']) == sorted(
+        [m for m in msgs if m['type'] in (1, 2, 3)], key=lambda m: m['type'])
+
+    # Other clauses and options apply to messages
+    mmsi = msgs[0]['mmsi']
+    with gpsdio.open_dataset(root, where=[('date', '>', '2000')], mmsi=mmsi) as src:
+        assert [dump(m) for m in src] == [m for m in msgs if m['mmsi'] == mmsi]
+
+    with gpsdio.open_dataset(root, where=('date', '>', '2000'), assume_sorted=True) as src:
+        actual = [dump(m)['timestamp'] for m in src]
+    assert actual == sorted(m['timestamp'] for m in msgs)
+
+    pa = pytest.importorskip('pyarrow')
+    with gpsdio.open_dataset(root, where=('type', '==', 5)) as src:
+        table = pa.Table.from_batches(list(src.to_arrow(batch_size=1)))
+    assert table.num_rows == len([m for m in msgs if m['type'] == 5])
+
+
+def test_open_dataset_errors(types_json_path, tmpdir):
+    with pytest.raises(IOError):
+        gpsdio.open_dataset(types_json_path)
+    root, _ = _dataset(types_json_path, tmpdir)
+    with gpsdio.open_dataset(root) as src:
+        with pytest.raises(ValueError):
+            list(src)
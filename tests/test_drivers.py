@@ -3,11 +3,16 @@ Unittests for gpsdio.drivers
 """
 
 
+import os
 import sys
 
+import msgpack
 import pytest
+from six.moves import StringIO
 
+import gpsdio
 import gpsdio.drivers
+import gpsdio.errors
 
 
 def test_get_compression():
@@ -43,3 +48,428 @@ def test_open_gzip(types_json_gz_path):
                 assert 'mmsi' in msg
                 assert 'type' in msg
                 assert 'timestamp' in msg
+
+
+def test_msgpack_positional(types_json_path, tmpdir):
+    pth = str(tmpdir.mkdir('test').join('test_positional.msg'))
+    with gpsdio.open(types_json_path) as src:
+        expected = list(src)
+    with gpsdio.open(pth, 'w', do={'positional': True}) as dst:
+        for msg in expected[:10]:
+            dst.write(msg)
+    with gpsdio.open(pth, 'a', do={'positional': True}) as dst:
+        for msg in expected[10:]:
+            dst.write(msg)
+        # Doesn't match the type's fields so it is written as a map
+        dst._stream.write({'type': 1, 'mmsi': 123})
+
+    with gpsdio.open(pth, _check=False) as src:
+        actual = list(src)
+    assert actual[:-1] == expected
+    assert actual[-1] == {'type': 1, 'mmsi': 123}
+
+    # Every message but the last is an array following the header
+    with open(pth, 'rb') as f:
+        raw = list(msgpack.Unpacker(f, encoding='utf-8'))
+    assert gpsdio.drivers._POSITIONAL_HEADER in raw[0]
+    assert all(isinstance(r, list) for r in raw[1:-1])
+
+
+def test_msgpack_positional_smaller(types_json_path, tmpdir):
+    tmp = tmpdir.mkdir('test')
+    sizes = []
+    for positional in (False, True):
+        pth = str(tmp.join('test_{}.msg'.format(positional)))
+        with gpsdio.open(types_json_path) as src, \
+                gpsdio.open(pth, 'w', do={'positional': positional}) as dst:
+            for msg in list(src) * 10:
+                dst.write(msg)
+        sizes.append(os.path.getsize(pth))
+    assert sizes[1] < sizes[0] / 2
+
+
+@pytest.mark.parametrize('positional', [False, True])
+@pytest.mark.parametrize('do', [
+    {'mmap': True},
+    {'mmap': True, 'read_size': 64},
+    {'use_list': False},
+    {'intern': True},
+    {'mmap': True, 'use_list': False, 'intern': True}])
+def test_msgpack_read_options(positional, do, types_json_path, tmpdir):
+    pth = str(tmpdir.mkdir('test').join('test_read_options.msg'))
+    with gpsdio.open(types_json_path) as src:
+        expected = list(src)
+    with gpsdio.open(pth, 'w', do={'positional': positional}) as dst:
+        for msg in expected:
+            dst.write(msg)
+    with gpsdio.open(pth, do=do) as src:
+        assert list(src) == expected
+        assert (src._stream._mmap is not None) == do.get('mmap', False)
+    assert src._stream._mmap is None or src._stream._mmap.closed
+
+
+@pytest.mark.parametrize('positional', [False, True])
+def test_msgpack_raw_intern(positional, types_json_path, tmpdir):
+    pth = str(tmpdir.mkdir('test').join('test_raw.msg'))
+    with gpsdio.open(types_json_path) as src:
+        expected = list(src)
+    with gpsdio.open(pth, 'w', do={'positional': positional}) as dst:
+        for msg in expected * 2:
+            dst.write(msg)
+    with gpsdio.open(pth, _check=False, do={'raw': True, 'intern': True, 'mmap': True}) as src:
+        actual = list(src)
+    assert len(actual) == 2 * len(expected)
+    for a, e in zip(actual, expected * 2):
+        assert set(a) == set(e)
+        for k, v in a.items():
+            if isinstance(v, bytes):
+                assert v.decode('utf-8') == e[k]
+            else:
+                assert v == e[k]
+    # Equal strings from different messages are the same object
+    half = len(actual) // 2
+    assert all(isinstance(m['timestamp'], bytes) for m in actual)
+    assert all(a['timestamp'] is b['timestamp'] for a, b in zip(actual[:half], actual[half:]))
+    type_keys = set(id(k) for m in actual for k in m if k == 'type')
+    assert len(type_keys) == 1
+
+
+def test_msgpack_mmap_empty_and_open_file(types_msg_path, tmpdir):
+    pth = str(tmpdir.mkdir('test').join('empty.msg'))
+    open(pth, 'w').close()
+    with gpsdio.open(pth, do={'mmap': True}) as src:
+        assert src._stream._mmap is None
+        assert list(src) == []
+    # Already open files are read normally
+    with open(types_msg_path, 'rb') as f, \
+            gpsdio.open(f, driver='MsgPack', compression=False, do={'mmap': True}) as src:
+        assert src._stream._mmap is None
+        assert len(list(src)) > 0
+
+
+@pytest.mark.parametrize('json_lib', ['orjson', 'ujson', 'json', None])
+def test_json_libs(json_lib, types_json_path, tmpdir):
+    if json_lib is not None:
+        pytest.importorskip(json_lib)
+    pth = str(tmpdir.mkdir('test').join('test_json_lib.json.gz'))
+    with gpsdio.open(types_json_path) as src:
+        expected = list(src)
+    with gpsdio.open(pth, 'w', do={'json_lib': json_lib}) as dst:
+        for msg in expected:
+            dst.write(msg)
+    with gpsdio.open(pth, do={'json_lib': json_lib}) as src:
+        if json_lib is not None:
+            assert src._stream.json_lib == json_lib
+        assert list(src) == expected
+
+
+def test_json_lib_module_and_text_streams():
+    import json
+    stream = StringIO()
+    with gpsdio.open(stream, 'w', driver='NewlineJSON', compression=False, _check=False,
+                     do={'json_lib': json}) as dst:
+        dst.write({'type': 1})
+        dst.write({'type': 2})
+        stream.write('\n')
+        assert dst._stream.json_lib == 'json'
+        stream.seek(0)
+        with gpsdio.open(stream, driver='NewlineJSON', compression=False,
+                         _check=False) as src:
+            assert list(src) == [{'type': 1}, {'type': 2}]
+
+
+def test_json_lib_bad():
+    with pytest.raises(ValueError):
+        gpsdio.drivers._json_funcs('not-a-json-lib')
+
+
+def test_newlinejson_options(tmpdir):
+    import json
+    pth = str(tmpdir.mkdir('test').join('test_options.json'))
+    do = {'json_lib': json, 'open_args': {'encoding': 'utf-8', 'buffering': 1024},
+          'newline': '\r\n', 'sort_keys': True, 'skip_failures': True}
+    with gpsdio.open(pth, 'w', do=do, _check=False) as dst:
+        dst.write({'type': 1, 'mmsi': 123})
+        dst.write({'type': 1, 'bad': object()})
+        dst.write({'type': 2})
+    with open(pth, 'rb') as f:
+        assert f.read() == b'{"mmsi": 123, "type": 1}\r\n{"type": 2}\r\n'
+
+    with open(pth, 'ab') as f:
+        f.write(b'not json\n{"type": 3}\n')
+    do = {'skip_failures': True, 'parse_int': str, 'json_lib': 'json'}
+    with gpsdio.open(pth, do=do, _check=False) as src:
+        assert list(src) == [{'mmsi': '123', 'type': '1'}, {'type': '2'}, {'type': '3'}]
+    with gpsdio.open(pth, _check=False) as src:
+        with pytest.raises(ValueError):
+            list(src)
+
+    with pytest.raises(ValueError):
+        gpsdio.open(pth, do={'open_args': {'encoding': 'latin-1'}})
+
+
+def test_fixedwidth(types_json_path, tmpdir):
+    np = pytest.importorskip('numpy')
+    pth = str(tmpdir.mkdir('test').join('test.fw'))
+    with gpsdio.open(types_json_path) as src:
+        expected = [gpsdio.base.BaseDriver().dump(msg) for msg in src]
+    with gpsdio.open(pth, 'w') as dst:
+        for msg in expected:
+            dst.write(msg)
+
+    with gpsdio.open(pth) as src:
+        actual = [gpsdio.base.BaseDriver().dump(msg) for msg in src]
+        driver = src.driver
+        assert len(driver) == len(expected)
+        assert gpsdio.base.BaseDriver().dump(driver[-1]) == expected[-1]
+        assert sorted(driver.types) == sorted(set(m['type'] for m in expected))
+        positions = driver.array(1)
+        assert isinstance(positions, np.ndarray)
+        assert 'type' not in positions.dtype.names
+        assert list(positions['mmsi']) == [m['mmsi'] for m in expected if m['type'] == 1]
+        with pytest.raises(IndexError):
+            driver[len(expected)]
+    assert actual == expected
+
+
+def test_fixedwidth_nulls_and_compression(types_json_path, tmpdir):
+    pytest.importorskip('numpy')
+    pth = str(tmpdir.mkdir('test').join('test.fw.gz'))
+    msg = {'type': 5, 'mmsi': None, 'shipname': None, 'callsign': '', 'timestamp': None}
+    with gpsdio.open(pth, 'w', _check=False) as dst:
+        dst.write(msg)
+    with gpsdio.open(pth, _check=False) as src:
+        actual, = list(src)
+    for key, value in msg.items():
+        assert actual[key] == value
+    # Missing fields receive their default
+    assert actual['shiptype'] == 0
+
+    # Missing floats are stored as NaN
+    with gpsdio.open(types_json_path) as src:
+        msg = next(m for m in src if m['type'] == 1)
+    msg = dict(msg, mmsi=1, lat=None, lon=None)
+    with gpsdio.open(pth, 'w', _check=False) as dst:
+        dst.write(msg)
+    with gpsdio.open(pth, _check=False) as src:
+        actual, = list(src)
+    assert actual['lat'] is None
+    assert actual['lon'] is None
+    assert actual['mmsi'] == 1
+
+    # Like every other driver, validation rejects the missing position
+    with gpsdio.open(pth) as src:
+        with pytest.raises(gpsdio.errors.SchemaError):
+            list(src)
+
+
+def test_fixedwidth_string_widths(tmpdir):
+    pytest.importorskip('numpy')
+    pth = str(tmpdir.mkdir('test').join('test.fw'))
+    msg = {'type': 5, 'shipname': 'X' * 30}
+    with pytest.raises(ValueError):
+        with gpsdio.open(pth, 'w', _check=False) as dst:
+            dst.write(msg)
+    with gpsdio.open(pth, 'w', _check=False, do={'string_widths': {'shipname': 30}}) as dst:
+        dst.write(msg)
+    with gpsdio.open(pth, _check=False) as src:
+        assert next(src)['shipname'] == msg['shipname']
+
+
+def test_fixedwidth_empty(tmpdir):
+    pytest.importorskip('numpy')
+    pth = str(tmpdir.mkdir('test').join('test.fw'))
+    with gpsdio.open(pth, 'w'):
+        pass
+    with gpsdio.open(pth) as src:
+        assert list(src) == []
+        assert len(src.driver) == 0
+
+
+def test_parquet(types_json_path, tmpdir):
+    pytest.importorskip('pyarrow')
+    pth = str(tmpdir.mkdir('test').join('test.parquet'))
+    with gpsdio.open(types_json_path) as src:
+        expected = [gpsdio.base.BaseDriver().dump(msg) for msg in src]
+    with gpsdio.open(pth, 'w', do={'row_group_size': 4}) as dst:
+        for msg in expected:
+            dst.write(msg)
+    with gpsdio.open(pth) as src:
+        assert [gpsdio.base.BaseDriver().dump(msg) for msg in src] == expected
+
+
+def test_parquet_where(types_json_path, tmpdir, monkeypatch):
+    pytest.importorskip('pyarrow')
+    import gpsdio.arrow
+    pth = str(tmpdir.mkdir('test').join('test.parquet'))
+    with gpsdio.open(types_json_path) as src:
+        expected = sorted(src, key=lambda m: m['mmsi'])
+    with gpsdio.open(pth, 'w', do={'row_group_size': 4}) as dst:
+        for msg in expected:
+            dst.write(msg)
+
+    # Data is sorted by MMSI so only one row group is read
+    batches = []
+    filter_batch = gpsdio.arrow.filter_batch
+    monkeypatch.setattr(
+        gpsdio.arrow, 'filter_batch', lambda b, w: batches.append(b) or filter_batch(b, w))
+    mmsi = expected[10]['mmsi']
+    with gpsdio.open(pth, where=[('mmsi', '==', mmsi)]) as src:
+        actual = [gpsdio.base.BaseDriver().dump(msg) for msg in src]
+    assert actual == [m for m in expected if m['mmsi'] == mmsi]
+    assert sum(b.num_rows for b in batches) < len(expected) / 2
+
+
+def test_parquet_columns(types_json_path, tmpdir):
+    pytest.importorskip('pyarrow')
+    pth = str(tmpdir.mkdir('test').join('test.parquet'))
+    with gpsdio.open(types_json_path) as src, gpsdio.open(pth, 'w') as dst:
+        for msg in src:
+            dst.write(msg)
+    with gpsdio.open(pth, _check=False, do={'columns': ['lat', 'lon']},
+                     where=[('type', '==', 1)]) as src:
+        for msg in src:
+            assert set(msg) == {'type', 'lat', 'lon'}
+
+
+def _by_type(msgs):
+    return sorted((gpsdio.base.BaseDriver().dump(m) for m in msgs),
+                  key=lambda m: (m['type'], m['mmsi'], m['timestamp']))
+
+
+@pytest.mark.parametrize('do', [{}, {'batch_size': 2}, {'compression': 'zstd'}])
+def test_arrow(do, types_json_path, tmpdir):
+    pa = pytest.importorskip('pyarrow')
+    import pyarrow.feather
+    pth = str(tmpdir.mkdir('test').join('test.arrow'))
+    with gpsdio.open(types_json_path) as src:
+        expected = list(src) * 3
+    with gpsdio.open(pth, 'w', do=do) as dst:
+        for msg in expected:
+            dst.write(msg)
+    with gpsdio.open(pth) as src:
+        actual = list(src)
+    assert _by_type(actual) == _by_type(expected)
+
+    # Readable by other tools and every batch holds a single type
+    table = pyarrow.feather.read_table(pth)
+    assert table.num_rows == len(expected)
+    with pa.ipc.open_file(pth) as reader:
+        for i in range(reader.num_record_batches):
+            assert len(set(reader.get_batch(i).column(0).to_pylist())) == 1
+
+
+def test_arrow_stream_and_where(types_json_path, tmpdir):
+    pa = pytest.importorskip('pyarrow')
+    import gpsdio.arrow
+    pth = str(tmpdir.mkdir('test').join('test.arrows'))
+    with gpsdio.open(types_json_path) as src:
+        expected = list(src)
+    arrow_schema = gpsdio.arrow.arrow_schema(gpsdio.schema.build_schema())
+    with pa.OSFile(pth, 'wb') as f, pa.ipc.new_stream(f, arrow_schema) as writer:
+        writer.write_batch(gpsdio.arrow.messages_to_batch(expected, arrow_schema))
+    with open(pth, 'rb') as f, gpsdio.open(f, driver='Arrow', compression=False,
+                                          where=[('type', 'in', [1, 5])]) as src:
+        actual = list(src)
+    assert _by_type(actual) == _by_type(m for m in expected if m['type'] in (1, 5))
+
+
+def test_sqlite(types_json_path, tmpdir):
+    import sqlite3
+    pth = str(tmpdir.mkdir('test').join('test.sqlite'))
+    with gpsdio.open(types_json_path) as src:
+        expected = [gpsdio.base.BaseDriver().dump(msg) for msg in src]
+    with gpsdio.open(pth, 'w', do={'batch_size': 2}) as dst:
+        for msg in expected[:10]:
+            dst.write(msg)
+        dst.driver.flush()
+    with gpsdio.open(pth, 'a') as dst:
+        for msg in expected[10:]:
+            dst.write(msg)
+    with gpsdio.open(pth) as src:
+        assert [gpsdio.base.BaseDriver().dump(msg) for msg in src] == expected
+
+    conn = sqlite3.connect(pth)
+    assert conn.execute('PRAGMA journal_mode').fetchone() == ('wal',)
+    indexes = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert 'type_1_mmsi_timestamp' in indexes
+    conn.close()
+
+    # Write mode replaces existing tables
+    with gpsdio.open(pth, 'w') as dst:
+        dst.write(expected[0])
+    with gpsdio.open(pth) as src:
+        assert len(list(src)) == 1
+
+
+def test_sqlite_where(types_json_path, tmpdir):
+    import sqlite3
+    pth = str(tmpdir.mkdir('test').join('test.sqlite'))
+    with gpsdio.open(types_json_path) as src:
+        expected = [gpsdio.base.BaseDriver().dump(msg) for msg in src]
+    with gpsdio.open(pth, 'w') as dst:
+        for msg in expected:
+            dst.write(msg)
+
+    mmsi = expected[0]['mmsi']
+    where = [('mmsi', '==', mmsi), ('timestamp', '>=', expected[0]['timestamp'])]
+    with gpsdio.open(pth, where=where) as src:
+        actual = [gpsdio.base.BaseDriver().dump(msg) for msg in src]
+    assert actual
+    assert actual == [m for m in expected
+                      if m['mmsi'] == mmsi and m['timestamp'] >= expected[0]['timestamp']]
+
+    # Lookups by vessel use the index
+    conn = sqlite3.connect(pth)
+    plan = conn.execute(
+        'EXPLAIN QUERY PLAN SELECT * FROM type_1 WHERE ' +
+        gpsdio.where.to_sql(gpsdio.where.normalize(where), ['mmsi', 'timestamp'])[0],
+        (mmsi, expected[0]['timestamp'])).fetchall()
+    conn.close()
+    assert 'type_1_mmsi_timestamp' in str(plan)
+
+    with gpsdio.open(pth, where=[('type', '==', 5)]) as src:
+        assert [m['type'] for m in src] == [m['type'] for m in expected if m['type'] == 5]
+
+
+def test_sqlite_requires_path(tmpdir):
+    with pytest.raises(ValueError):
+        gpsdio.open(StringIO(), driver='SQLite', compression=False)
+    with pytest.raises(IOError):
+        gpsdio.open(str(tmpdir.join('missing.sqlite')))
+
+
+@pytest.mark.parametrize('ext', ['csv', 'csv.gz'])
+def test_csv(ext, types_json_path, tmpdir):
+    pth = str(tmpdir.mkdir('test').join('test.' + ext))
+    with gpsdio.open(types_json_path) as src:
+        expected = [gpsdio.base.BaseDriver().dump(msg) for msg in src]
+    with gpsdio.open(pth, 'w') as dst:
+        for msg in expected:
+            dst.write(msg)
+    with gpsdio.open(pth) as src:
+        actual = list(src)
+    assert _by_type(actual) == _by_type({k: int(v) if isinstance(v, bool) else v
+                                         for k, v in m.items()} for m in expected)
+    assert isinstance(actual[0]['mmsi'], int)
+    assert isinstance(actual[0]['lat'], float)
+
+
+def test_csv_sections(types_json_path, tmpdir):
+    pth = str(tmpdir.mkdir('test').join('test.csv'))
+    with gpsdio.open(types_json_path) as src, gpsdio.open(
+            pth, 'w', do={'delimiter': '\t'}) as dst:
+        types = []
+        for msg in src:
+            dst.write(msg)
+            if msg['type'] not in types:
+                types.append(msg['type'])
+
+    with open(pth) as f:
+        headers = [line.rstrip('\r\n').split('\t') for line in f if line.startswith('type\t')]
+    assert len(headers) == len(types)
+    assert headers[0][1:] == [n for n in gpsdio.schema.build_schema()[types[0]] if n != 'type']
+
+    with gpsdio.open(pth, do={'delimiter': '\t'}) as src:
+        assert [m['type'] for m in src] == sorted(
+            (m['type'] for m in gpsdio.open(types_json_path)), key=types.index)
@@ -0,0 +1,196 @@
+"""
+Unittests for gpsdio.index
+"""
+
+
+import io
+
+import pytest
+
+import gpsdio
+import gpsdio.cli.main
+import gpsdio.index
+
+
+@pytest.mark.parametrize('ext,do', [
+    ('json', {}),
+    ('msg', {}),
+    ('msg', {'positional': True})])
+def test_index(ext, do, types_json_path, tmpdir, sorted_copy):
+    pth = str(tmpdir.join('test.' + ext))
+    expected = sorted_copy(types_json_path, pth, do=do)
+    index = gpsdio.index.build(pth, sample=7)
+    assert len(index) == len(expected)
+    assert index.timestamps
+    assert index.driver == ('NewlineJSON' if ext == 'json' else 'MsgPack')
+
+    loaded = gpsdio.index.load(pth)
+    assert list(loaded.offsets) == list(index.offsets)
+    assert loaded.mmsi == index.mmsi
+
+    mmsi = expected[3]['mmsi']
+    start, end = '2013-01-01', '2014-01-01'
+    with gpsdio.open(pth, start=start, end=end, mmsi=mmsi) as src:
+        assert isinstance(src.driver.f, io.BufferedReader)
+        actual = list(src)
+    assert actual == [m for m in expected if m['mmsi'] == mmsi and
+                      '2013' <= m['timestamp'] < '2014']
+
+    with gpsdio.open(pth, start=start) as src:
+        assert list(src) == [m for m in expected if m['timestamp'] >= '2013']
+
+    with gpsdio.open(pth, mmsi=[1]) as src:
+        assert list(src) == []
+
+
+def test_index_ranges(types_json_path, tmpdir, sorted_copy):
+    pth = str(tmpdir.join('test.json'))
+    expected = sorted_copy(types_json_path, pth)
+    index = gpsdio.index.build(pth, sample=10, gap=0)
+
+    # Only the records that can match are read
+    mmsi = expected[0]['mmsi']
+    ranges = index.record_ranges(mmsi=[mmsi])
+    assert sum(b - a for a, b in ranges) == sum(1 for m in expected if m['mmsi'] == mmsi)
+    assert index.record_ranges() is None
+
+    ranges = index.record_ranges(start=expected[50]['timestamp'])
+    assert ranges[0][0] <= 50
+    assert ranges[0][0] > 30
+
+
+def test_index_unsorted_and_stale(types_json_path, tmpdir):
+    pth = str(tmpdir.join('test.json'))
+    with open(types_json_path) as src, open(pth, 'w') as dst:
+        dst.writelines(reversed(src.readlines()))
+    index = gpsdio.index.build(pth)
+    assert index.timestamps is None
+    assert index.record_ranges(start='2012-01-01') is None
+    assert gpsdio.index.load(pth) is not None
+
+    with open(pth, 'a') as f:
+        f.write('\n')
+    assert gpsdio.index.load(pth) is None
+    with gpsdio.open(pth, mmsi=[366268061]) as src:
+        assert all(m['mmsi'] == 366268061 for m in src)
+
+
+def test_index_unsupported(types_json_path, types_json_gz_path, tmpdir, sorted_copy):
+    with pytest.raises(ValueError):
+        gpsdio.index.build(types_json_gz_path)
+    pth = str(tmpdir.join('test.csv'))
+    sorted_copy(types_json_path, pth)
+    with pytest.raises(ValueError):
+        gpsdio.index.build(pth)
+
+
+def test_cli_index(types_json_path, tmpdir, runner, sorted_copy):
+    pth = str(tmpdir.join('test.json'))
+    expected = sorted_copy(types_json_path, pth)
+    result = runner.invoke(gpsdio.cli.main.main_group, ['index', pth, '--sample', '5'])
+    assert result.exit_code == 0
+    assert 'sorted by time' in result.output
+
+    out = str(tmpdir.join('out.json'))
+    mmsi = expected[0]['mmsi']
+    result = runner.invoke(gpsdio.cli.main.main_group, [
+        'etl', pth, out, '--mmsi', str(mmsi), '--start', '2013-01-01'])
+    assert result.exit_code == 0
+    with gpsdio.open(out) as src:
+        assert list(src) == [m for m in expected
+                             if m['mmsi'] == mmsi and m['timestamp'] >= '2013']
+
+
+BOX = (-71, 42, -70, 44)
+
+
+def _in_box(msg, bbox=BOX):
+    return (msg.get('lon') is not None and msg.get('lat') is not None and
+            bbox[0] <= msg['lon'] <= bbox[2] and bbox[1] <= msg['lat'] <= bbox[3])
+
+
+def test_index_bbox(types_json_path, tmpdir, sorted_copy):
+    pth = str(tmpdir.join('test.json'))
+    expected = sorted_copy(types_json_path, pth)
+    index = gpsdio.index.build(pth, gap=0)
+    assert index.bounds == (-90.54833221435547, -101.54704284667969, 200.23167419433594, 91.0)
+    assert index.time_range == (expected[0]['timestamp'], expected[-1]['timestamp'])
+
+    # Only the records in the box's cells are read
+    ranges = index.record_ranges(bbox=BOX)
+    assert sum(b - a for a, b in ranges) == sum(1 for m in expected if _in_box(m))
+
+    loaded = gpsdio.index.load(pth)
+    assert loaded.cells == index.cells
+    assert loaded.bounds == index.bounds
+
+    with gpsdio.open(pth, bbox=(-70.8, 42, -70.5, 44)) as src:
+        assert isinstance(src.driver.f, io.BufferedReader)
+        actual = list(src)
+    assert actual == [m for m in expected if _in_box(m, (-70.8, 42, -70.5, 44))]
+    assert actual
+
+    # Combined with other shortcuts
+    mmsi = actual[0]['mmsi']
+    with gpsdio.open(pth, bbox=BOX, mmsi=mmsi, start='2013-01-01') as src:
+        assert list(src) == [m for m in expected if _in_box(m) and m['mmsi'] == mmsi and
+                             m['timestamp'] >= '2013']
+    with gpsdio.open(pth, bbox=(0, 0, 1, 1)) as src:
+        assert list(src) == []
+
+    with pytest.raises(ValueError):
+        gpsdio.open(pth, bbox=(1, 0, 0, 1))
+
+
+def test_manifest(types_json_path, tmpdir, sorted_copy):
+    pth = str(tmpdir.join('a.json'))
+    expected = sorted_copy(types_json_path, pth)
+    with gpsdio.open(str(tmpdir.join('b.json.gz')), 'w') as dst:
+        for msg in expected:
+            if msg.get('lon', 0) > 0:
+                dst.write(msg)
+
+    manifest = gpsdio.index.write_manifest(str(tmpdir))
+    assert sorted(manifest['files']) == ['a.json', 'b.json.gz']
+    assert manifest['files']['a.json']['count'] == len(expected)
+    assert tmpdir.join('a.json.idx').exists()
+    assert not tmpdir.join('b.json.gz.idx').exists()
+    assert gpsdio.index.load_manifest(str(tmpdir)) == manifest['files']
+
+    b = str(tmpdir.join('b.json.gz'))
+    assert gpsdio.index.candidates(str(tmpdir)) == [pth, b]
+    assert gpsdio.index.candidates(str(tmpdir), bbox=BOX) == [pth]
+    assert gpsdio.index.candidates(str(tmpdir), bbox=(60, -100, 90, -70)) == [pth, b]
+    assert gpsdio.index.candidates(str(tmpdir), start='2050-01-01') == []
+
+    # Changed files can't be ruled out
+    with open(pth, 'a') as f:
+        f.write('\n')
+    assert gpsdio.index.candidates(str(tmpdir), start='2050-01-01') == [pth]
+
+
+def test_cli_etl_bbox(types_json_path, tmpdir, runner, sorted_copy):
+    data = tmpdir.mkdir('data')
+    expected = sorted_copy(types_json_path, str(data.join('a.json')))
+    sorted_copy(types_json_path, str(data.join('b.msg')))
+    result = runner.invoke(gpsdio.cli.main.main_group, ['index', str(data)])
+    assert result.exit_code == 0
+    assert data.join(gpsdio.index.MANIFEST).exists()
+
+    out = str(tmpdir.join('out.json'))
+    result = runner.invoke(gpsdio.cli.main.main_group, [
+        'etl', str(data), out, '--bbox', '-71', '42', '-70', '44'])
+    assert result.exit_code == 0
+    with gpsdio.open(out) as src:
+        assert list(src) == [m for m in expected if _in_box(m)] * 2
+
+
+def test_candidates_bloom(types_json_path, tmpdir, sorted_copy):
+    expected = sorted_copy(types_json_path, str(tmpdir.join('a.json')))
+    with gpsdio.open(str(tmpdir.join('b.json')), 'w', bloom=True) as dst:
+        dst.write(expected[0])
+    other = [m for m in expected if m['mmsi'] != expected[0]['mmsi']][0]['mmsi']
+
+    a, b = str(tmpdir.join('a.json')), str(tmpdir.join('b.json'))
+    assert gpsdio.index.candidates(str(tmpdir), mmsi=[other]) == [a]
+    assert gpsdio.index.candidates(str(tmpdir), mmsi=[other, expected[0]['mmsi']]) == [a, b]
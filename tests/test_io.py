@@ -10,6 +10,8 @@ import six
 from six.moves import StringIO
 
 import gpsdio
+import gpsdio.base
+import gpsdio.bloom
 import gpsdio.drivers
 import gpsdio.errors
 import gpsdio.schema
@@ -122,3 +124,226 @@ def test_validate_msg(types_json_path):
         msg['other'] = None
         with pytest.raises(gpsdio.errors.SchemaError):
             src.validate_msg(msg)
+
+
+@pytest.mark.parametrize('ext', ['json', 'parquet', 'arrow'])
+def test_to_arrow(ext, types_json_path, tmpdir):
+    pa = pytest.importorskip('pyarrow')
+    pth = str(tmpdir.mkdir('test').join('test.' + ext))
+    with gpsdio.open(types_json_path) as src, gpsdio.open(pth, 'w') as dst:
+        for msg in src:
+            dst.write(msg)
+    where = [('type', 'in', [1, 2, 3]), ('lat', '>', 0)]
+    with gpsdio.open(types_json_path, where=where) as src:
+        expected = sorted(m['mmsi'] for m in src)
+
+    with gpsdio.open(pth, where=where) as src:
+        batches = list(src.to_arrow(batch_size=2))
+    assert batches
+    assert all(isinstance(b, pa.RecordBatch) for b in batches)
+    table = pa.Table.from_batches(batches)
+    assert sorted(table.column('mmsi').to_pylist()) == expected
+
+
+@pytest.mark.parametrize('ext,do', [
+    ('json', {}),
+    ('msg', {}),
+    ('msg', {'positional': True}),
+    ('msg', {'mmap': True}),
+    ('fw', {})])
+def test_random_access(ext, do, types_json_path, tmpdir):
+    if ext == 'fw':
+        pytest.importorskip('numpy')
+    pth = str(tmpdir.mkdir('test').join('test.' + ext))
+    with gpsdio.open(types_json_path) as src:
+        msgs = list(src)
+    with gpsdio.open(pth, 'w', do={'positional': True} if do.get('positional') else {}) as dst:
+        for msg in msgs:
+            dst.write(msg)
+    with gpsdio.open(pth, do={'mmap': True} if do.get('mmap') else {}) as src:
+        expected = list(src)
+
+    with gpsdio.open(pth, do={'mmap': True} if do.get('mmap') else {}) as src:
+        assert src.tell() == 0
+        assert next(src) == expected[0]
+        assert src.tell() == 1
+
+        # Indexing doesn't move the reader
+        assert src[5] == expected[5]
+        assert src[-1] == expected[-1]
+        assert src[2:8:2] == expected[2:8:2]
+        assert src[-3:] == expected[-3:]
+        assert next(src) == expected[1]
+        with pytest.raises(IndexError):
+            src[len(expected)]
+
+        src.seek(10)
+        assert src.tell() == 10
+        assert list(src) == expected[10:]
+        assert src.tell() == len(expected)
+        src.seek(-2)
+        assert list(src) == expected[-2:]
+        src.seek(0)
+        assert list(src) == expected
+        with pytest.raises(IndexError):
+            src.seek(len(expected) + 1)
+
+
+def test_random_access_where(types_json_path):
+    with gpsdio.open(types_json_path) as src:
+        expected = list(src)
+    with gpsdio.open(types_json_path, where=[('type', '==', 5)]) as src:
+        src.seek(10)
+        assert list(src) == [m for m in expected[10:] if m['type'] == 5]
+        assert src[0] == expected[0]
+
+
+def test_random_access_unsupported(types_json_gz_path):
+    with gpsdio.open(types_json_gz_path) as src:
+        with pytest.raises(gpsdio.errors.UnsupportedOperation):
+            src.seek(1)
+    with gpsdio.open(StringIO(), driver='NewlineJSON', compression=False) as src:
+        with pytest.raises(gpsdio.errors.UnsupportedOperation):
+            src[0]
+
+
+def _write_days(src_path, tmpdir, exts):
+
+    """
+    Write a copy of a file per day with interleaved timestamps so each file
+    is sorted by time.
+    """
+
+    dump = gpsdio.base.BaseDriver().dump
+    with gpsdio.open(src_path) as src:
+        msgs = list(src)
+    paths = []
+    expected = []
+    for day, ext in enumerate(exts):
+        pth = str(tmpdir.join('day{}.{}'.format(day, ext)))
+        day_msgs = [dict(dump(m), timestamp='2015-01-01T00:{:02d}:{:02d}.000000Z'.format(i, day))
+                    for i, m in enumerate(msgs)]
+        with gpsdio.open(pth, 'w') as dst:
+            for msg in day_msgs:
+                dst.write(msg)
+        paths.append(pth)
+        expected.append(day_msgs)
+    return paths, expected
+
+
+def test_multi(types_json_path, tmpdir):
+    dump = gpsdio.base.BaseDriver().dump
+    paths, expected = _write_days(types_json_path, tmpdir, ['json', 'msg.gz', 'msg', 'json.bz2'])
+    concatenated = [m for day in expected for m in day]
+
+    with gpsdio.open(paths, readahead=1, workers=2) as src:
+        assert isinstance(src, gpsdio.io.GPSDIOMultiReader)
+        assert src.names == paths
+        assert [dump(m) for m in src] == concatenated
+    assert src.closed
+
+    # Globs and directories
+    with gpsdio.open(str(tmpdir.join('day*'))) as src:
+        assert [dump(m) for m in src] == concatenated
+    with gpsdio.open(str(tmpdir)) as src:
+        assert len(list(src)) == len(concatenated)
+
+    # Sorted files are merged by time
+    with gpsdio.open(paths, assume_sorted=True, workers=1) as src:
+        actual = [dump(m) for m in src]
+    assert actual == sorted(concatenated, key=lambda m: m['timestamp'])
+
+    # Options apply to every file
+    mmsi = expected[0][0]['mmsi']
+    with gpsdio.open(paths, mmsi=mmsi, start='2015-01-01T00:05:00') as src:
+        assert [dump(m) for m in src] == [m for m in concatenated if m['mmsi'] == mmsi and
+                                          m['timestamp'] >= '2015-01-01T00:05:00']
+
+
+def test_multi_close_early(types_json_path, tmpdir):
+    paths, _ = _write_days(types_json_path, tmpdir, ['json'] * 6)
+    with gpsdio.open(paths, workers=2, readahead=1) as src:
+        next(src)
+    with gpsdio.open(paths, assume_sorted=True, workers=2, readahead=1) as src:
+        next(src)
+
+
+def test_multi_errors(types_json_path, tmpdir):
+    with pytest.raises(IOError):
+        gpsdio.open(str(tmpdir.join('*.json')))
+    with pytest.raises(ValueError):
+        gpsdio.open([types_json_path], 'w')
+
+    bad = tmpdir.join('bad.json')
+    bad.write('not json\n')
+    with gpsdio.open([types_json_path, str(bad)]) as src:
+        with pytest.raises(ValueError):
+            list(src)
+
+
+def _read_partitions(paths):
+    out = {}
+    for path in paths:
+        with gpsdio.open(path) as src:
+            out[path] = [gpsdio.base.BaseDriver().dump(m) for m in src]
+    return out
+
+
+def test_partitioned_writer(types_json_path, tmpdir):
+    dump = gpsdio.base.BaseDriver().dump
+    with gpsdio.open(types_json_path) as src:
+        msgs = [dump(m) for m in src]
+    template = str(tmpdir.join('parts', 'type-{key}.msg.gz'))
+
+    # A single open file and single message buffers force every partition to
+    # be appended to
+    with gpsdio.PartitionedWriter(template, 'type % 3', max_open=1, buffer_size=1) as dst:
+        for msg in msgs:
+            dst.write(msg)
+    assert sorted(dst.paths) == sorted(template.format(key=k) for k in range(3))
+    actual = _read_partitions(dst.paths)
+    for key in range(3):
+        expected = [m for m in msgs if m['type'] % 3 == key]
+        assert actual[template.format(key=key)] == expected
+
+    # New segments instead of appending, partitioned by field
+    template = str(tmpdir.join('{type}.json'))
+    with gpsdio.PartitionedWriter(template, 'type', max_open=1, buffer_size=1,
+                                  segments=True) as dst:
+        for msg in msgs + msgs:
+            dst.write(msg)
+    assert len(dst.paths) == 2 * len(msgs)
+    assert str(tmpdir.join('1-1.json')) in dst.paths
+    actual = _read_partitions(dst.paths)
+    assert sorted(m['type'] for p in dst.paths for m in actual[p]) == sorted(
+        m['type'] for m in msgs + msgs)
+
+
+def test_partitioned_writer_buffers(types_json_path, tmpdir):
+    with gpsdio.open(types_json_path) as src:
+        msgs = list(src)
+    template = str(tmpdir.join('{key}.json'))
+
+    def key(msg):
+        return None if msg['type'] == 1 else msg['mmsi'] % 2
+
+    with gpsdio.PartitionedWriter(template, key, max_buffered=5, buffer_size=100,
+                                  bloom=True) as dst:
+        for msg in msgs[:4]:
+            dst.write(msg)
+        assert not dst.paths
+        for msg in msgs[4:]:
+            dst.write(msg)
+        assert dst.paths
+    assert dst.closed
+    assert dst.skipped == 1
+    actual = _read_partitions(dst.paths)
+    assert sum(len(v) for v in actual.values()) == len(msgs) - 1
+    for path, written in actual.items():
+        bloom = gpsdio.bloom.load(path)
+        assert all(m['mmsi'] in bloom for m in written)
+
+    with pytest.raises(ValueError):
+        gpsdio.PartitionedWriter(template, 'mmsi', mode='r')
+    with pytest.raises(ValueError):
+        gpsdio.PartitionedWriter(template, 'mmsi', mode='a', bloom=True)
@@ -0,0 +1,67 @@
+"""
+Unittests for gpsdio.net
+"""
+
+
+import asyncio
+import threading
+
+import pytest
+
+import gpsdio
+import gpsdio.aio
+import gpsdio.net
+
+
+@pytest.fixture(scope='function')
+def replay_url(types_nmea_path):
+
+    """
+    Serve `types.nmea` from a background thread and yield its URL.
+    """
+
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(gpsdio.aio.replay(types_nmea_path))
+    thread = threading.Thread(target=loop.run_forever)
+    thread.start()
+    host, port = server.sockets[0].getsockname()[:2]
+    yield 'tcp://{}:{}'.format(host, port)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    server.close()
+    loop.run_until_complete(server.wait_closed())
+    loop.close()
+
+
+def test_parse_url():
+    assert gpsdio.net.parse_url('tcp://localhost:5000') == ('localhost', 5000)
+    with pytest.raises(ValueError):
+        gpsdio.net.parse_url('udp://localhost:5000')
+    with pytest.raises(ValueError):
+        gpsdio.net.parse_url('tcp://localhost')
+    assert gpsdio.net.is_url('tcp://localhost:5000')
+    assert not gpsdio.net.is_url('tests/data/types.nmea')
+
+
+def test_open_url(replay_url, types_nmea_path):
+    with gpsdio.open(replay_url) as src, gpsdio.open(types_nmea_path) as expected:
+        assert src.name == replay_url
+        assert list(src) == list(expected)
+    assert src.closed
+
+
+def test_open_url_write():
+    with pytest.raises(ValueError):
+        gpsdio.open('tcp://localhost:5000', 'w')
+
+
+def test_cli_ingest(replay_url, runner, tmpdir):
+
+    import gpsdio.cli.main
+
+    pth = str(tmpdir.mkdir('test').join('test_cli_ingest.msg.gz'))
+    result = runner.invoke(gpsdio.cli.main.main_group, [
+        'ingest', replay_url, pth, '--flush-interval', '0.1'])
+    assert result.exit_code == 0
+    with gpsdio.open(pth) as src:
+        assert len(list(src)) == 26
@@ -0,0 +1,98 @@
+"""
+Unittests for gpsdio.nmea and the NMEA driver
+"""
+
+
+import datetime
+
+import pytest
+
+import gpsdio
+import gpsdio.validate
+from gpsdio._nmea import checksum_ok
+from gpsdio._nmea import decode
+from gpsdio.nmea import SentenceParser
+
+
+POSITION = '!AIVDM,1,1,,A,15N1u<PP1FJuvSRHOE6QIwwh0HQ6,0*30'
+STATIC = '53eaFL02?;fwTPm7V219E@R1@PE8E<622222221@9hG1A7?@NCPSlm3kc5DhH8888888880'
+
+
+def _sentence(body):
+    check = 0
+    for c in body:
+        check ^= ord(c)
+        check &= 0xFF
+    return '!{}*{:02X}'.format(body, check)
+
+
+def test_checksum():
+    assert checksum_ok(POSITION)
+    assert checksum_ok(POSITION + ',d-080,1325394060')
+    assert not checksum_ok(POSITION.replace('*30', '*31'))
+    assert not checksum_ok('!AIVDM,1,1')
+
+
+def test_decode_position():
+    msg = decode('15N1u<PP1FJuvSRHOE6QIwwh0HQ6')
+    assert msg['type'] == 1
+    assert msg['mmsi'] == 367033650
+    assert msg['speed'] == 8.6
+    assert msg['course'] == 35.9
+    assert msg['heading'] == 511
+    assert round(msg['lat'], 5) == 42.79855
+    assert round(msg['lon'], 5) == -70.34691
+
+
+def test_decode_invalid_character():
+    with pytest.raises(ValueError):
+        decode('15N1u<PP1FJuv~RHOE6QIwwh0HQ6')
+
+
+def test_multi_sentence():
+    first = _sentence('AIVDM,2,1,7,B,{},0'.format(STATIC[:40]))
+    second = _sentence('AIVDM,2,2,7,B,{},2'.format(STATIC[40:])) + ',1325394065'
+    parser = SentenceParser()
+    assert parser.parse(first) is None
+    msg = parser.parse(second)
+    assert msg['type'] == 5
+    assert msg['shipname'] == 'RUTH THERESA'
+    assert msg['destination'] == 'BOSTON,USA'
+    assert msg['callsign'] == '9HMQ9'
+    assert msg['timestamp'] == datetime.datetime(2012, 1, 1, 5, 1, 5)
+
+
+def test_fragment_buffer_is_bounded():
+    parser = SentenceParser(max_fragments=2)
+    for seq in range(5):
+        assert parser.parse(_sentence('AIVDM,2,1,{},A,{},0'.format(seq, STATIC[:40]))) is None
+    assert len(parser._fragments) == 2
+    # The fragment for sequence 0 was evicted
+    assert parser.parse(_sentence('AIVDM,2,2,0,A,{},2'.format(STATIC[40:]))) is None
+    assert parser.parse(_sentence('AIVDM,2,2,4,A,{},2'.format(STATIC[40:])))['type'] == 5
+
+
+def test_tag_block_and_junk():
+    parser = SentenceParser()
+    msg = parser.parse('\\s:r003669945,c:1325394060*3F\\' + POSITION)
+    assert msg['timestamp'] == datetime.datetime(2012, 1, 1, 5, 1)
+    assert parser.parse('') is None
+    assert parser.parse('$GPGGA,whatever') is None
+    assert parser.parse(POSITION.replace('*30', '*31')) is None
+    assert parser.skipped == 1
+
+
+def test_driver(types_nmea_path, types_nmea_gz_path, types_json_path):
+    with gpsdio.open(types_nmea_path) as src, gpsdio.open(types_json_path) as expected:
+        for actual, e in zip(src, expected):
+            assert actual['type'] == e['type']
+            assert actual['mmsi'] == e['mmsi']
+            assert actual['timestamp'] == gpsdio.validate.str2datetime(e['timestamp'])
+            assert sorted(actual) == sorted(src.schema[actual['type']])
+    with gpsdio.open(types_nmea_gz_path) as src:
+        assert len(list(src)) == 26
+
+
+def test_driver_is_read_only(tmpdir):
+    with pytest.raises(ValueError):
+        gpsdio.open(str(tmpdir.join('out.nmea')), 'w')
@@ -3,6 +3,10 @@ Unittests for gpsdio.ops
 """
 
 
+import datetime
+
+import pytest
+
 import gpsdio.ops
 
 
@@ -41,3 +45,190 @@ def test_filter(types_msg_gz_path, types_json_gz_path):
             passed.append(msg)
             assert 'lat' in msg
     assert len(passed) >= 9
+
+
+def test_merge():
+    a = [{'timestamp': '2015-01-01T00:00:0{}.000000Z'.format(i), 'src': 'a'} for i in (0, 2, 4)]
+    b = [{'timestamp': datetime.datetime(2015, 1, 1, 0, 0, i), 'src': 'b'} for i in (1, 2, 3)]
+    c = [{'src': 'c'}, {'timestamp': '2015-01-01T00:00:05.000000Z', 'src': 'c'}]
+    actual = list(gpsdio.ops.merge([iter(a), iter(b), iter(c)], check=True))
+    assert [m['src'] for m in actual] == ['c', 'a', 'b', 'a', 'b', 'b', 'a', 'c']
+
+    assert list(gpsdio.ops.merge([[{'mmsi': 2}], [{'mmsi': 1}]], field='mmsi')) == [
+        {'mmsi': 1}, {'mmsi': 2}]
+    assert list(gpsdio.ops.merge([])) == []
+
+    unsorted = [{'mmsi': 2}, {'mmsi': 1}]
+    assert len(list(gpsdio.ops.merge([unsorted], field='mmsi'))) == 2
+    with pytest.raises(ValueError):
+        list(gpsdio.ops.merge([unsorted], field='mmsi', check=True))
+
+
+def _receptions():
+
+    """
+    Three stations receiving the same two transmissions a second apart, and
+    the first transmission repeated 10 minutes later.
+    """
+
+    def msg(second, station, mmsi=123):
+        ts = datetime.datetime(2015, 1, 1, 0, second // 60, second % 60)
+        return {'type': 1, 'mmsi': mmsi, 'lat': 1.0, 'lon': 2.0, 'timestamp': ts,
+                'station': station}
+
+    return [msg(0, 'a'), msg(0, 'b', 456), msg(1, 'b'), msg(1, 'a', 456), msg(2, 'c'),
+            msg(600, 'a'), {'type': 5, 'mmsi': 123}, {'type': 5, 'mmsi': 123}]
+
+
+def test_dedupe():
+    msgs = _receptions()
+
+    # The station field makes every message unique
+    assert len(list(gpsdio.ops.dedupe(msgs))) == len(msgs)
+
+    actual = list(gpsdio.ops.dedupe(msgs, key=('type', 'mmsi', 'lat', 'lon'), window=5))
+    assert actual == [msgs[0], msgs[1], msgs[5], msgs[6], msgs[7]]
+    actual = list(gpsdio.ops.dedupe(msgs, key=('type', 'mmsi'), window=1000))
+    assert actual == [msgs[0], msgs[1], msgs[6], msgs[7]]
+
+    # String timestamps and unhashable values
+    stripped = [{k: v for k, v in m.items() if k != 'station'} for m in msgs]
+    for m in stripped:
+        if 'timestamp' in m:
+            m['timestamp'] = gpsdio.ops.datetime2str(m['timestamp'])
+        m['data'] = [1, 2]
+    assert list(gpsdio.ops.dedupe(stripped)) == [
+        stripped[0], stripped[1], stripped[5], stripped[6], stripped[7]]
+
+    # Keys are forgotten once they're older than the window
+    many = [{'mmsi': i, 'timestamp': datetime.datetime(2015, 1, 1) + datetime.timedelta(seconds=i)}
+            for i in range(1000)]
+    later = [dict(m, timestamp=m['timestamp'] + datetime.timedelta(seconds=11)) for m in many]
+    assert len(list(gpsdio.ops.dedupe(many + later, key='mmsi', window=10))) == 2000
+    assert len(list(gpsdio.ops.dedupe(many + many[-5:], key='mmsi', window=10))) == 1000
+
+
+def test_dedupe_bloom():
+    msgs = _receptions()
+    key = ('type', 'mmsi', 'lat', 'lon')
+    actual = list(gpsdio.ops.dedupe(msgs, key=key, window=5, bloom={'capacity': 100}))
+    assert actual == [msgs[0], msgs[1], msgs[5], msgs[6], msgs[7]]
+    assert list(gpsdio.ops.dedupe(msgs, key=key, window=5, bloom=True)) == actual
+
+
+def test_sort_max_delay():
+    start = datetime.datetime(2015, 1, 1)
+    expected = [{'timestamp': start + datetime.timedelta(seconds=i), 'i': i} for i in range(100)]
+
+    # Every message is at most 5 seconds late
+    nearly = sorted(expected, key=lambda m: m['i'] + (5 if m['i'] % 7 == 0 else 0))
+    actual = list(gpsdio.ops.sort(nearly, 'timestamp', max_delay=datetime.timedelta(seconds=5)))
+    assert actual == expected
+
+    # String timestamps, numbers, and messages lacking the field
+    text = [dict(m, timestamp=gpsdio.ops.datetime2str(m['timestamp'])) for m in nearly]
+    assert list(gpsdio.ops.sort(text, 'timestamp', max_delay=datetime.timedelta(seconds=5))) == [
+        dict(m, timestamp=gpsdio.ops.datetime2str(m['timestamp'])) for m in expected]
+    assert [m.get('i') for m in gpsdio.ops.sort(nearly + [{}], 'i', max_delay=5)] == \
+        list(range(95)) + [None] + list(range(95, 100))
+
+    # Late messages
+    stream = [{'i': i} for i in (1, 2, 10, 11, 3, 12)]
+    assert [m['i'] for m in gpsdio.ops.sort(stream, 'i', max_delay=8)] == [1, 2, 3, 10, 11, 12]
+    assert [m['i'] for m in gpsdio.ops.sort(stream, 'i', max_delay=1)] == [1, 2, 10, 11, 12]
+    assert [m['i'] for m in gpsdio.ops.sort(stream, 'i', max_delay=1, late='emit')] == [
+        1, 2, 10, 3, 11, 12]
+    late = []
+    assert [m['i'] for m in gpsdio.ops.sort(stream, 'i', max_delay=1, late=late.append)] == [
+        1, 2, 10, 11, 12]
+    assert late == [{'i': 3}]
+    with pytest.raises(ValueError):
+        list(gpsdio.ops.sort(stream, 'i', max_delay=1, late='bad'))
+
+
+def test_sort_fields():
+    start = datetime.datetime(2015, 1, 1)
+    msgs = [
+        {'mmsi': 2, 'timestamp': '2015-01-01T00:00:02.000000Z', 'name': 'b'},
+        {'mmsi': 1, 'timestamp': start + datetime.timedelta(seconds=3), 'name': 'a'},
+        {'mmsi': 1, 'timestamp': '2015-01-01T00:00:01.000000Z'},
+        {'timestamp': '2015-01-01T00:00:00.000000Z', 'name': 'a'},
+        {'mmsi': 1, 'name': 'c'},
+        {'mmsi': 2, 'timestamp': '2015-01-01T00:00:01.000000Z', 'name': 'a'},
+    ]
+    expected = [msgs[i] for i in (3, 4, 2, 1, 5, 0)]
+    assert list(gpsdio.ops.sort(msgs, ('mmsi', 'timestamp'))) == expected
+    assert list(gpsdio.ops.sort(msgs, ['name', 'mmsi'])) == [msgs[i] for i in (2, 3, 1, 5, 0, 4)]
+
+    # Timestamps in a single format, which are equal to the datetimes
+    text = [{'mmsi': m['mmsi'], 'timestamp': gpsdio.ops.datetime2str(m['timestamp'])}
+            for m in expected if 'mmsi' in m and 'timestamp' in m]
+    assert list(gpsdio.ops.sort(text[::-1], ('timestamp', 'mmsi'))) == sorted(
+        text, key=lambda m: (m['timestamp'], m['mmsi']))
+
+    # Values that can't be stored in an array are sorted as tuples
+    mixed = [{'v': 2.5}, {'v': 'a'}, {'v': 1}]
+    with pytest.raises(TypeError):
+        list(gpsdio.ops.sort(mixed, ('v',)))
+    assert list(gpsdio.ops.sort(mixed[::2], ('v',))) == [{'v': 1}, {'v': 2.5}]
+    assert list(gpsdio.ops.sort([{'v': (2,)}, {'v': (1,)}], ('v',))) == [{'v': (1,)}, {'v': (2,)}]
+
+    with pytest.raises(ValueError):
+        list(gpsdio.ops.sort(msgs, ('mmsi', 'timestamp'), max_delay=1))
+
+
+def _positions(mmsi, seconds, lon=0.0, step=0.01):
+    start = datetime.datetime(2015, 1, 1)
+    return [{'mmsi': mmsi, 'timestamp': start + datetime.timedelta(seconds=s),
+             'lon': lon + i * step, 'lat': 0.0} for i, s in enumerate(seconds)]
+
+
+def test_tracks():
+    a = _positions(1, [0, 60, 120, 5000, 5060])
+    b = _positions(2, [30, 90, 150, 210], lon=10)
+    b[2]['lon'], b[3]['lon'] = 11, 11.01
+    stream = sorted(a + b, key=lambda m: m['timestamp'])
+    stream.insert(3, {'mmsi': 3, 'timestamp': stream[2]['timestamp'], 'lon': 181, 'lat': 0})
+    stream.insert(3, {'type': 5, 'mmsi': 1, 'timestamp': stream[2]['timestamp']})
+
+    # The first track of vessel 1 is produced as soon as vessel 1 is idle
+    actual = list(gpsdio.ops.tracks(stream, max_gap=3600))
+    assert actual == [a[:3], b, a[3:]]
+
+    # Vessel 2 jumps about 110 km between its second and third position
+    actual = list(gpsdio.ops.tracks(stream, max_gap=3600, max_jump_km=50))
+    assert actual == [b[:2], a[:3], b[2:], a[3:]]
+
+    assert list(gpsdio.ops.tracks(stream, max_gap=3600, idle=100)) == [
+        a[:3], b, a[3:]]
+    assert list(gpsdio.ops.tracks(stream, max_points=2)) == [
+        a[:2], b[:2], a[2:4], b[2:], a[4:]]
+
+    # Closing the least recently updated track to open another
+    assert list(gpsdio.ops.tracks(stream, max_gap=3600, max_vessels=1)) == [
+        a[:1], b[:1], a[1:2], b[1:2], a[2:3], b[2:], a[3:]]
+
+    # String timestamps, and positions older than the vessel's previous position
+    text = [dict(m, timestamp=gpsdio.ops.datetime2str(m['timestamp'])) for m in a]
+    assert list(gpsdio.ops.tracks(text + text[:1], max_gap=60)) == [text[:3], text[3:]]
+
+
+def test_tracks_columns():
+    pytest.importorskip('numpy')
+    a = _positions(1, [0, 60, 120])
+    actual, = list(gpsdio.ops.tracks(a, columns=True))
+    assert sorted(actual) == sorted(gpsdio.ops.TRACK_COLUMNS)
+    assert actual['mmsi'].tolist() == [1, 1, 1]
+    assert actual['lon'].tolist() == [m['lon'] for m in a]
+    assert actual['timestamp'].dtype.name == 'datetime64[us]'
+    assert actual['timestamp'].tolist() == [m['timestamp'] for m in a]
+
+    actual, = list(gpsdio.ops.tracks(a, columns=['lat']))
+    assert list(actual) == ['lat']
+
+
+def test_distance():
+    assert gpsdio.ops.distance(0, 0, 0, 0) == 0
+    assert round(gpsdio.ops.distance(0, 0, 1, 0), 1) == 111.2
+    assert round(gpsdio.ops.distance(-180, 0, 180, 0), 6) == 0
+    assert round(gpsdio.ops.distance(0, -90, 0, 90)) == 20015
@@ -8,3 +8,13 @@ from gpsdio import schema
 
 def test_build_schema():
     assert sorted(schema.build_schema().keys())[:3] == [1, 2, 3]
+
+
+def test_field_type():
+    built = schema.build_schema()
+    assert schema.field_type(built[1]['mmsi']['validate']) == ('int', True)
+    assert schema.field_type(built[1]['turn']['validate']) == ('float', False)
+    assert schema.field_type(built[1]['speed']['validate']) == ('float', False)
+    assert schema.field_type(built[1]['timestamp']['validate']) == ('datetime', True)
+    assert schema.field_type(built[5]['shipname']['validate']) == ('str', True)
+    assert schema.field_type(lambda x: x) == ('object', False)
@@ -0,0 +1,75 @@
+"""
+Unittests for gpsdio.search
+"""
+
+
+import io
+import os
+
+import pytest
+
+import gpsdio
+import gpsdio.cli.main
+import gpsdio.search
+from gpsdio.validate import datetime2str
+
+
+@pytest.mark.parametrize('ext,do', [
+    ('json', {}),
+    ('msg', {}),
+    ('msg', {'positional': True})])
+def test_search(ext, do, types_msg_path, tmpdir, sorted_copy):
+    pth = str(tmpdir.join('test.' + ext))
+    expected = sorted_copy(types_msg_path, pth, do=do)
+
+    for start, end in [('2015-01-01', '2020-01-01'),
+                       ('2000-01-01', '2013-01-01'),
+                       ('2030-01-01', None),
+                       (None, '2012-06-01'),
+                       ('2040-01-01', '2050-01-01'),
+                       ('2020-01-01', '2015-01-01')]:
+        with gpsdio.open(pth, start=start, end=end, assume_sorted=True) as src:
+            assert isinstance(src.driver.f, io.BufferedReader)
+            actual = list(src)
+        assert actual == [m for m in expected
+                          if (start is None or datetime2str(m['timestamp']) >= start) and
+                          (end is None or datetime2str(m['timestamp']) < end)]
+
+    # Only the matching part of the file is read
+    ranges = gpsdio.search.byte_ranges(pth, start='2020-01-01', end='2021-01-01')
+    start, stop = ranges[-1]
+    assert stop - start < os.path.getsize(pth) / 10
+
+
+def test_sync(types_msg_path, tmpdir, sorted_copy):
+    pth = str(tmpdir.join('test.msg'))
+    expected = sorted_copy(types_msg_path, pth, do={'positional': True})
+    with gpsdio.open(pth, do={'positional': True}, _check=False) as src:
+        offsets = []
+        for _ in expected:
+            offsets.append(src.driver.tell())
+            next(src)
+        size = src.driver.tell()
+        for offset in list(range(0, size, 5)) + [size]:
+            i = next((i for i, o in enumerate(offsets) if o >= offset), len(offsets))
+            assert src.driver.sync(offset) == (offsets + [size])[i]
+
+
+def test_search_unsupported(types_json_path, tmpdir, sorted_copy):
+    pth = str(tmpdir.join('test.csv'))
+    expected = sorted_copy(types_json_path, pth)
+    assert gpsdio.search.open_sorted(pth, start='2015-01-01') is None
+    with gpsdio.open(pth, start='2015-01-01', assume_sorted=True) as src:
+        assert len(list(src)) == len(
+            [m for m in expected if datetime2str(m['timestamp']) >= '2015'])
+
+
+def test_cli_etl_assume_sorted(types_json_path, tmpdir, runner, sorted_copy):
+    pth = str(tmpdir.join('test.json'))
+    expected = sorted_copy(types_json_path, pth)
+    out = str(tmpdir.join('out.json'))
+    result = runner.invoke(gpsdio.cli.main.main_group, [
+        'etl', pth, out, '--start', '2014-01-01', '--end', '2016-01-01', '--assume-sorted'])
+    assert result.exit_code == 0
+    with gpsdio.open(out) as src:
+        assert list(src) == [m for m in expected if '2014' <= datetime2str(m['timestamp']) < '2016']
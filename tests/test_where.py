@@ -0,0 +1,88 @@
+"""
+Unittests for gpsdio.where
+"""
+
+
+import datetime
+
+import pytest
+
+import gpsdio
+import gpsdio.schema
+import gpsdio.where
+
+
+def test_normalize():
+    schema = gpsdio.schema.build_schema()
+    assert gpsdio.where.normalize(('mmsi', '==', 1)) == [('mmsi', '==', 1)]
+    assert gpsdio.where.normalize([
+        ('timestamp', '>=', '2015-01-02'),
+        ('timestamp', 'in', ['2015-01-02T03:04:05.000006Z'])], schema) == [
+        ('timestamp', '>=', datetime.datetime(2015, 1, 2)),
+        ('timestamp', 'in', (datetime.datetime(2015, 1, 2, 3, 4, 5, 6),))]
+    with pytest.raises(ValueError):
+        gpsdio.where.normalize([('mmsi', '=~', 1)])
+    with pytest.raises(ValueError):
+        gpsdio.where.normalize([('mmsi', '==')])
+    with pytest.raises(ValueError):
+        gpsdio.where.normalize([('timestamp', '>', 'yesterday')], schema)
+
+
+@pytest.mark.parametrize('clause,expected', [
+    (('mmsi', '==', 1), True),
+    (('mmsi', '!=', 1), False),
+    (('mmsi', 'in', (1, 2)), True),
+    (('mmsi', 'not in', (1, 2)), False),
+    (('lat', '<', 5), True),
+    (('lat', '>=', 5), False),
+    (('timestamp', '<', datetime.datetime(2015, 1, 2)), True),
+    (('timestamp', '>', datetime.datetime(2015, 1, 2)), False),
+    (('name', '==', None), True),
+    (('name', '!=', 1), False),
+    (('name', '<', 1), False),
+    (('missing', 'in', (None,)), True),
+    (('lat', '<', 'string'), False),
+])
+def test_matches(clause, expected):
+    msg = {'mmsi': 1, 'lat': 4.5, 'timestamp': '2015-01-01T00:00:00.000000Z', 'name': None}
+    assert gpsdio.where.matches(msg, [clause]) is expected
+
+
+def test_bounds_and_overlaps():
+    bounds = gpsdio.where.bounds([
+        ('mmsi', '>=', 10), ('mmsi', '<', 20), ('mmsi', '>', 12), ('lat', 'in', (3, 1, 2)),
+        ('lon', '!=', 5)])
+    assert bounds == {'mmsi': (12, 20), 'lat': (1, 3)}
+    assert gpsdio.where.overlaps(bounds, 'mmsi', 0, 12)
+    assert not gpsdio.where.overlaps(bounds, 'mmsi', 0, 11)
+    assert not gpsdio.where.overlaps(bounds, 'lat', 4, 5)
+    assert gpsdio.where.overlaps(bounds, 'lon', 4, 5)
+    assert gpsdio.where.overlaps(bounds, 'lat', None, None)
+
+
+def test_open_where(types_json_path):
+    with gpsdio.open(types_json_path, where=[('type', 'in', [1, 2, 3])]) as src:
+        actual = list(src)
+    with gpsdio.open(types_json_path) as src:
+        expected = [m for m in src if m['type'] in (1, 2, 3)]
+    assert actual == expected
+    with pytest.raises(ValueError):
+        gpsdio.open(types_json_path, 'w', where=[('type', '==', 1)])
+
+
+def test_to_sql():
+    where = gpsdio.where.normalize([
+        ('type', 'in', [1, 2]),
+        ('mmsi', '==', 5),
+        ('timestamp', '>=', datetime.datetime(2015, 1, 2)),
+        ('lat', 'in', [1, None]),
+        ('lon', 'not in', [3]),
+        ('name', '==', None)])
+    columns = ('mmsi', 'timestamp', 'lat', 'lon')
+    assert gpsdio.where.to_sql(where, columns, {'type': 3}) is None
+    sql, params = gpsdio.where.to_sql(where, columns, {'type': 1})
+    assert sql == ('"mmsi" = ? AND "timestamp" >= ? AND ("lat" IN (?) OR "lat" IS NULL) '
+                   'AND ("lon" IS NOT NULL AND "lon" NOT IN (?))')
+    assert params == [5, '2015-01-02T00:00:00.000000Z', 1, 3]
+    assert gpsdio.where.to_sql([('name', '!=', 1)], columns) is None
+    assert gpsdio.where.to_sql([], columns) == ('', [])